@@ -0,0 +1,64 @@
+import random
+import time
+
+from django.core.management.base import BaseCommand
+
+from apps.cart.models import Cart
+from apps.cart.storage import make_cart_store
+from apps.products.factories import ProductFactory
+from apps.products.models import Product
+
+
+class Command(BaseCommand):
+    help = "Cart operations per second of each cart store backend"
+
+    def add_arguments(self, parser):
+        parser.add_argument('--backends', nargs='+', default=['memory', 'database'],
+                            choices=['memory', 'redis', 'database'])
+        parser.add_argument('--operations', type=int, default=20000)
+        parser.add_argument('--carts', type=int, default=500)
+        parser.add_argument('--products', type=int, default=50)
+        parser.add_argument('--seed', type=int, default=0)
+
+    def handle(self, *args, **options):
+        products = list(Product.objects.values_list('pk', flat=True)[:options['products']])
+        if len(products) < options['products']:
+            products += [p.pk for p in ProductFactory.create_batch(options['products'] - len(products))]
+
+        self.stdout.write(
+            f"{'backend':<10}{'ops/s':>10}{'flush s':>10}{'carts written':>15}")
+        for backend in options['backends']:
+            random.seed(options['seed'])
+            store = make_cart_store(backend)
+            keys = [f'benchmark:{backend}:{n}' for n in range(options['carts'])]
+            Cart.objects.filter(key__startswith=f'benchmark:{backend}:').delete()
+
+            started = time.perf_counter()
+            for _ in range(options['operations']):
+                self.operation(store, random.choice(keys), random.choice(products))
+            elapsed = time.perf_counter() - started
+
+            # the write-behind cost, paid later and off the request path
+            started = time.perf_counter()
+            written = store.flush_idle(0, limit=len(keys))
+            flushed = time.perf_counter() - started
+
+            self.stdout.write(
+                f"{backend:<10}{options['operations'] / elapsed:>10.0f}{flushed:>10.2f}"
+                f"{written:>15}")
+
+            for key in keys:
+                store.discard(key)
+            Cart.objects.filter(key__startswith=f'benchmark:{backend}:').delete()
+
+    def operation(self, store, key, product_id):
+        # roughly what a storefront does: mostly adds and views
+        roll = random.random()
+        if roll < 0.5:
+            store.add(key, product_id, 1)
+        elif roll < 0.8:
+            store.get(key)
+        elif roll < 0.9:
+            store.set(key, product_id, random.randint(1, 5))
+        else:
+            store.remove(key, product_id)
@@ -0,0 +1,38 @@
+import time
+
+from django.conf import settings
+from django.core.management.base import BaseCommand, CommandError
+
+from apps.cart.storage import get_cart_store
+
+
+class Command(BaseCommand):
+    help = "Write carts idle for CART_STORE['WRITE_BEHIND_IDLE'] seconds to the database"
+
+    def add_arguments(self, parser):
+        parser.add_argument('--idle', type=float, default=None,
+                            help="idle seconds, defaults to the setting")
+        parser.add_argument('--all', action='store_true', help="flush every dirty cart now")
+        parser.add_argument('--batch-size', type=int, default=1000)
+        parser.add_argument('--loop', type=float, default=0,
+                            help="keep flushing every N seconds instead of once")
+
+    def handle(self, *args, **options):
+        store = get_cart_store()
+        if not store.shared:
+            raise CommandError(
+                "the memory cart store lives inside each worker, this process has nothing to flush")
+        idle = 0 if options['all'] else options['idle']
+        if idle is None:
+            idle = settings.CART_STORE['WRITE_BEHIND_IDLE']
+
+        while True:
+            count = total = store.flush_idle(idle, limit=options['batch_size'])
+            while count == options['batch_size']:
+                count = store.flush_idle(idle, limit=options['batch_size'])
+                total += count
+            if total or not options['loop']:
+                self.stdout.write(f"persisted {total} carts")
+            if not options['loop']:
+                return
+            time.sleep(options['loop'])
@@ -0,0 +1,37 @@
+from django.db import models
+from django.utils.translation import gettext_lazy as _
+
+from apps.products.models import Product
+
+
+class Cart(models.Model):
+    """
+    Durable copy of a cart. Live carts are kept in the cart store
+    (``apps.cart.storage``) and written here behind it, see ``persist``.
+    """
+    # "user:<id>" or "session:<session key>", as used by the cart store
+    key = models.CharField(max_length=80, unique=True)
+    updated_at = models.DateTimeField(auto_now=True)
+
+    class Meta:
+        verbose_name = _('cart')
+        verbose_name_plural = _('carts')
+
+    def __str__(self):
+        return self.key
+
+
+class CartItem(models.Model):
+    cart = models.ForeignKey(Cart, on_delete=models.CASCADE, related_name='items')
+    product = models.ForeignKey(Product, on_delete=models.CASCADE, related_name='cart_items')
+    quantity = models.PositiveIntegerField()
+
+    class Meta:
+        verbose_name = _('cart item')
+        verbose_name_plural = _('cart items')
+        constraints = [
+            models.UniqueConstraint(fields=['cart', 'product'], name='unique_cart_product'),
+        ]
+
+    def __str__(self):
+        return f"{self.quantity} x {self.product_id}"
@@ -0,0 +1,49 @@
+from django.utils.translation import gettext_lazy as _
+from rest_framework.exceptions import ValidationError
+
+from apps.orders import services as orders
+from apps.orders.models import Order
+
+from .storage import get_cart_store, session_cart_key, user_cart_key
+
+
+def cart_key(request, create=True):
+    """Store key of the requester's cart: by user id, else by session."""
+    if request.user.is_authenticated:
+        return user_cart_key(request.user.pk)
+    session = request.session
+    if session.session_key is None:
+        if not create:
+            return None
+        session.save()
+    return session_cart_key(session.session_key)
+
+
+def merge_session_cart(request, user):
+    """Fold the anonymous cart of this session into ``user``'s cart."""
+    session_key = request.session.session_key
+    if session_key:
+        get_cart_store().merge(session_cart_key(session_key), user_cart_key(user.pk))
+
+
+def checkout_cart(request, idempotency_key):
+    """Place an order for the whole cart, then empty it."""
+    store = get_cart_store()
+    key = user_cart_key(request.user.pk)
+    items = store.get(key)
+    if not items:
+        # a retry after the first attempt already emptied the cart
+        order = Order.objects.filter(
+            user_id=request.user.pk, idempotency_key=idempotency_key).first()
+        if order is None:
+            raise ValidationError({'items': _("the cart is empty")})
+        return order, False
+
+    order, created = orders.checkout(
+        request.user,
+        [{'product': product_id, 'quantity': quantity} for product_id, quantity in items.items()],
+        idempotency_key,
+    )
+    store.clear(key)
+    store.persist(key)
+    return order, created
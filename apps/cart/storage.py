@@ -0,0 +1,399 @@
+"""
+Cart storage.
+
+Live carts are kept in a fast store, one ``{product_id: quantity}`` map per
+cart key ("user:<id>" for signed in users, taken from the token claims, or
+"session:<session key>" for anonymous visitors). The database is written
+behind it: every change marks the cart dirty, and ``persist`` copies dirty
+carts to ``Cart``/``CartItem`` once they have been idle for
+``WRITE_BEHIND_IDLE`` seconds (``flush_carts``) or right before checkout.
+A cart missing from the store is read through from the database.
+
+Backends, chosen by ``CART_STORE['BACKEND']``:
+
+``redis``
+    A hash per cart and a sorted set of dirty carts scored by last write;
+    every mutation is one Lua call.
+``memory``
+    Process local dictionaries, for tests and benchmarks only: every
+    worker would see its own carts and ``flush_carts`` an empty store.
+``database``
+    Writes straight to ``CartItem`` rows, nothing to write behind. The
+    default without Redis, and the baseline the other two are measured
+    against (``benchmark_cart``).
+"""
+import threading
+import time
+
+from django.conf import settings
+from django.db import transaction
+
+from apps.products.models import Product
+
+from .models import Cart, CartItem
+
+# present in every loaded cart hash, tells an empty cart from an unloaded one
+LOADED_FIELD = '_'
+
+APPLY_SCRIPT = """
+if redis.call('EXISTS', KEYS[1]) == 0 then
+    return nil
+end
+local quantity
+if ARGV[3] == '1' then
+    quantity = redis.call('HINCRBY', KEYS[1], ARGV[1], ARGV[2])
+else
+    quantity = tonumber(ARGV[2])
+    if quantity > 0 then
+        redis.call('HSET', KEYS[1], ARGV[1], quantity)
+    end
+end
+if quantity <= 0 then
+    redis.call('HDEL', KEYS[1], ARGV[1])
+    quantity = 0
+end
+redis.call('EXPIRE', KEYS[1], ARGV[5])
+redis.call('ZADD', KEYS[2], ARGV[4], ARGV[6])
+return quantity
+"""
+
+FILL_SCRIPT = """
+if redis.call('EXISTS', KEYS[1]) == 1 then
+    return 0
+end
+redis.call('HSET', KEYS[1], unpack(ARGV, 2))
+redis.call('EXPIRE', KEYS[1], ARGV[1])
+return 1
+"""
+
+CLEAR_SCRIPT = """
+redis.call('DEL', KEYS[1])
+redis.call('HSET', KEYS[1], '_', 1)
+redis.call('EXPIRE', KEYS[1], ARGV[2])
+redis.call('ZADD', KEYS[2], ARGV[1], ARGV[3])
+return 1
+"""
+
+MARK_CLEAN_SCRIPT = """
+local score = redis.call('ZSCORE', KEYS[1], ARGV[1])
+if score and tonumber(score) <= tonumber(ARGV[2]) then
+    redis.call('ZREM', KEYS[1], ARGV[1])
+end
+return 1
+"""
+
+
+def user_cart_key(user_id):
+    return f'user:{user_id}'
+
+
+def session_cart_key(session_key):
+    return f'session:{session_key}'
+
+
+def load_cart(key):
+    """The persisted copy of a cart, ``{}`` if there is none."""
+    return dict(CartItem.objects.filter(cart__key=key).values_list('product_id', 'quantity'))
+
+
+@transaction.atomic
+def save_cart(key, items):
+    """Replace the persisted copy of a cart with ``items``."""
+    if not items:
+        Cart.objects.filter(key=key).delete()
+        return
+    cart, _ = Cart.objects.get_or_create(key=key)
+    # products deleted while sitting in the cart are dropped
+    existing = set(Product.objects.filter(pk__in=items).values_list('pk', flat=True))
+    CartItem.objects.filter(cart=cart).exclude(product_id__in=existing).delete()
+    CartItem.objects.bulk_create(
+        [CartItem(cart=cart, product_id=product_id, quantity=quantity)
+         for product_id, quantity in items.items() if product_id in existing],
+        update_conflicts=True,
+        unique_fields=['cart', 'product'],
+        update_fields=['quantity'],
+    )
+    cart.save(update_fields=['updated_at'])
+
+
+class CartStore:
+    """Read-through and write-behind logic shared by the fast stores."""
+
+    write_behind = True
+    # seen by every process, not only the one holding it
+    shared = True
+
+    def __init__(self, ttl=7 * 24 * 3600):
+        self.ttl = ttl
+
+    # backend primitives
+
+    def read(self, key):
+        """Items of a loaded cart, ``None`` when not in the store."""
+        raise NotImplementedError
+
+    def fill(self, key, items):
+        """Load ``items`` into the store unless the cart is already there."""
+        raise NotImplementedError
+
+    def apply(self, key, product_id, quantity, increment):
+        """New quantity of the line, or ``None`` when the cart is not loaded."""
+        raise NotImplementedError
+
+    def clear(self, key):
+        raise NotImplementedError
+
+    def discard(self, key):
+        """Forget a cart without marking it dirty."""
+        raise NotImplementedError
+
+    def snapshot(self, key):
+        """``(items or None, dirty stamp or None)``, read atomically."""
+        raise NotImplementedError
+
+    def mark_clean(self, key, stamp):
+        """Drop the dirty mark unless the cart changed after ``stamp``."""
+        raise NotImplementedError
+
+    def dirty(self, idle_before, limit):
+        """Keys of dirty carts last written before ``idle_before``."""
+        raise NotImplementedError
+
+    # public API
+
+    def get(self, key):
+        items = self.read(key)
+        if items is None:
+            items = load_cart(key)
+            self.fill(key, items)
+        return items
+
+    def add(self, key, product_id, quantity=1):
+        return self.update(key, product_id, quantity, increment=True)
+
+    def set(self, key, product_id, quantity):
+        return self.update(key, product_id, quantity, increment=False)
+
+    def remove(self, key, product_id):
+        return self.update(key, product_id, 0, increment=False)
+
+    def update(self, key, product_id, quantity, increment):
+        result = self.apply(key, product_id, quantity, increment)
+        if result is None:
+            self.fill(key, load_cart(key))
+            result = self.apply(key, product_id, quantity, increment)
+        return result
+
+    def merge(self, source, target):
+        """Move the lines of cart ``source`` into ``target`` (adding quantities)."""
+        items = self.get(source)
+        for product_id, quantity in items.items():
+            self.add(target, product_id, quantity)
+        self.discard(source)
+        Cart.objects.filter(key=source).delete()
+        return bool(items)
+
+    def persist(self, key):
+        items, stamp = self.snapshot(key)
+        if stamp is None:
+            return False
+        if items is not None:
+            save_cart(key, items)
+        self.mark_clean(key, stamp)
+        return True
+
+    def flush_idle(self, idle_seconds, limit=1000):
+        """Persist carts untouched for ``idle_seconds``. Returns the count."""
+        keys = self.dirty(time.time() - idle_seconds, limit)
+        for key in keys:
+            self.persist(key)
+        return len(keys)
+
+
+class MemoryCartStore(CartStore):
+    shared = False
+
+    def __init__(self, ttl=None):
+        super().__init__(ttl)
+        self.carts = {}
+        self.dirty_at = {}
+        self.lock = threading.Lock()
+
+    def read(self, key):
+        with self.lock:
+            items = self.carts.get(key)
+            return dict(items) if items is not None else None
+
+    def fill(self, key, items):
+        with self.lock:
+            self.carts.setdefault(key, dict(items))
+
+    def apply(self, key, product_id, quantity, increment):
+        with self.lock:
+            items = self.carts.get(key)
+            if items is None:
+                return None
+            if increment:
+                quantity += items.get(product_id, 0)
+            if quantity > 0:
+                items[product_id] = quantity
+            else:
+                items.pop(product_id, None)
+                quantity = 0
+            self.dirty_at[key] = time.time()
+            return quantity
+
+    def clear(self, key):
+        with self.lock:
+            self.carts[key] = {}
+            self.dirty_at[key] = time.time()
+
+    def discard(self, key):
+        with self.lock:
+            self.carts.pop(key, None)
+            self.dirty_at.pop(key, None)
+
+    def snapshot(self, key):
+        with self.lock:
+            items = self.carts.get(key)
+            return (dict(items) if items is not None else None), self.dirty_at.get(key)
+
+    def mark_clean(self, key, stamp):
+        with self.lock:
+            if self.dirty_at.get(key, stamp + 1) <= stamp:
+                del self.dirty_at[key]
+
+    def dirty(self, idle_before, limit):
+        with self.lock:
+            return [key for key, at in self.dirty_at.items() if at <= idle_before][:limit]
+
+
+class RedisCartStore(CartStore):
+
+    def __init__(self, ttl, prefix='cart'):
+        from django_redis import get_redis_connection
+
+        super().__init__(ttl)
+        self.redis = get_redis_connection('default')
+        self.prefix = prefix
+        self.dirty_key = f'{prefix}:dirty'
+        self.apply_script = self.redis.register_script(APPLY_SCRIPT)
+        self.fill_script = self.redis.register_script(FILL_SCRIPT)
+        self.clear_script = self.redis.register_script(CLEAR_SCRIPT)
+        self.mark_clean_script = self.redis.register_script(MARK_CLEAN_SCRIPT)
+
+    def hash_key(self, key):
+        return f'{self.prefix}:{key}'
+
+    @staticmethod
+    def decode(fields):
+        return {int(product_id): int(quantity) for product_id, quantity in fields.items()
+                if product_id != LOADED_FIELD.encode()}
+
+    def read(self, key):
+        fields = self.redis.hgetall(self.hash_key(key))
+        return self.decode(fields) if fields else None
+
+    def fill(self, key, items):
+        values = [LOADED_FIELD, 1]
+        for product_id, quantity in items.items():
+            values += [product_id, quantity]
+        self.fill_script(keys=[self.hash_key(key)], args=[self.ttl, *values])
+
+    def apply(self, key, product_id, quantity, increment):
+        return self.apply_script(
+            keys=[self.hash_key(key), self.dirty_key],
+            args=[product_id, quantity, '1' if increment else '0', time.time(), self.ttl, key])
+
+    def clear(self, key):
+        self.clear_script(keys=[self.hash_key(key), self.dirty_key],
+                          args=[time.time(), self.ttl, key])
+
+    def discard(self, key):
+        pipeline = self.redis.pipeline()
+        pipeline.delete(self.hash_key(key))
+        pipeline.zrem(self.dirty_key, key)
+        pipeline.execute()
+
+    def snapshot(self, key):
+        pipeline = self.redis.pipeline()
+        pipeline.hgetall(self.hash_key(key))
+        pipeline.zscore(self.dirty_key, key)
+        fields, stamp = pipeline.execute()
+        return (self.decode(fields) if fields else None), stamp
+
+    def mark_clean(self, key, stamp):
+        self.mark_clean_script(keys=[self.dirty_key], args=[key, stamp])
+
+    def dirty(self, idle_before, limit):
+        keys = self.redis.zrangebyscore(self.dirty_key, '-inf', idle_before, start=0, num=limit)
+        return [key.decode() for key in keys]
+
+
+class DatabaseCartStore(CartStore):
+    """Every operation is a database write; nothing is ever dirty."""
+
+    write_behind = False
+
+    def get(self, key):
+        return load_cart(key)
+
+    @transaction.atomic
+    def update(self, key, product_id, quantity, increment):
+        cart, _ = Cart.objects.get_or_create(key=key)
+        item = CartItem.objects.select_for_update().filter(cart=cart, product_id=product_id).first()
+        if increment:
+            quantity += item.quantity if item else 0
+        if quantity <= 0:
+            if item:
+                item.delete()
+            return 0
+        if item:
+            item.quantity = quantity
+            item.save(update_fields=['quantity'])
+        else:
+            CartItem.objects.create(cart=cart, product_id=product_id, quantity=quantity)
+        return quantity
+
+    def clear(self, key):
+        Cart.objects.filter(key=key).delete()
+
+    def discard(self, key):
+        pass
+
+    def merge(self, source, target):
+        items = load_cart(source)
+        for product_id, quantity in items.items():
+            self.add(target, product_id, quantity)
+        self.clear(source)
+        return bool(items)
+
+    def persist(self, key):
+        return False
+
+    def flush_idle(self, idle_seconds, limit=1000):
+        return 0
+
+
+BACKENDS = {
+    'redis': RedisCartStore,
+    'memory': MemoryCartStore,
+    'database': DatabaseCartStore,
+}
+
+_store = None
+_store_lock = threading.Lock()
+
+
+def make_cart_store(backend=None):
+    config = settings.CART_STORE
+    return BACKENDS[backend or config['BACKEND']](ttl=config['TTL'])
+
+
+def get_cart_store():
+    global _store
+    if _store is None:
+        with _store_lock:
+            if _store is None:
+                _store = make_cart_store()
+    return _store
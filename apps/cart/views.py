@@ -0,0 +1,103 @@
+from django.utils.translation import gettext_lazy as _
+from rest_framework import permissions, status
+from rest_framework.exceptions import NotFound, ValidationError
+from rest_framework.response import Response
+from rest_framework.views import APIView
+
+from apps.orders.serializers import OrderSerializer
+from apps.products.models import ProductListing
+
+from .serializers import CartItemSerializer, CartQuantitySerializer
+from .services import cart_key, checkout_cart
+from .storage import get_cart_store
+
+MAX_QUANTITY = 100
+
+
+def cart_response(items, status_code=status.HTTP_200_OK):
+    listings = ProductListing.objects.in_bulk(list(items), field_name='product_id')
+    lines = []
+    total = 0
+    for product_id, quantity in items.items():
+        listing = listings.get(product_id)
+        line = {'product': product_id, 'quantity': quantity, 'available': listing is not None}
+        if listing is not None:
+            line_total = listing.price * quantity
+            total += line_total
+            line.update({
+                'name': listing.name,
+                'slug': listing.slug,
+                'price': str(listing.price),
+                'in_stock': listing.in_stock,
+                'line_total': str(line_total),
+            })
+        lines.append(line)
+    return Response({'items': lines, 'total': str(total)}, status=status_code)
+
+
+class CartView(APIView):
+    """The requester's cart, by user or, when anonymous, by session."""
+    permission_classes = [permissions.AllowAny]
+
+    def get(self, request):
+        key = cart_key(request, create=False)
+        return cart_response(get_cart_store().get(key) if key else {})
+
+    def delete(self, request):
+        key = cart_key(request, create=False)
+        if key:
+            get_cart_store().clear(key)
+        return Response(status=status.HTTP_204_NO_CONTENT)
+
+
+class CartItemsView(APIView):
+    permission_classes = [permissions.AllowAny]
+
+    def post(self, request):
+        serializer = CartItemSerializer(data=request.data)
+        serializer.is_valid(raise_exception=True)
+        product_id = serializer.validated_data['product']
+        if not ProductListing.objects.filter(product_id=product_id).exists():
+            raise ValidationError({'product': _("product not available")})
+
+        store = get_cart_store()
+        key = cart_key(request)
+        if store.add(key, product_id, serializer.validated_data['quantity']) > MAX_QUANTITY:
+            store.set(key, product_id, MAX_QUANTITY)
+        return cart_response(store.get(key), status.HTTP_201_CREATED)
+
+
+class CartItemView(APIView):
+    permission_classes = [permissions.AllowAny]
+
+    def put(self, request, product_id):
+        serializer = CartQuantitySerializer(data=request.data)
+        serializer.is_valid(raise_exception=True)
+        store = get_cart_store()
+        key = cart_key(request)
+        if product_id not in store.get(key):
+            raise NotFound()
+        store.set(key, product_id, serializer.validated_data['quantity'])
+        return cart_response(store.get(key))
+
+    patch = put
+
+    def delete(self, request, product_id):
+        key = cart_key(request, create=False)
+        if key:
+            get_cart_store().remove(key, product_id)
+        return Response(status=status.HTTP_204_NO_CONTENT)
+
+
+class CartCheckoutView(APIView):
+    """Order the whole cart. Requires an ``Idempotency-Key`` header."""
+    permission_classes = [permissions.IsAuthenticated]
+
+    def post(self, request):
+        idempotency_key = request.headers.get('Idempotency-Key', '').strip()
+        if not idempotency_key or len(idempotency_key) > 64:
+            raise ValidationError({'Idempotency-Key': _("header required, at most 64 characters")})
+        order, created = checkout_cart(request, idempotency_key)
+        return Response(
+            OrderSerializer(order).data,
+            status=status.HTTP_201_CREATED if created else status.HTTP_200_OK)
@@ -0,0 +1,34 @@
+from django.contrib import admin
+
+from .models import District, Municipality, Province
+
+
+# the bundled fixture is the source of these tables, see load_geography
+class ReadOnlyAdmin(admin.ModelAdmin):
+
+    def has_add_permission(self, request):
+        return False
+
+    def has_change_permission(self, request, obj=None):
+        return False
+
+    def has_delete_permission(self, request, obj=None):
+        return False
+
+
+@admin.register(Province)
+class ProvinceAdmin(ReadOnlyAdmin):
+    list_display = ('id', 'name', 'number')
+
+
+@admin.register(District)
+class DistrictAdmin(ReadOnlyAdmin):
+    list_display = ('id', 'name', 'province')
+    list_filter = ('province',)
+
+
+@admin.register(Municipality)
+class MunicipalityAdmin(ReadOnlyAdmin):
+    list_display = ('id', 'name', 'kind', 'wards', 'district')
+    list_filter = ('kind', 'district__province')
+    search_fields = ('name',)
@@ -0,0 +1,13 @@
+from django.apps import AppConfig
+
+
+class GeographyConfig(AppConfig):
+    default_auto_field = 'django.db.models.BigAutoField'
+    name = 'apps.geography'
+    verbose_name = 'Geography'
+
+    def ready(self):
+        from .hierarchy import get_hierarchy
+
+        # parsed from the bundled fixture, no database access
+        get_hierarchy()
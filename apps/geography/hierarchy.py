@@ -0,0 +1,142 @@
+"""
+In-process copy of Nepal's administrative hierarchy.
+
+The bundled fixture is the source of both the ``Province``/``District``/
+``Municipality`` tables (loaded by migration) and of this read-only copy,
+parsed once per process when the app is ready. Lookups, name matching and
+address validation are dictionary reads, so serializers check a
+province/district/municipality/ward combination without a query.
+
+Names are matched loosely: case, punctuation and suffixes such as
+"Province", "Metropolitan City" or "Rural Municipality" are ignored, and
+the old province numbers and common alternative spellings are accepted.
+"""
+import json
+import re
+from collections import namedtuple
+from pathlib import Path
+from types import MappingProxyType
+
+FIXTURE = Path(__file__).resolve().parent / 'fixtures' / 'nepal_geography.json'
+
+LEVELS = ('province', 'district', 'municipality')
+PARENT = {'district': 'province', 'municipality': 'district'}
+
+# ``wards`` for municipalities, ``number`` for provinces
+Area = namedtuple('Area', ['level', 'id', 'name', 'parent_id', 'wards', 'number'])
+
+SUFFIXES = re.compile(
+    r'\b(province|pradesh|district|jilla|metropolitan city|sub metropolitan city|'
+    r'rural municipality|municipality|mahanagarpalika|upamahanagarpalika|'
+    r'nagarpalika|gaunpalika)$')
+
+# (level, alternative spelling) -> fixture name
+ALIASES = {
+    ('province', 'sudurpaschim'): 'Sudurpashchim',
+    ('province', 'sudur paschim'): 'Sudurpashchim',
+    ('province', 'kosi'): 'Koshi',
+    ('province', 'madhes'): 'Madhesh',
+    ('district', 'kavre'): 'Kavrepalanchok',
+    ('district', 'kabhrepalanchok'): 'Kavrepalanchok',
+    ('district', 'sindhupalchowk'): 'Sindhupalchok',
+    ('district', 'dhanusa'): 'Dhanusha',
+    ('district', 'makawanpur'): 'Makwanpur',
+    ('district', 'tanahu'): 'Tanahun',
+    ('district', 'tehrathum'): 'Terhathum',
+    ('district', 'kapilbastu'): 'Kapilvastu',
+    ('district', 'nawalpur'): 'Nawalparasi (East)',
+    ('district', 'parasi'): 'Nawalparasi (West)',
+    ('district', 'eastern rukum'): 'Rukum (East)',
+    ('district', 'western rukum'): 'Rukum (West)',
+    ('municipality', 'janakpurdham'): 'Janakpur',
+    ('municipality', 'birganj'): 'Birgunj',
+    ('municipality', 'nepalganj'): 'Nepalgunj',
+}
+
+
+def name_key(name):
+    key = re.sub(r'[^\w]+', ' ', str(name).casefold()).strip()
+    return SUFFIXES.sub('', key).strip()
+
+
+class Hierarchy:
+    """Immutable lookup tables over the fixture's areas."""
+
+    def __init__(self, areas):
+        by_id = {level: {} for level in LEVELS}
+        by_name = {}
+        for area in areas:
+            by_id[area.level][area.id] = area
+            by_name.setdefault((area.level, name_key(area.name)), []).append(area)
+        for (level, alias), name in ALIASES.items():
+            by_name.setdefault((level, alias), []).extend(by_name.get((level, name_key(name)), []))
+        for province in by_id['province'].values():
+            for alias in ('province {}', 'province no {}', 'pradesh {}'):
+                by_name.setdefault(('province', alias.format(province.number)), []).append(province)
+
+        self.by_id = MappingProxyType({level: MappingProxyType(areas) for level, areas in by_id.items()})
+        self.by_name = MappingProxyType({key: tuple(areas) for key, areas in by_name.items()})
+
+    def get(self, level, area_id):
+        return self.by_id[level].get(area_id)
+
+    def name(self, level, area_id):
+        area = self.get(level, area_id)
+        return area.name if area else None
+
+    def lookup(self, level, value, parent_id=None):
+        """The area named or numbered ``value``, ``None`` if unknown or ambiguous."""
+        if isinstance(value, int) or str(value).strip().isdigit():
+            return self.get(level, int(value))
+        candidates = self.named(level, value)
+        if parent_id is not None:
+            candidates = [area for area in candidates if area.parent_id == parent_id]
+        return candidates[0] if len(candidates) == 1 else None
+
+    def named(self, level, value):
+        """Every area called ``value``; several for a name used in more than one district."""
+        return self.by_name.get((level, name_key(value)), ())
+
+    def children(self, level, parent_id):
+        child = next(child for child, parent in PARENT.items() if parent == level)
+        return [area for area in self.by_id[child].values() if area.parent_id == parent_id]
+
+
+def fixture_rows(path=FIXTURE):
+    with open(path, encoding='utf-8') as f:
+        return json.load(f)
+
+
+def fixture_objects(get_model, path=FIXTURE):
+    """``{model: [unsaved instances]}`` of the fixture, parents first."""
+    objects = {}
+    for row in fixture_rows(path):
+        model = get_model(row['model'])
+        fields = {model._meta.get_field(name).attname: value
+                  for name, value in row['fields'].items()}
+        objects.setdefault(model, []).append(model(pk=row['pk'], **fields))
+    return objects
+
+
+def read_fixture(path=FIXTURE):
+    for row in fixture_rows(path):
+        level = row['model'].split('.')[1]
+        fields = row['fields']
+        yield Area(
+            level=level,
+            id=row['pk'],
+            name=fields['name'],
+            parent_id=fields.get(PARENT.get(level)),
+            wards=fields.get('wards'),
+            number=fields.get('number'),
+        )
+
+
+_hierarchy = None
+
+
+def get_hierarchy():
+    global _hierarchy
+    if _hierarchy is None:
+        _hierarchy = Hierarchy(read_fixture())
+    return _hierarchy
@@ -0,0 +1,21 @@
+from django.apps import apps
+from django.core.management.base import BaseCommand
+from django.db import transaction
+
+from apps.geography.hierarchy import fixture_objects
+
+
+class Command(BaseCommand):
+    help = (
+        "Insert or update provinces, districts and municipalities from the bundled "
+        "fixture after it was extended. Restart the workers afterwards, they keep "
+        "the hierarchy in memory"
+    )
+
+    @transaction.atomic
+    def handle(self, *args, **options):
+        for model, objects in fixture_objects(apps.get_model).items():
+            fields = [field.name for field in model._meta.concrete_fields if not field.primary_key]
+            model.objects.bulk_create(
+                objects, update_conflicts=True, unique_fields=['id'], update_fields=fields)
+            self.stdout.write(f"{len(objects)} {model._meta.verbose_name_plural}")
@@ -0,0 +1,64 @@
+# Generated by Django 4.2.7 on 2026-10-18 16:11
+
+from django.db import migrations, models
+import django.db.models.deletion
+
+
+class Migration(migrations.Migration):
+
+    initial = True
+
+    dependencies = [
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='District',
+            fields=[
+                ('id', models.PositiveSmallIntegerField(primary_key=True, serialize=False)),
+                ('name', models.CharField(max_length=50, unique=True)),
+            ],
+            options={
+                'verbose_name': 'district',
+                'verbose_name_plural': 'districts',
+                'ordering': ['id'],
+            },
+        ),
+        migrations.CreateModel(
+            name='Province',
+            fields=[
+                ('id', models.PositiveSmallIntegerField(primary_key=True, serialize=False)),
+                ('name', models.CharField(max_length=50, unique=True)),
+                ('number', models.PositiveSmallIntegerField(unique=True)),
+            ],
+            options={
+                'verbose_name': 'province',
+                'verbose_name_plural': 'provinces',
+                'ordering': ['id'],
+            },
+        ),
+        migrations.CreateModel(
+            name='Municipality',
+            fields=[
+                ('id', models.PositiveIntegerField(primary_key=True, serialize=False)),
+                ('name', models.CharField(max_length=100)),
+                ('kind', models.CharField(choices=[('metropolitan', 'Metropolitan city'), ('sub_metropolitan', 'Sub-metropolitan city'), ('municipality', 'Municipality'), ('rural_municipality', 'Rural municipality')], max_length=20)),
+                ('wards', models.PositiveSmallIntegerField()),
+                ('district', models.ForeignKey(on_delete=django.db.models.deletion.PROTECT, related_name='municipalities', to='geography.district')),
+            ],
+            options={
+                'verbose_name': 'municipality',
+                'verbose_name_plural': 'municipalities',
+                'ordering': ['id'],
+            },
+        ),
+        migrations.AddField(
+            model_name='district',
+            name='province',
+            field=models.ForeignKey(on_delete=django.db.models.deletion.PROTECT, related_name='districts', to='geography.province'),
+        ),
+        migrations.AddConstraint(
+            model_name='municipality',
+            constraint=models.UniqueConstraint(fields=('district', 'name'), name='unique_municipality_name'),
+        ),
+    ]
@@ -0,0 +1,24 @@
+from django.db import migrations
+
+from apps.geography.hierarchy import fixture_objects
+
+
+def load(apps, schema_editor):
+    for model, objects in fixture_objects(apps.get_model).items():
+        model.objects.bulk_create(objects)
+
+
+def unload(apps, schema_editor):
+    for model in reversed(list(fixture_objects(apps.get_model))):
+        model.objects.all().delete()
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('geography', '0001_initial'),
+    ]
+
+    operations = [
+        migrations.RunPython(load, unload),
+    ]
@@ -0,0 +1,58 @@
+from django.db import models
+from django.utils.translation import gettext_lazy as _
+
+
+class Province(models.Model):
+    """Loaded from ``fixtures/nepal_geography.json``, ids are stable."""
+    id = models.PositiveSmallIntegerField(primary_key=True)
+    name = models.CharField(max_length=50, unique=True)
+    # the number provinces went by before they were named
+    number = models.PositiveSmallIntegerField(unique=True)
+
+    class Meta:
+        verbose_name = _('province')
+        verbose_name_plural = _('provinces')
+        ordering = ['id']
+
+    def __str__(self):
+        return self.name
+
+
+class District(models.Model):
+    id = models.PositiveSmallIntegerField(primary_key=True)
+    province = models.ForeignKey(Province, on_delete=models.PROTECT, related_name='districts')
+    name = models.CharField(max_length=50, unique=True)
+
+    class Meta:
+        verbose_name = _('district')
+        verbose_name_plural = _('districts')
+        ordering = ['id']
+
+    def __str__(self):
+        return self.name
+
+
+class Municipality(models.Model):
+
+    class Kind(models.TextChoices):
+        METROPOLITAN = 'metropolitan', _('Metropolitan city')
+        SUB_METROPOLITAN = 'sub_metropolitan', _('Sub-metropolitan city')
+        MUNICIPALITY = 'municipality', _('Municipality')
+        RURAL_MUNICIPALITY = 'rural_municipality', _('Rural municipality')
+
+    id = models.PositiveIntegerField(primary_key=True)
+    district = models.ForeignKey(District, on_delete=models.PROTECT, related_name='municipalities')
+    name = models.CharField(max_length=100)
+    kind = models.CharField(max_length=20, choices=Kind.choices)
+    wards = models.PositiveSmallIntegerField()
+
+    class Meta:
+        verbose_name = _('municipality')
+        verbose_name_plural = _('municipalities')
+        ordering = ['id']
+        constraints = [
+            models.UniqueConstraint(fields=['district', 'name'], name='unique_municipality_name'),
+        ]
+
+    def __str__(self):
+        return self.name
@@ -0,0 +1,100 @@
+from django.utils.translation import gettext_lazy as _
+from rest_framework import serializers
+
+from .hierarchy import LEVELS, PARENT, Area, get_hierarchy
+
+ADDRESS_FIELDS = ('province_id', 'district_id', 'municipality_id', 'ward_no')
+
+
+class AreaField(serializers.Field):
+    """
+    A province, district or municipality given by id or by name, read as
+    the ``<level>_name`` column. A known area is written as its ``Area``,
+    which ``validate_address`` turns into the ``<level>_id`` and
+    ``<level>_name`` columns; a name several areas share is kept as given
+    for ``validate_address`` to pick by parent. Checked against the
+    in-process hierarchy, never the database.
+    """
+    default_error_messages = {
+        'invalid': _('unknown {level} "{value}"'),
+    }
+
+    def __init__(self, level, **kwargs):
+        self.level = level
+        kwargs.setdefault('source', f'{level}_name')
+        kwargs.setdefault('required', False)
+        kwargs.setdefault('allow_null', True)
+        super().__init__(**kwargs)
+
+    def to_internal_value(self, data):
+        if data == '':
+            return ''
+        hierarchy = get_hierarchy()
+        area = hierarchy.lookup(self.level, data)
+        if area is not None:
+            return area
+        if isinstance(data, str) and not data.strip().isdigit() and hierarchy.named(self.level, data):
+            return data.strip()
+        self.fail('invalid', level=self.level, value=data)
+
+    def to_representation(self, value):
+        return value or None
+
+
+def validate_address(data, instance=None):
+    """
+    Check that province, district, municipality and ward of ``data`` (on
+    top of ``instance`` for partial updates) agree, filling in the parents
+    of the most specific area given and the ``<level>_name`` of every area
+    set. Raises ``ValidationError``.
+    """
+    hierarchy = get_hierarchy()
+    for level in LEVELS:
+        if f'{level}_name' in data:
+            value = data[f'{level}_name']
+            if value and not isinstance(value, Area):
+                # a name shared by areas of several parents, AreaField let it through
+                parent = PARENT[level]
+                parent_id = data.get(f'{parent}_id', getattr(instance, f'{parent}_id', None))
+                value = hierarchy.lookup(level, value, parent_id=parent_id) if parent_id else None
+                if value is None:
+                    raise serializers.ValidationError({level: _(
+                        "%(name)s is the name of several areas, give the %(parent)s") % {
+                        'name': data[f'{level}_name'], 'parent': parent}})
+            data[f'{level}_id'] = value.id if value else None
+            data[f'{level}_name'] = value.name if value else ''
+
+    address = {field: getattr(instance, field, None) for field in ADDRESS_FIELDS}
+    given = {field for field in ADDRESS_FIELDS if field in data}
+    address.update((field, data[field]) for field in given)
+    errors = {}
+
+    for level, parent in (('municipality', 'district'), ('district', 'province')):
+        area = hierarchy.get(level, address[f'{level}_id'])
+        if area is None:
+            continue
+        parent_field = f'{parent}_id'
+        if parent_field not in given and (f'{level}_id' in given or address[parent_field] is None):
+            # a new area moves its parents along
+            address[parent_field] = area.parent_id
+            given.add(parent_field)
+        elif address[parent_field] != area.parent_id:
+            errors[level] = _("%(name)s is not in this %(parent)s") % {
+                'name': area.name, 'parent': parent}
+
+    municipality = hierarchy.get('municipality', address['municipality_id'])
+    ward_no = address['ward_no']
+    if ward_no is not None and given & {'municipality_id', 'ward_no'}:
+        if municipality is None:
+            errors['ward_no'] = _("a ward needs a municipality")
+        elif not 1 <= ward_no <= municipality.wards:
+            errors['ward_no'] = _("%(name)s has wards 1 to %(wards)d") % {
+                'name': municipality.name, 'wards': municipality.wards}
+
+    if errors:
+        raise serializers.ValidationError(errors)
+    data.update((field, address[field]) for field in given)
+    for level in LEVELS:
+        if data.get(f'{level}_id') is not None:
+            data[f'{level}_name'] = hierarchy.name(level, data[f'{level}_id'])
+    return data
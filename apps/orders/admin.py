@@ -0,0 +1,63 @@
+from django.contrib import admin
+from .models import ArchivedOrder, HourlySales, Order, OrderItem, SaleEvent, StockReservation
+
+
+class OrderItemInline(admin.TabularInline):
+    model = OrderItem
+    extra = 0
+    raw_id_fields = ('product',)
+
+
+@admin.register(Order)
+class OrderAdmin(admin.ModelAdmin):
+    list_display = ('id', 'user', 'status', 'total', 'expires_at', 'created_at')
+    list_filter = ('status',)
+    search_fields = ('user__email', 'idempotency_key')
+    raw_id_fields = ('user',)
+    readonly_fields = ('request_hash', 'created_at', 'updated_at')
+    inlines = [OrderItemInline]
+
+
+@admin.register(StockReservation)
+class StockReservationAdmin(admin.ModelAdmin):
+    list_display = ('id', 'product', 'order', 'quantity', 'status', 'expires_at')
+    list_filter = ('status',)
+    raw_id_fields = ('product', 'order')
+
+
+@admin.register(ArchivedOrder)
+class ArchivedOrderAdmin(admin.ModelAdmin):
+    list_display = ('id', 'user', 'status', 'total', 'created_at', 'archived_at')
+    list_filter = ('status',)
+    search_fields = ('user__email', 'idempotency_key')
+    raw_id_fields = ('user',)
+
+    def has_add_permission(self, request):
+        return False
+
+    def has_change_permission(self, request, obj=None):
+        return False
+
+
+@admin.register(SaleEvent)
+class SaleEventAdmin(admin.ModelAdmin):
+    list_display = ('id', 'order_id', 'seller_id', 'product_name', 'quantity', 'revenue', 'created_at')
+    search_fields = ('=order_id', '=seller_id')
+
+    def has_add_permission(self, request):
+        return False
+
+    def has_change_permission(self, request, obj=None):
+        return False
+
+
+@admin.register(HourlySales)
+class HourlySalesAdmin(admin.ModelAdmin):
+    list_display = ('hour', 'seller_id', 'product_name', 'orders', 'units', 'revenue')
+    search_fields = ('=seller_id', 'product_name')
+
+    def has_add_permission(self, request):
+        return False
+
+    def has_change_permission(self, request, obj=None):
+        return False
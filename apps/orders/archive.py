@@ -0,0 +1,182 @@
+"""
+Order history archival.
+
+Closed orders (confirmed, cancelled, expired) created before a cutoff are
+moved out of the hot ``Order`` table in batches by ``archive_orders``,
+either into ``ArchivedOrder`` with their items folded into a JSON column,
+or into gzipped JSON Lines files, one per month. Each batch is copied and
+deleted in one transaction; rows are taken with ``SKIP LOCKED`` so the
+command can run next to checkout and next to another copy of itself. A
+batch written to files whose delete then fails is written again by the
+next run, so readers of the files must tolerate a repeated order id.
+
+On PostgreSQL ``ArchivedOrder`` is partitioned by month of ``created_at``
+(migration 0003) and ``ensure_partitions`` creates the monthly partitions
+before rows move in; anything outside them lands in the default partition.
+SQLite keeps one plain table.
+
+``user_orders`` and ``find_order`` route reads: "my orders" lists come
+from the hot table, which stays small, and a lookup by id falls back to
+the archive for orders that have been moved.
+"""
+import gzip
+import json
+from collections import defaultdict
+from datetime import datetime
+from pathlib import Path
+
+from django.conf import settings
+from django.db import connection, transaction
+from django.utils import timezone
+
+from .models import ArchivedOrder, Order, OrderItem
+
+CLOSED = (Order.Status.CONFIRMED, Order.Status.CANCELLED, Order.Status.EXPIRED)
+
+
+def archive_directory():
+    return Path(getattr(settings, 'ORDER_ARCHIVE_DIR', settings.BASE_DIR / 'archive' / 'orders'))
+
+
+def month_start(value):
+    return value.replace(day=1, hour=0, minute=0, second=0, microsecond=0)
+
+
+def add_months(value, months):
+    month = value.month - 1 + months
+    return value.replace(year=value.year + month // 12, month=month % 12 + 1)
+
+
+def cutoff(months, now=None):
+    """Start of the month ``months`` months before ``now``."""
+    return add_months(month_start(timezone.localtime(now or timezone.now())), -months)
+
+
+def partition_name(month):
+    return f'{ArchivedOrder._meta.db_table}_{month:%Y_%m}'
+
+
+def ensure_partitions(start, stop):
+    """Create the monthly partitions covering ``[start, stop)``. PostgreSQL only."""
+    if connection.vendor != 'postgresql':
+        return []
+    table = ArchivedOrder._meta.db_table
+    created = []
+    month = month_start(timezone.localtime(start))
+    with connection.cursor() as cursor:
+        while month < stop:
+            following = add_months(month, 1)
+            cursor.execute(
+                f'CREATE TABLE IF NOT EXISTS {partition_name(month)} '
+                f'PARTITION OF {table} FOR VALUES FROM (%s) TO (%s)',
+                [month, following])
+            created.append(partition_name(month))
+            month = following
+    return created
+
+
+def archive_rows(orders):
+    """Plain dicts of ``orders`` with their items, ready for the archive."""
+    items = defaultdict(list)
+    for item in (OrderItem.objects
+                 .filter(order__in=[order.pk for order in orders])
+                 .order_by('pk')
+                 .values('order_id', 'product_id', 'product_name', 'unit_price', 'quantity')):
+        items[item['order_id']].append({
+            'product': item['product_id'],
+            'product_name': item['product_name'],
+            'unit_price': str(item['unit_price']),
+            'quantity': item['quantity'],
+        })
+    return [{
+        'id': order.pk,
+        'user_id': order.user_id,
+        'status': order.status,
+        'total': order.total,
+        'idempotency_key': order.idempotency_key,
+        'items': items[order.pk],
+        'created_at': order.created_at,
+        'updated_at': order.updated_at,
+    } for order in orders]
+
+
+def to_table(rows):
+    # already archived by an earlier, interrupted run: keep that copy
+    ArchivedOrder.objects.bulk_create(
+        [ArchivedOrder(**row) for row in rows], ignore_conflicts=True)
+
+
+def to_files(rows, directory):
+    directory.mkdir(parents=True, exist_ok=True)
+    months = defaultdict(list)
+    for row in rows:
+        months[f'{timezone.localtime(row["created_at"]):%Y-%m}'].append(row)
+    for month, group in months.items():
+        # gzip members concatenate, appending a batch keeps the file readable
+        with gzip.open(directory / f'orders-{month}.jsonl.gz', 'at', encoding='utf-8') as f:
+            for row in group:
+                f.write(json.dumps({
+                    **row,
+                    'total': str(row['total']),
+                    'created_at': row['created_at'].isoformat(),
+                    'updated_at': row['updated_at'].isoformat(),
+                }) + '\n')
+
+
+def archive_batch(before, batch_size=1000, to='table', directory=None):
+    """Move one batch of closed orders created before ``before``. Returns the count."""
+    with transaction.atomic():
+        orders = list(
+            Order.objects
+            .select_for_update(skip_locked=True)
+            .filter(status__in=CLOSED, created_at__lt=before)
+            .order_by('created_at')[:batch_size]
+        )
+        if not orders:
+            return 0
+        rows = archive_rows(orders)
+        if to == 'table':
+            to_table(rows)
+        else:
+            to_files(rows, directory or archive_directory())
+        # items and reservations go with their order
+        Order.objects.filter(pk__in=[order.pk for order in orders]).delete()
+    return len(orders)
+
+
+def archive_orders(before, batch_size=1000, to='table', directory=None):
+    """Move every closed order created before ``before``. Returns the count."""
+    if to == 'table':
+        oldest = (Order.objects.filter(status__in=CLOSED, created_at__lt=before)
+                  .order_by('created_at').values_list('created_at', flat=True).first())
+        if oldest is not None:
+            ensure_partitions(oldest, before)
+    total = 0
+    while count := archive_batch(before, batch_size, to, directory):
+        total += count
+    return total
+
+
+def read_archive_file(path):
+    """Yield the orders of an ``orders-YYYY-MM.jsonl.gz`` file as dicts."""
+    with gzip.open(path, 'rt', encoding='utf-8') as f:
+        for line in f:
+            row = json.loads(line)
+            row['created_at'] = datetime.fromisoformat(row['created_at'])
+            row['updated_at'] = datetime.fromisoformat(row['updated_at'])
+            yield row
+
+
+def user_orders(user_id, archived=False):
+    """A user's orders, newest first, from the hot table or from the archive."""
+    if archived:
+        return ArchivedOrder.objects.filter(user_id=user_id)
+    return Order.objects.filter(user_id=user_id).prefetch_related('items')
+
+
+def find_order(user_id, pk):
+    """The user's order ``pk``, live or archived, or ``None``."""
+    order = user_orders(user_id).filter(pk=pk).first()
+    if order is None:
+        order = user_orders(user_id, archived=True).filter(pk=pk).first()
+    return order
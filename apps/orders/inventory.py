@@ -0,0 +1,226 @@
+"""
+Stock reservation without long-held row locks.
+
+Stock is taken with a single conditional statement,
+``UPDATE ... SET quantity = quantity - n WHERE quantity >= n``, which can
+never drive a counter negative and holds the row lock only for the
+statement. Hot products can be split into ``StockShard`` rows
+(``shard_stock``) so concurrent checkouts decrement different rows; only a
+request larger than any single shard falls back to locking all of them.
+
+Reservations expire after ``ORDER_RESERVATION_TTL`` seconds unless
+committed, and ``expire_reservations`` returns their stock in batches.
+Listings are refreshed after commit when a product sells out or comes back;
+those refreshes are best effort (``robust``) and never fail a reservation.
+"""
+import random
+from collections import defaultdict
+from datetime import timedelta
+
+from django.conf import settings
+from django.db import transaction
+from django.db.models import F
+from django.utils import timezone
+from django.utils.translation import gettext_lazy as _
+from rest_framework import status
+from rest_framework.exceptions import APIException
+
+from apps.products.models import Product, ProductListing, StockShard
+from apps.products.read_model import refresh_listing
+
+from .models import Order, StockReservation
+
+
+class OutOfStock(APIException):
+    status_code = status.HTTP_409_CONFLICT
+    default_detail = _("not enough stock")
+    default_code = 'out_of_stock'
+
+
+def reservation_ttl():
+    return timedelta(seconds=getattr(settings, 'ORDER_RESERVATION_TTL', 900))
+
+
+def sold_out(product_id):
+    """Whether neither the product nor any of its shards has stock left."""
+    return (Product.objects.filter(pk=product_id, stock=0)
+            .exclude(stock_shards__quantity__gt=0).exists())
+
+
+def take_from_shard(product_id, quantity):
+    # a plain read, shards that looked big enough may be drained by the time
+    # they are updated and are then skipped
+    shards = list(
+        StockShard.objects
+        .filter(product_id=product_id, quantity__gte=quantity)
+        .values_list('pk', flat=True)
+    )
+    random.shuffle(shards)
+    for pk in shards:
+        if StockShard.objects.filter(pk=pk, quantity__gte=quantity).update(
+                quantity=F('quantity') - quantity):
+            return True
+    return False
+
+
+def take(product_id, quantity):
+    """Remove ``quantity`` units of stock, or raise ``OutOfStock``."""
+    if not (take_from_shard(product_id, quantity)
+            or Product.objects.filter(pk=product_id, stock__gte=quantity).update(
+                stock=F('stock') - quantity)
+            or gather(product_id, quantity)):
+        raise OutOfStock()
+    # whichever path took the last unit
+    if sold_out(product_id):
+        transaction.on_commit(lambda: refresh_listing(product_id), robust=True)
+
+
+@transaction.atomic
+def gather(product_id, quantity):
+    """Take ``quantity`` spread over several shards. Locks the product's rows."""
+    product = Product.objects.select_for_update().filter(pk=product_id).first()
+    shards = list(StockShard.objects.select_for_update()
+                  .filter(product_id=product_id, quantity__gt=0).order_by('shard'))
+    if product is None or product.stock + sum(s.quantity for s in shards) < quantity:
+        return False
+
+    needed = quantity
+    taken = min(product.stock, needed)
+    if taken:
+        Product.objects.filter(pk=product_id).update(stock=F('stock') - taken)
+        needed -= taken
+    for shard in shards:
+        if not needed:
+            break
+        taken = min(shard.quantity, needed)
+        StockShard.objects.filter(pk=shard.pk).update(quantity=F('quantity') - taken)
+        needed -= taken
+    return True
+
+
+def put_back(quantities):
+    """Return ``{product_id: quantity}`` to the unallocated stock."""
+    for product_id, quantity in quantities.items():
+        Product.objects.filter(pk=product_id).update(stock=F('stock') + quantity)
+    product_ids = list(quantities)
+
+    def refresh():
+        out_of_stock = ProductListing.objects.filter(
+            product_id__in=product_ids, in_stock=False).values_list('product_id', flat=True)
+        for product_id in out_of_stock:
+            refresh_listing(product_id)
+
+    transaction.on_commit(refresh, robust=True)
+
+
+def reserve(product_id, quantity, order=None, ttl=None):
+    """Take stock and record it as a ``StockReservation``."""
+    try:
+        with transaction.atomic():
+            take(product_id, quantity)
+            return StockReservation.objects.create(
+                product_id=product_id,
+                order=order,
+                quantity=quantity,
+                expires_at=timezone.now() + (ttl or reservation_ttl()),
+            )
+    except OutOfStock:
+        # scheduled here, a refresh scheduled inside the block above would be
+        # rolled back with it
+        if (ProductListing.objects.filter(product_id=product_id, in_stock=True).exists()
+                and sold_out(product_id)):
+            transaction.on_commit(lambda: refresh_listing(product_id), robust=True)
+        raise
+
+
+def release(reservations, to_status=StockReservation.Status.RELEASED):
+    """Give back the stock of ``reservations`` that still hold some."""
+    holding = [r for r in reservations if r.status in (
+        StockReservation.Status.ACTIVE, StockReservation.Status.COMMITTED)]
+    if not holding:
+        return
+    quantities = defaultdict(int)
+    for reservation in holding:
+        quantities[reservation.product_id] += reservation.quantity
+        reservation.status = to_status
+    with transaction.atomic():
+        StockReservation.objects.filter(pk__in=[r.pk for r in holding]).update(status=to_status)
+        put_back(quantities)
+
+
+def commit(reservations):
+    """Keep the stock of the active ``reservations``. Returns how many were."""
+    return StockReservation.objects.filter(
+        pk__in=[r.pk for r in reservations], status=StockReservation.Status.ACTIVE,
+    ).update(status=StockReservation.Status.COMMITTED)
+
+
+def expire_reservations(batch_size=500, now=None):
+    """
+    Release active reservations past their expiry and expire the pending
+    orders they belong to. Works in batches of short transactions; rows
+    locked by another sweeper or by ``confirm`` are skipped. Orders are
+    locked before their reservations, the order ``confirm`` takes them in.
+    Returns the number released.
+    """
+    now = now or timezone.now()
+    expired = StockReservation.objects.filter(
+        status=StockReservation.Status.ACTIVE, expires_at__lte=now)
+    count = 0
+    while True:
+        with transaction.atomic():
+            orders = list(
+                Order.objects
+                .select_for_update(skip_locked=True)
+                .filter(status=Order.Status.PENDING, pk__in=expired.values('order_id'))
+                .order_by('pk')
+                .values_list('pk', flat=True)[:batch_size]
+            )
+            batch = list(
+                StockReservation.objects
+                .select_for_update()
+                .filter(order_id__in=orders, status=StockReservation.Status.ACTIVE)
+                .order_by('pk')
+            )
+            release(batch, to_status=StockReservation.Status.EXPIRED)
+            Order.objects.filter(pk__in=orders).update(status=Order.Status.EXPIRED)
+        count += len(batch)
+        if len(orders) < batch_size:
+            break
+
+    # left behind by a checkout that died before writing its order
+    while True:
+        with transaction.atomic():
+            batch = list(
+                expired
+                .select_for_update(skip_locked=True)
+                .filter(order__isnull=True)
+                .order_by('expires_at')[:batch_size]
+            )
+            release(batch, to_status=StockReservation.Status.EXPIRED)
+        count += len(batch)
+        if len(batch) < batch_size:
+            return count
+
+
+@transaction.atomic
+def shard_stock(product_id, shards):
+    """
+    Spread a product's stock evenly over ``shards`` shard rows, or fold it
+    back into ``Product.stock`` with ``shards=0``. Also used to rebalance.
+    """
+    product = Product.objects.select_for_update().get(pk=product_id)
+    existing = list(StockShard.objects.select_for_update().filter(product_id=product_id))
+    total = product.stock + sum(shard.quantity for shard in existing)
+
+    StockShard.objects.filter(product_id=product_id, shard__gte=shards).delete()
+    if not shards:
+        Product.objects.filter(pk=product_id).update(stock=total)
+        return
+
+    per_shard, remainder = divmod(total, shards)
+    for shard in range(shards):
+        StockShard.objects.update_or_create(
+            product_id=product_id, shard=shard,
+            defaults={'quantity': per_shard + (1 if shard < remainder else 0)})
+    Product.objects.filter(pk=product_id).update(stock=0)
@@ -0,0 +1,29 @@
+import time
+from pathlib import Path
+
+from django.core.management.base import BaseCommand
+
+from apps.orders.archive import archive_directory, archive_orders, cutoff
+
+
+class Command(BaseCommand):
+    help = "Move closed orders older than N months out of the order table, in batches"
+
+    def add_arguments(self, parser):
+        parser.add_argument('--months', type=int, default=12,
+                            help="archive orders created before the start of the month N months ago")
+        parser.add_argument('--batch-size', type=int, default=1000)
+        parser.add_argument('--to', choices=['table', 'jsonl'], default='table',
+                            help="the archived order table or gzipped JSON Lines files")
+        parser.add_argument('--directory', type=Path,
+                            help="where --to jsonl writes, ORDER_ARCHIVE_DIR by default")
+
+    def handle(self, *args, **options):
+        before = cutoff(options['months'])
+        started = time.perf_counter()
+        count = archive_orders(
+            before, batch_size=options['batch_size'], to=options['to'],
+            directory=options['directory'] or archive_directory())
+        self.stdout.write(
+            f"archived {count} orders created before {before:%Y-%m-%d} "
+            f"to {options['to']} in {time.perf_counter() - started:.1f}s")
@@ -0,0 +1,149 @@
+import random
+import statistics
+import time
+from contextlib import contextmanager
+from datetime import timedelta
+from decimal import Decimal
+
+from django.core.management.base import BaseCommand
+from django.db import connection, transaction
+from django.utils import timezone
+
+from apps.orders.archive import archive_orders, cutoff, find_order, user_orders
+from apps.orders.models import ArchivedOrder, Order, OrderItem
+from apps.users.models import User
+
+DOMAIN = 'orders.test'
+
+PAGE_SIZE = 20
+
+
+@contextmanager
+def historical_timestamps():
+    """Let bulk_create keep the ``created_at``/``updated_at`` it is given."""
+    fields = [Order._meta.get_field(name) for name in ('created_at', 'updated_at')]
+    saved = [(field.auto_now, field.auto_now_add) for field in fields]
+    for field in fields:
+        field.auto_now = field.auto_now_add = False
+    try:
+        yield
+    finally:
+        for field, (auto_now, auto_now_add) in zip(fields, saved):
+            field.auto_now, field.auto_now_add = auto_now, auto_now_add
+
+
+def percentiles(timings):
+    timings = sorted(timings)
+    p50 = statistics.median(timings)
+    p95 = timings[min(len(timings) - 1, int(len(timings) * 0.95))]
+    return f"p50 {p50 * 1000:.2f} ms, p95 {p95 * 1000:.2f} ms, max {timings[-1] * 1000:.2f} ms"
+
+
+class Command(BaseCommand):
+    help = (
+        "Fill the order table with years of synthetic history and report the "
+        "p50/p95 latency of a \"my orders\" page before and after archive_orders"
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument('--orders', type=int, default=10_000_000)
+        parser.add_argument('--users', type=int, default=10_000)
+        parser.add_argument('--history', type=int, default=36, help="months of orders")
+        parser.add_argument('--months', type=int, default=12,
+                            help="archive closed orders older than this")
+        parser.add_argument('--samples', type=int, default=500, help="users timed per phase")
+        parser.add_argument('--batch-size', type=int, default=5000)
+        parser.add_argument('--seed', type=int, default=0)
+        parser.add_argument('--clean', action='store_true',
+                            help="delete the synthetic users and their orders afterwards")
+
+    def handle(self, *args, **options):
+        random.seed(options['seed'])
+        users = self.make_users(options['users'])
+        existing = (Order.objects.filter(user__email__endswith=f'@{DOMAIN}').count()
+                    + ArchivedOrder.objects.filter(user__email__endswith=f'@{DOMAIN}').count())
+        if existing < options['orders']:
+            started = time.perf_counter()
+            self.make_orders(users, existing, options['orders'], options['history'])
+            self.stdout.write(
+                f"created {options['orders'] - existing} orders in "
+                f"{time.perf_counter() - started:.1f}s")
+
+        sample = random.sample(users, min(options['samples'], len(users)))
+        self.stdout.write(f"{connection.vendor}, {len(users)} users")
+        self.report('my orders, one table', self.time_pages(sample))
+
+        before = cutoff(options['months'])
+        started = time.perf_counter()
+        count = archive_orders(before, batch_size=options['batch_size'])
+        self.stdout.write(
+            f"archived {count} orders created before {before:%Y-%m-%d} "
+            f"in {time.perf_counter() - started:.1f}s")
+
+        self.report('my orders, after archiving', self.time_pages(sample))
+        self.report('archived orders', self.time_pages(sample, archived=True))
+        self.report('order by id, archived', self.time_lookups(sample))
+
+        if options['clean']:
+            User.objects.filter(email__endswith=f'@{DOMAIN}').delete()
+
+    def report(self, label, timings):
+        self.stdout.write(f"{label}: {percentiles(timings)}")
+
+    def time_pages(self, user_ids, archived=False):
+        """What a paginated list does: count, then the first page."""
+        timings = []
+        for user_id in user_ids:
+            started = time.perf_counter()
+            orders = user_orders(user_id, archived=archived)
+            orders.count()
+            list(orders[:PAGE_SIZE])
+            timings.append(time.perf_counter() - started)
+        return timings
+
+    def time_lookups(self, user_ids):
+        timings = []
+        for user_id in user_ids:
+            pk = user_orders(user_id, archived=True).values_list('pk', flat=True).first()
+            if pk is None:
+                continue
+            started = time.perf_counter()
+            find_order(user_id, pk)
+            timings.append(time.perf_counter() - started)
+        return timings or [0]
+
+    def make_users(self, count):
+        existing = User.objects.filter(email__endswith=f'@{DOMAIN}').count()
+        User.objects.bulk_create(
+            (User(email=f'buyer{n}@{DOMAIN}', password='!') for n in range(existing, count)),
+            batch_size=5000)
+        return list(User.objects.filter(email__endswith=f'@{DOMAIN}')
+                    .order_by('pk').values_list('pk', flat=True)[:count])
+
+    def make_orders(self, users, start, stop, months):
+        now = timezone.now()
+        first = now - timedelta(days=30 * months)
+        step = (now - first) / stop
+        statuses = [Order.Status.CONFIRMED] * 17 + [Order.Status.CANCELLED, Order.Status.EXPIRED]
+        chunk = 5000
+        with historical_timestamps():
+            for offset in range(start, stop, chunk):
+                orders = []
+                for n in range(offset, min(offset + chunk, stop)):
+                    created = first + step * n
+                    # the last day still has orders awaiting payment
+                    status = (Order.Status.PENDING if now - created < timedelta(days=1)
+                              else random.choice(statuses))
+                    orders.append(Order(
+                        user_id=random.choice(users), status=status,
+                        total=Decimal(random.randint(100, 50_000)),
+                        idempotency_key=f'bench-{n}', request_hash='',
+                        expires_at=created + timedelta(minutes=15),
+                        created_at=created, updated_at=created,
+                    ))
+                with transaction.atomic():
+                    Order.objects.bulk_create(orders)
+                    OrderItem.objects.bulk_create(OrderItem(
+                        order=order, product_name='Synthetic product',
+                        unit_price=order.total, quantity=1,
+                    ) for order in orders)
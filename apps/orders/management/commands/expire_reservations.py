@@ -0,0 +1,23 @@
+import time
+
+from django.core.management.base import BaseCommand
+
+from apps.orders.inventory import expire_reservations
+
+
+class Command(BaseCommand):
+    help = "Return the stock of expired reservations and expire their pending orders"
+
+    def add_arguments(self, parser):
+        parser.add_argument('--batch-size', type=int, default=500)
+        parser.add_argument('--loop', type=float, default=0,
+                            help="keep sweeping every N seconds instead of once")
+
+    def handle(self, *args, **options):
+        while True:
+            count = expire_reservations(batch_size=options['batch_size'])
+            if count or not options['loop']:
+                self.stdout.write(f"expired {count} reservations")
+            if not options['loop']:
+                return
+            time.sleep(options['loop'])
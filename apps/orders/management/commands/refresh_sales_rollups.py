@@ -0,0 +1,37 @@
+import time
+
+from django.core.management.base import BaseCommand
+
+from apps.orders import rollups
+
+
+class Command(BaseCommand):
+    help = "Fold new sale events into the hourly and daily seller sales rollups"
+
+    def add_arguments(self, parser):
+        parser.add_argument('--batch-size', type=int)
+        parser.add_argument('--loop', type=float, default=0,
+                            help="keep refreshing every N seconds instead of once")
+        parser.add_argument('--backfill', action='store_true',
+                            help="first write events for confirmed orders that have none")
+        parser.add_argument('--rebuild', action='store_true',
+                            help="recompute the rollups from all kept events")
+        parser.add_argument('--keep-days', type=int,
+                            help="afterwards delete folded events older than this")
+
+    def handle(self, *args, **options):
+        if options['backfill']:
+            self.stdout.write(f"backfilled {rollups.backfill()} orders")
+        if options['rebuild']:
+            self.stdout.write(f"rebuilt from {rollups.rebuild(options['batch_size'])} events")
+        while True:
+            count = rollups.refresh(options['batch_size'])
+            if count or not options['loop']:
+                self.stdout.write(f"folded {count} events")
+            if options['keep_days'] is not None:
+                pruned = rollups.prune(options['keep_days'])
+                if pruned:
+                    self.stdout.write(f"pruned {pruned} events")
+            if not options['loop']:
+                return
+            time.sleep(options['loop'])
@@ -0,0 +1,18 @@
+from django.core.management.base import BaseCommand
+
+from apps.orders.inventory import shard_stock
+from apps.products.models import StockShard
+
+
+class Command(BaseCommand):
+    help = "Split a hot product's stock over N shard rows (0 folds it back), or rebalance"
+
+    def add_arguments(self, parser):
+        parser.add_argument('product_id', type=int)
+        parser.add_argument('shards', type=int)
+
+    def handle(self, *args, **options):
+        shard_stock(options['product_id'], options['shards'])
+        quantities = StockShard.objects.filter(
+            product_id=options['product_id']).order_by('shard').values_list('quantity', flat=True)
+        self.stdout.write(self.style.SUCCESS(f"shards: {list(quantities)}"))
@@ -0,0 +1,111 @@
+import threading
+import time
+from datetime import timedelta
+
+from django.core.management.base import BaseCommand, CommandError
+from django.db import OperationalError, connection, transaction
+from django.db.models import Sum
+from django.utils import timezone
+
+from apps.orders.inventory import OutOfStock, reserve, shard_stock
+from apps.orders.models import StockReservation
+from apps.products.models import Category, Product, StockShard
+from apps.users.models import User
+
+
+class Command(BaseCommand):
+    help = (
+        "Reserve one product from many threads until it sells out, then check "
+        "that exactly the available stock was sold and report throughput"
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument('--stock', type=int, default=1000)
+        parser.add_argument('--threads', type=int, default=16)
+        parser.add_argument('--quantity', type=int, default=1, help="units per reservation")
+        parser.add_argument('--shards', type=int, default=0)
+        parser.add_argument('--strategy', choices=['conditional', 'locking'], default='conditional',
+                            help="conditional UPDATEs (the inventory service) or "
+                                 "SELECT ... FOR UPDATE, for comparison")
+        parser.add_argument('--keep', action='store_true', help="keep the test product")
+
+    def handle(self, *args, **options):
+        stock, quantity = options['stock'], options['quantity']
+        product = self.make_product(stock)
+        if options['shards']:
+            shard_stock(product.pk, options['shards'])
+
+        attempt = self.reserve_locking if options['strategy'] == 'locking' else reserve
+        sold = []
+        errors = []
+
+        def worker():
+            count = retries = 0
+            try:
+                while True:
+                    try:
+                        attempt(product.pk, quantity)
+                        count += 1
+                    except OutOfStock:
+                        break
+                    except OperationalError:
+                        # SQLite "database is locked" under write contention
+                        retries += 1
+                        time.sleep(0.001)
+            except Exception as exc:
+                errors.append(exc)
+            finally:
+                sold.append((count, retries))
+                connection.close()
+
+        threads = [threading.Thread(target=worker) for _ in range(options['threads'])]
+        started = time.perf_counter()
+        for thread in threads:
+            thread.start()
+        for thread in threads:
+            thread.join()
+        elapsed = time.perf_counter() - started
+
+        if errors:
+            raise CommandError(f"{len(errors)} workers failed: {errors[0]!r}")
+
+        reservations = sum(count for count, _ in sold)
+        reserved = StockReservation.objects.filter(product=product).aggregate(
+            total=Sum('quantity'))['total'] or 0
+        product.refresh_from_db()
+        left = product.stock + (StockShard.objects.filter(product=product).aggregate(
+            total=Sum('quantity'))['total'] or 0)
+
+        self.stdout.write(
+            f"{options['strategy']}, {options['threads']} threads, {options['shards']} shards, "
+            f"{connection.vendor}")
+        self.stdout.write(
+            f"{reservations} reservations in {elapsed:.2f}s = {reservations / elapsed:.0f}/s, "
+            f"{sum(r for _, r in sold)} lock retries")
+        self.stdout.write(f"stock {stock}, reserved {reserved}, left {left}")
+
+        if not options['keep']:
+            product.delete()
+
+        expected = stock - stock % quantity
+        if reserved != expected or reservations * quantity != reserved or left != stock - reserved:
+            raise CommandError("oversold or lost stock")
+        self.stdout.write(self.style.SUCCESS("no oversell"))
+
+    def make_product(self, stock):
+        seller, _ = User.objects.get_or_create(
+            email='stress-seller@example.com',
+            defaults={'role': User.Role.SELLER, 'phone_number': '9800000000'})
+        category, _ = Category.objects.get_or_create(slug='stress-test', defaults={'name': 'Stress test'})
+        return Product.objects.create(
+            seller=seller, category=category, name='Stress test product', price=1, stock=stock)
+
+    def reserve_locking(self, product_id, quantity):
+        with transaction.atomic():
+            product = Product.objects.select_for_update().get(pk=product_id)
+            if product.stock < quantity:
+                raise OutOfStock()
+            Product.objects.filter(pk=product_id).update(stock=product.stock - quantity)
+            return StockReservation.objects.create(
+                product_id=product_id, quantity=quantity,
+                expires_at=timezone.now() + timedelta(minutes=15))
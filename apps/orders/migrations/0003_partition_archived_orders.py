@@ -0,0 +1,42 @@
+from django.db import migrations
+
+
+def partition_archive(apps, schema_editor):
+    # declarative partitions by month; the table is still empty, so it is
+    # simply recreated. The primary key has to include the partition key.
+    if schema_editor.connection.vendor != 'postgresql':
+        return
+    schema_editor.execute("DROP TABLE orders_archivedorder")
+    schema_editor.execute("""
+        CREATE TABLE orders_archivedorder (
+            id bigint NOT NULL,
+            user_id bigint NOT NULL
+                REFERENCES users_user (id) DEFERRABLE INITIALLY DEFERRED,
+            status varchar(20) NOT NULL,
+            total numeric(12, 2) NOT NULL,
+            idempotency_key varchar(64) NOT NULL,
+            items jsonb NOT NULL,
+            created_at timestamp with time zone NOT NULL,
+            updated_at timestamp with time zone NOT NULL,
+            archived_at timestamp with time zone NOT NULL,
+            PRIMARY KEY (id, created_at)
+        ) PARTITION BY RANGE (created_at)
+    """)
+    schema_editor.execute(
+        "CREATE INDEX archived_order_user_idx ON orders_archivedorder (user_id, created_at DESC)")
+    # rows outside every monthly partition, archive_orders creates the
+    # partitions it needs before moving orders
+    schema_editor.execute(
+        "CREATE TABLE orders_archivedorder_default PARTITION OF orders_archivedorder DEFAULT")
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('orders', '0002_archived_order'),
+    ]
+
+    operations = [
+        # reversing 0002 drops the partitioned table with its partitions
+        migrations.RunPython(partition_archive, migrations.RunPython.noop),
+    ]
@@ -0,0 +1,83 @@
+# Generated by Django 4.2.7 on 2026-10-18 16:26
+
+from django.db import migrations, models
+import django.utils.timezone
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('orders', '0003_partition_archived_orders'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='DailySales',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('seller_id', models.BigIntegerField()),
+                ('product_id', models.BigIntegerField()),
+                ('product_name', models.CharField(max_length=200)),
+                ('lines', models.IntegerField(default=0)),
+                ('orders', models.IntegerField(default=0)),
+                ('units', models.IntegerField(default=0)),
+                ('revenue', models.DecimalField(decimal_places=2, default=0, max_digits=14)),
+                ('day', models.DateField()),
+            ],
+            options={
+                'verbose_name': 'daily sales',
+                'verbose_name_plural': 'daily sales',
+                'db_table': 'orders_dailysales',
+                'managed': False,
+            },
+        ),
+        migrations.CreateModel(
+            name='HourlySales',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('seller_id', models.BigIntegerField()),
+                ('product_id', models.BigIntegerField()),
+                ('product_name', models.CharField(max_length=200)),
+                ('lines', models.IntegerField(default=0)),
+                ('orders', models.IntegerField(default=0)),
+                ('units', models.IntegerField(default=0)),
+                ('revenue', models.DecimalField(decimal_places=2, default=0, max_digits=14)),
+                ('hour', models.DateTimeField()),
+            ],
+            options={
+                'verbose_name': 'hourly sales',
+                'verbose_name_plural': 'hourly sales',
+            },
+        ),
+        migrations.CreateModel(
+            name='Watermark',
+            fields=[
+                ('name', models.CharField(max_length=50, primary_key=True, serialize=False)),
+                ('position', models.BigIntegerField(default=0)),
+                ('updated_at', models.DateTimeField(auto_now=True)),
+            ],
+        ),
+        migrations.CreateModel(
+            name='SaleEvent',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('order_id', models.BigIntegerField()),
+                ('seller_id', models.BigIntegerField()),
+                ('product_id', models.BigIntegerField()),
+                ('product_name', models.CharField(max_length=200)),
+                ('quantity', models.IntegerField()),
+                ('revenue', models.DecimalField(decimal_places=2, max_digits=14)),
+                ('orders', models.SmallIntegerField()),
+                ('created_at', models.DateTimeField(default=django.utils.timezone.now)),
+            ],
+            options={
+                'verbose_name': 'sale event',
+                'verbose_name_plural': 'sale events',
+                'indexes': [models.Index(fields=['order_id'], name='sale_event_order_idx')],
+            },
+        ),
+        migrations.AddConstraint(
+            model_name='hourlysales',
+            constraint=models.UniqueConstraint(fields=('seller_id', 'hour', 'product_id'), name='hourly_sales_key'),
+        ),
+    ]
@@ -0,0 +1,47 @@
+from django.conf import settings
+from django.db import migrations
+
+
+def create_daily_sales(apps, schema_editor):
+    DailySales = apps.get_model('orders', 'DailySales')
+    if schema_editor.connection.vendor != 'postgresql':
+        schema_editor.create_model(DailySales)
+    else:
+        # days in the site's time zone, like the hours they are made of
+        schema_editor.execute(f"""
+            CREATE MATERIALIZED VIEW orders_dailysales AS
+            SELECT
+                min(id) AS id,
+                seller_id,
+                (hour AT TIME ZONE '{settings.TIME_ZONE}')::date AS day,
+                product_id,
+                (array_agg(product_name ORDER BY hour DESC))[1] AS product_name,
+                sum(lines)::integer AS lines,
+                sum(orders)::integer AS orders,
+                sum(units)::integer AS units,
+                sum(revenue) AS revenue
+            FROM orders_hourlysales
+            GROUP BY seller_id, day, product_id
+        """)
+    # unmanaged, so the constraint is created here; on PostgreSQL it also
+    # lets REFRESH ... CONCURRENTLY keep the view readable
+    schema_editor.execute(
+        "CREATE UNIQUE INDEX daily_sales_key ON orders_dailysales (seller_id, day, product_id)")
+
+
+def drop_daily_sales(apps, schema_editor):
+    if schema_editor.connection.vendor == 'postgresql':
+        schema_editor.execute("DROP MATERIALIZED VIEW IF EXISTS orders_dailysales")
+    else:
+        schema_editor.delete_model(apps.get_model('orders', 'DailySales'))
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('orders', '0004_sales_rollups'),
+    ]
+
+    operations = [
+        migrations.RunPython(create_daily_sales, drop_daily_sales),
+    ]
@@ -0,0 +1,212 @@
+from django.conf import settings
+from django.db import models
+from django.db.models import Q
+from django.utils import timezone
+from django.utils.translation import gettext_lazy as _
+
+from apps.products.models import Product
+
+
+class Order(models.Model):
+
+    class Status(models.TextChoices):
+        PENDING = 'pending', _('Pending payment')
+        CONFIRMED = 'confirmed', _('Confirmed')
+        CANCELLED = 'cancelled', _('Cancelled')
+        EXPIRED = 'expired', _('Expired')
+
+    user = models.ForeignKey(
+        settings.AUTH_USER_MODEL, on_delete=models.CASCADE, related_name='orders')
+    status = models.CharField(max_length=20, choices=Status.choices, default=Status.PENDING)
+    total = models.DecimalField(max_digits=12, decimal_places=2)
+
+    # client supplied "Idempotency-Key" and a hash of the checkout payload
+    idempotency_key = models.CharField(max_length=64)
+    request_hash = models.CharField(max_length=64)
+
+    # stock is held until then while the order is pending
+    expires_at = models.DateTimeField()
+
+    created_at = models.DateTimeField(auto_now_add=True)
+    updated_at = models.DateTimeField(auto_now=True)
+
+    class Meta:
+        verbose_name = _('order')
+        verbose_name_plural = _('orders')
+        ordering = ['-created_at']
+        constraints = [
+            models.UniqueConstraint(
+                fields=['user', 'idempotency_key'], name='unique_order_idempotency_key'),
+        ]
+        indexes = [
+            models.Index(fields=['user', '-created_at']),
+            # archive_orders walks the oldest orders first
+            models.Index(fields=['created_at'], name='order_created_idx'),
+        ]
+
+    def __str__(self):
+        return f"Order #{self.pk} ({self.status})"
+
+
+class OrderItem(models.Model):
+    order = models.ForeignKey(Order, on_delete=models.CASCADE, related_name='items')
+    product = models.ForeignKey(
+        Product, on_delete=models.SET_NULL, null=True, related_name='order_items')
+
+    # copied at checkout so the order survives product edits
+    product_name = models.CharField(max_length=200)
+    unit_price = models.DecimalField(max_digits=12, decimal_places=2)
+    quantity = models.PositiveIntegerField()
+
+    class Meta:
+        verbose_name = _('order item')
+        verbose_name_plural = _('order items')
+
+    def __str__(self):
+        return f"{self.quantity} x {self.product_name}"
+
+
+class StockReservation(models.Model):
+    """Stock taken out of a product until it is committed or released."""
+
+    class Status(models.TextChoices):
+        ACTIVE = 'active', _('Active')
+        COMMITTED = 'committed', _('Committed')
+        RELEASED = 'released', _('Released')
+        EXPIRED = 'expired', _('Expired')
+
+    product = models.ForeignKey(Product, on_delete=models.CASCADE, related_name='reservations')
+    order = models.ForeignKey(
+        Order, on_delete=models.CASCADE, null=True, blank=True, related_name='reservations')
+    quantity = models.PositiveIntegerField()
+    status = models.CharField(max_length=20, choices=Status.choices, default=Status.ACTIVE)
+    expires_at = models.DateTimeField()
+    created_at = models.DateTimeField(auto_now_add=True)
+
+    class Meta:
+        verbose_name = _('stock reservation')
+        verbose_name_plural = _('stock reservations')
+        indexes = [
+            # only live reservations are swept, keep the index to those
+            models.Index(fields=['expires_at'], condition=Q(status='active'),
+                         name='reservation_active_expiry'),
+        ]
+
+    def __str__(self):
+        return f"{self.quantity} x product {self.product_id} ({self.status})"
+
+
+class ArchivedOrder(models.Model):
+    """
+    A closed order moved out of ``Order`` by ``archive_orders``, its items
+    folded into ``items``. The id is the original order id. On PostgreSQL
+    the table is partitioned by month of ``created_at`` (``apps.orders.archive``).
+    """
+    id = models.BigIntegerField(primary_key=True)
+    user = models.ForeignKey(
+        settings.AUTH_USER_MODEL, on_delete=models.CASCADE, related_name='archived_orders')
+    status = models.CharField(max_length=20, choices=Order.Status.choices)
+    total = models.DecimalField(max_digits=12, decimal_places=2)
+    idempotency_key = models.CharField(max_length=64)
+    # [{product, product_name, unit_price, quantity}]
+    items = models.JSONField(default=list)
+
+    created_at = models.DateTimeField()
+    updated_at = models.DateTimeField()
+    archived_at = models.DateTimeField(auto_now_add=True)
+
+    class Meta:
+        verbose_name = _('archived order')
+        verbose_name_plural = _('archived orders')
+        ordering = ['-created_at']
+        indexes = [
+            models.Index(fields=['user', '-created_at'], name='archived_order_user_idx'),
+        ]
+
+    def __str__(self):
+        return f"Archived order #{self.pk} ({self.status})"
+
+
+class SaleEvent(models.Model):
+    """
+    One line of a confirmed order, or its reversal (negative amounts) when
+    the order is cancelled afterwards. Append-only; ``apps.orders.rollups``
+    folds the events past its watermark into the sales rollups.
+    """
+    order_id = models.BigIntegerField()
+    seller_id = models.BigIntegerField()
+    product_id = models.BigIntegerField()
+    product_name = models.CharField(max_length=200)
+    quantity = models.IntegerField()
+    revenue = models.DecimalField(max_digits=14, decimal_places=2)
+    # 1 on the first line of each seller in an order (-1 when reversed), so
+    # summing it over products counts the seller's orders once
+    orders = models.SmallIntegerField()
+    created_at = models.DateTimeField(default=timezone.now)
+
+    class Meta:
+        verbose_name = _('sale event')
+        verbose_name_plural = _('sale events')
+        indexes = [
+            models.Index(fields=['order_id'], name='sale_event_order_idx'),
+        ]
+
+    def __str__(self):
+        return f"{self.quantity} x {self.product_name} (order {self.order_id})"
+
+
+class Watermark(models.Model):
+    """How far a job has read an append-only table."""
+    name = models.CharField(max_length=50, primary_key=True)
+    position = models.BigIntegerField(default=0)
+    updated_at = models.DateTimeField(auto_now=True)
+
+    def __str__(self):
+        return f"{self.name} at {self.position}"
+
+
+class SalesRollup(models.Model):
+    """Sales of one product of a seller in one period."""
+    seller_id = models.BigIntegerField()
+    product_id = models.BigIntegerField()
+    product_name = models.CharField(max_length=200)
+    # orders containing the product
+    lines = models.IntegerField(default=0)
+    # the seller's orders, summed over products (see SaleEvent.orders)
+    orders = models.IntegerField(default=0)
+    units = models.IntegerField(default=0)
+    revenue = models.DecimalField(max_digits=14, decimal_places=2, default=0)
+
+    class Meta:
+        abstract = True
+
+
+class HourlySales(SalesRollup):
+    # start of the hour, local time
+    hour = models.DateTimeField()
+
+    class Meta:
+        verbose_name = _('hourly sales')
+        verbose_name_plural = _('hourly sales')
+        constraints = [
+            models.UniqueConstraint(
+                fields=['seller_id', 'hour', 'product_id'], name='hourly_sales_key'),
+        ]
+
+
+class DailySales(SalesRollup):
+    """
+    A plain table kept up by the rollup job, or on PostgreSQL a
+    materialized view over ``HourlySales`` (migration 0005).
+    """
+    day = models.DateField()
+
+    class Meta:
+        managed = False
+        db_table = 'orders_dailysales'
+        verbose_name = _('daily sales')
+        verbose_name_plural = _('daily sales')
+        constraints = [
+            models.UniqueConstraint(
+                fields=['seller_id', 'day', 'product_id'], name='daily_sales_key'),
+        ]
@@ -0,0 +1,242 @@
+"""
+Seller sales rollups.
+
+Confirming an order appends one ``SaleEvent`` per line, and cancelling a
+confirmed order appends their reversal, in the same transaction as the
+status change. ``refresh`` folds the events past the ``sales`` watermark
+into ``HourlySales`` and ``DailySales`` (per seller, product and local
+hour or day) and moves the watermark, all in one transaction, so each
+event is counted exactly once however often the job runs. The seller
+dashboard reads the rollups only, never the order tables.
+
+Event ids are handed out before their transactions commit, so a lower id
+can become visible after a higher one has been read. ``refresh`` only
+takes events older than ``SETTLE`` seconds and stops at the first younger
+one; a checkout transaction open longer than that would be skipped.
+
+On PostgreSQL ``DailySales`` is a materialized view over the hourly
+table, brought up to date by ``refresh_daily`` (``REFRESH MATERIALIZED
+VIEW CONCURRENTLY``, readable throughout); elsewhere it is a table that
+``refresh`` updates like the hourly one.
+"""
+from collections import defaultdict
+from datetime import datetime, timedelta
+from itertools import takewhile
+
+from django.conf import settings
+from django.db import connection, transaction
+from django.db.models import Exists, OuterRef
+from django.utils import timezone
+
+from .models import DailySales, HourlySales, Order, OrderItem, SaleEvent, Watermark
+
+DEFAULTS = {
+    'BATCH_SIZE': 5000,
+    # seconds an event is left alone so transactions that took a lower id can commit
+    'SETTLE': 60,
+}
+
+WATERMARK = 'sales'
+
+COUNTERS = ('lines', 'orders', 'units', 'revenue')
+
+
+def get_setting(name):
+    return getattr(settings, 'ORDER_ROLLUPS', {}).get(name, DEFAULTS[name])
+
+
+def materialized():
+    return connection.vendor == 'postgresql'
+
+
+def sale_events(order, items, at=None):
+    """Unsaved events for the ``items`` of a confirmed ``order``."""
+    at = at or timezone.now()
+    events = []
+    sellers = set()
+    for item in sorted(items, key=lambda item: item.product_id):
+        seller_id = item.product.seller_id
+        events.append(SaleEvent(
+            order_id=order.pk,
+            seller_id=seller_id,
+            product_id=item.product_id,
+            product_name=item.product_name,
+            quantity=item.quantity,
+            revenue=item.unit_price * item.quantity,
+            orders=0 if seller_id in sellers else 1,
+            created_at=at,
+        ))
+        sellers.add(seller_id)
+    return events
+
+
+def record_sale(order):
+    # lines of since deleted products have no seller to credit
+    items = order.items.filter(product__isnull=False).select_related('product')
+    SaleEvent.objects.bulk_create(sale_events(order, items))
+
+
+def record_refund(order):
+    now = timezone.now()
+    SaleEvent.objects.bulk_create([
+        SaleEvent(
+            order_id=event.order_id,
+            seller_id=event.seller_id,
+            product_id=event.product_id,
+            product_name=event.product_name,
+            quantity=-event.quantity,
+            revenue=-event.revenue,
+            orders=-event.orders,
+            created_at=now,
+        )
+        for event in SaleEvent.objects.filter(order_id=order.pk, quantity__gt=0)
+    ])
+
+
+def hour_of(moment):
+    return timezone.localtime(moment).replace(minute=0, second=0, microsecond=0)
+
+
+def day_of(moment):
+    return timezone.localtime(moment).date()
+
+
+def tally(events, bucket):
+    """``{(seller_id, period, product_id): {counter: total, 'product_name': ...}}``"""
+    totals = defaultdict(lambda: dict.fromkeys(COUNTERS, 0))
+    for event in events:
+        row = totals[event.seller_id, bucket(event.created_at), event.product_id]
+        row['lines'] += 1 if event.quantity > 0 else -1
+        row['orders'] += event.orders
+        row['units'] += event.quantity
+        row['revenue'] += event.revenue
+        row['product_name'] = event.product_name
+    return totals
+
+
+def add(model, period, totals):
+    """Add ``totals`` from ``tally`` onto the rows of ``model``, creating missing ones."""
+    keys = set(totals)
+    existing = {
+        (row.seller_id, getattr(row, period), row.product_id): row
+        for row in model.objects.filter(
+            seller_id__in={seller_id for seller_id, _, _ in keys},
+            product_id__in={product_id for _, _, product_id in keys},
+            **{f'{period}__in': {value for _, value, _ in keys}},
+        )
+        if (row.seller_id, getattr(row, period), row.product_id) in keys
+    }
+    updated, created = [], []
+    for (seller_id, value, product_id), row in totals.items():
+        rollup = existing.get((seller_id, value, product_id))
+        if rollup is None:
+            created.append(model(seller_id=seller_id, product_id=product_id,
+                                 **{period: value}, **row))
+            continue
+        for counter in COUNTERS:
+            setattr(rollup, counter, getattr(rollup, counter) + row[counter])
+        rollup.product_name = row['product_name']
+        updated.append(rollup)
+    model.objects.bulk_create(created, batch_size=1000)
+    model.objects.bulk_update(updated, [*COUNTERS, 'product_name'], batch_size=1000)
+
+
+def refresh_batch(batch_size=None, now=None):
+    """Fold one batch of settled events into the rollups. Returns the count."""
+    settled = (now or timezone.now()) - timedelta(seconds=get_setting('SETTLE'))
+    with transaction.atomic():
+        # the lock keeps concurrent jobs from counting an event twice
+        watermark, _ = Watermark.objects.select_for_update().get_or_create(name=WATERMARK)
+        events = list(
+            SaleEvent.objects
+            .filter(pk__gt=watermark.position)
+            .order_by('pk')[:batch_size or get_setting('BATCH_SIZE')]
+        )
+        events = list(takewhile(lambda event: event.created_at <= settled, events))
+        if not events:
+            return 0
+        add(HourlySales, 'hour', tally(events, hour_of))
+        if not materialized():
+            add(DailySales, 'day', tally(events, day_of))
+        watermark.position = events[-1].pk
+        watermark.save()
+    return len(events)
+
+
+def refresh_daily():
+    if materialized():
+        with connection.cursor() as cursor:
+            cursor.execute(f'REFRESH MATERIALIZED VIEW CONCURRENTLY {DailySales._meta.db_table}')
+
+
+def refresh(batch_size=None, now=None):
+    """Fold every settled event into the rollups. Returns the count."""
+    total = 0
+    while count := refresh_batch(batch_size, now):
+        total += count
+    if total:
+        refresh_daily()
+    return total
+
+
+def rebuild(batch_size=None, now=None):
+    """Recompute the rollups from the events still kept."""
+    with transaction.atomic():
+        Watermark.objects.select_for_update().filter(name=WATERMARK).update(position=0)
+        HourlySales.objects.all().delete()
+        if not materialized():
+            DailySales.objects.all().delete()
+    return refresh(batch_size, now)
+
+
+def backfill(batch_size=1000):
+    """Events for confirmed orders from before the rollups, dated at their last update."""
+    total = 0
+    last = 0
+    while True:
+        orders = list(
+            Order.objects
+            .filter(pk__gt=last, status=Order.Status.CONFIRMED)
+            .exclude(Exists(SaleEvent.objects.filter(order_id=OuterRef('pk'))))
+            .order_by('pk')[:batch_size]
+        )
+        if not orders:
+            return total
+        items = defaultdict(list)
+        for item in (OrderItem.objects
+                     .filter(order__in=orders, product__isnull=False)
+                     .select_related('product')):
+            items[item.order_id].append(item)
+        SaleEvent.objects.bulk_create([
+            event for order in orders
+            for event in sale_events(order, items[order.pk], at=order.updated_at)
+        ])
+        total += len(orders)
+        last = orders[-1].pk
+
+
+def prune(keep_days):
+    """Delete folded events older than ``keep_days``. Returns the count."""
+    position = Watermark.objects.filter(name=WATERMARK).values_list('position', flat=True).first()
+    if not position:
+        return 0
+    deleted, _ = SaleEvent.objects.filter(
+        pk__lte=position, created_at__lt=timezone.now() - timedelta(days=keep_days)).delete()
+    return deleted
+
+
+def period_start(day, period):
+    """Where ``day`` starts in the rollup of ``period``."""
+    if period == 'day':
+        return day
+    return timezone.make_aware(datetime.combine(day, datetime.min.time()))
+
+
+def sales(seller_id, period, start, end):
+    """A seller's rollup rows of ``period`` for the days ``start`` to ``end`` inclusive."""
+    model = DailySales if period == 'day' else HourlySales
+    return model.objects.filter(
+        seller_id=seller_id,
+        **{f'{period}__gte': period_start(start, period),
+           f'{period}__lt': period_start(end + timedelta(days=1), period)},
+    )
@@ -0,0 +1,89 @@
+from datetime import datetime, timedelta
+
+from django.utils import timezone
+from rest_framework import serializers
+
+from .models import ArchivedOrder, Order, OrderItem
+
+
+class OrderItemSerializer(serializers.ModelSerializer):
+    class Meta:
+        model = OrderItem
+        fields = ['product', 'product_name', 'unit_price', 'quantity']
+        read_only_fields = fields
+
+
+class OrderSerializer(serializers.ModelSerializer):
+    items = OrderItemSerializer(many=True, read_only=True)
+
+    class Meta:
+        model = Order
+        fields = ['id', 'status', 'total', 'items', 'expires_at', 'created_at', 'updated_at']
+        read_only_fields = fields
+
+
+class ArchivedOrderSerializer(serializers.ModelSerializer):
+    class Meta:
+        model = ArchivedOrder
+        fields = ['id', 'status', 'total', 'items', 'created_at', 'updated_at', 'archived_at']
+        read_only_fields = fields
+
+
+class CheckoutItemSerializer(serializers.Serializer):
+    product = serializers.IntegerField(min_value=1)
+    quantity = serializers.IntegerField(min_value=1, max_value=1000)
+
+
+class CheckoutSerializer(serializers.Serializer):
+    items = CheckoutItemSerializer(many=True, allow_empty=False)
+
+    def validate_items(self, items):
+        products = [item['product'] for item in items]
+        if len(products) != len(set(products)):
+            raise serializers.ValidationError("each product may appear only once")
+        return items
+
+
+class SalesQuerySerializer(serializers.Serializer):
+    # longest range in days and the default one, per period
+    RANGES = {'day': (366, 30), 'hour': (31, 2)}
+
+    period = serializers.ChoiceField(choices=list(RANGES), default='day')
+    start = serializers.DateField(required=False)
+    end = serializers.DateField(required=False)
+    limit = serializers.IntegerField(min_value=1, max_value=100, default=20)
+
+    def validate(self, data):
+        longest, default = self.RANGES[data['period']]
+        data.setdefault('end', timezone.localdate())
+        data.setdefault('start', data['end'] - timedelta(days=default - 1))
+        if data['start'] > data['end']:
+            raise serializers.ValidationError({'start': "must not be after end"})
+        if (data['end'] - data['start']).days >= longest:
+            raise serializers.ValidationError(
+                {'start': f"at most {longest} days of {data['period']}ly sales"})
+        return data
+
+
+class PeriodField(serializers.ReadOnlyField):
+    """A rollup's day, or its hour in local time."""
+
+    def to_representation(self, value):
+        if isinstance(value, datetime):
+            value = timezone.localtime(value)
+        return value.isoformat()
+
+
+class SalesTotalsSerializer(serializers.Serializer):
+    orders = serializers.IntegerField()
+    units = serializers.IntegerField()
+    revenue = serializers.DecimalField(max_digits=14, decimal_places=2)
+
+
+class PeriodSalesSerializer(SalesTotalsSerializer):
+    period = PeriodField()
+
+
+class ProductSalesSerializer(SalesTotalsSerializer):
+    product_id = serializers.IntegerField()
+    product_name = serializers.CharField()
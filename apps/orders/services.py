@@ -0,0 +1,132 @@
+"""
+Checkout on top of ``apps.orders.inventory``.
+
+Checkout is idempotent per user and ``Idempotency-Key``: a retried request
+with the same key gets the order created by the first one, and reusing a
+key for a different basket is refused. Stock is reserved before the order
+row is written, so no lock is held across the whole checkout; if anything
+fails the reservations made so far are released again.
+"""
+import hashlib
+import json
+
+from django.db import IntegrityError, transaction
+from django.utils import timezone
+from django.utils.translation import gettext_lazy as _
+from rest_framework import status
+from rest_framework.exceptions import APIException, ValidationError
+
+from apps.products.models import Product
+
+from .inventory import commit, release, reservation_ttl, reserve
+from .models import Order, OrderItem, StockReservation
+from .rollups import record_refund, record_sale
+
+
+class IdempotencyKeyReused(APIException):
+    status_code = status.HTTP_422_UNPROCESSABLE_ENTITY
+    default_detail = _("this Idempotency-Key was already used for a different request")
+    default_code = 'idempotency_key_reused'
+
+
+class OrderNotPending(APIException):
+    status_code = status.HTTP_409_CONFLICT
+    default_detail = _("the order is no longer awaiting payment")
+    default_code = 'order_not_pending'
+
+
+def request_hash(items):
+    payload = sorted((item['product'], item['quantity']) for item in items)
+    return hashlib.sha256(json.dumps(payload).encode()).hexdigest()
+
+
+def replay(user, idempotency_key, digest):
+    order = Order.objects.filter(user_id=user.pk, idempotency_key=idempotency_key).first()
+    if order is not None and order.request_hash != digest:
+        raise IdempotencyKeyReused()
+    return order
+
+
+def checkout(user, items, idempotency_key):
+    """
+    Reserve stock for ``items`` (``[{'product': id, 'quantity': n}]``) and
+    create a pending order. Returns ``(order, created)``.
+    """
+    digest = request_hash(items)
+    order = replay(user, idempotency_key, digest)
+    if order is not None:
+        return order, False
+
+    products = Product.objects.filter(is_active=True).in_bulk([item['product'] for item in items])
+    missing = [item['product'] for item in items if item['product'] not in products]
+    if missing:
+        raise ValidationError({'items': _("unknown products: %s") % missing})
+
+    ttl = reservation_ttl()
+    reservations = []
+    try:
+        # a fixed order keeps concurrent multi-item checkouts from deadlocking
+        for item in sorted(items, key=lambda item: item['product']):
+            reservations.append(reserve(item['product'], item['quantity'], ttl=ttl))
+
+        with transaction.atomic():
+            order = Order.objects.create(
+                user_id=user.pk,
+                total=sum(products[item['product']].price * item['quantity'] for item in items),
+                idempotency_key=idempotency_key,
+                request_hash=digest,
+                expires_at=timezone.now() + ttl,
+            )
+            OrderItem.objects.bulk_create([
+                OrderItem(
+                    order=order,
+                    product_id=item['product'],
+                    product_name=products[item['product']].name,
+                    unit_price=products[item['product']].price,
+                    quantity=item['quantity'],
+                )
+                for item in items
+            ])
+            StockReservation.objects.filter(
+                pk__in=[r.pk for r in reservations]).update(order=order)
+    except IntegrityError:
+        release(reservations)
+        # the same key committed concurrently; anything else is a real error
+        order = replay(user, idempotency_key, digest)
+        if order is None:
+            raise
+        return order, False
+    except BaseException:
+        release(reservations)
+        raise
+    return order, True
+
+
+@transaction.atomic
+def confirm(order):
+    """Mark a pending order paid and keep its stock for good."""
+    order = Order.objects.select_for_update().get(pk=order.pk)
+    if order.status == Order.Status.CONFIRMED:
+        return order
+    if order.status != Order.Status.PENDING or order.expires_at <= timezone.now():
+        raise OrderNotPending()
+    reservations = list(order.reservations.all())
+    # some already expired or released: the order no longer has its stock
+    if commit(reservations) < len(reservations):
+        raise OrderNotPending()
+    order.status = Order.Status.CONFIRMED
+    order.save(update_fields=['status', 'updated_at'])
+    record_sale(order)
+    return order
+
+
+@transaction.atomic
+def cancel(order):
+    order = Order.objects.select_for_update().get(pk=order.pk)
+    if order.status in (Order.Status.PENDING, Order.Status.CONFIRMED):
+        release(list(order.reservations.all()))
+        if order.status == Order.Status.CONFIRMED:
+            record_refund(order)
+        order.status = Order.Status.CANCELLED
+        order.save(update_fields=['status', 'updated_at'])
+    return order
@@ -0,0 +1,12 @@
+from django.urls import path, include
+from rest_framework.routers import DefaultRouter
+from . import views
+
+router = DefaultRouter()
+router.register(r'', views.OrderViewSet, basename='order')
+
+urlpatterns = [
+    path('dashboard/sales/', views.SellerSalesView.as_view(), name='seller-sales'),
+    path('dashboard/products/', views.SellerProductSalesView.as_view(), name='seller-product-sales'),
+    path('', include(router.urls)),
+]
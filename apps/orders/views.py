@@ -0,0 +1,116 @@
+from django.db.models import F, Max, Sum
+from django.utils.translation import gettext_lazy as _
+from rest_framework import permissions, status, viewsets
+from rest_framework.decorators import action
+from rest_framework.exceptions import NotFound, ValidationError
+from rest_framework.response import Response
+from rest_framework.views import APIView
+
+from shared.permissions.permissions import IsSellerUser
+
+from . import services
+from .archive import find_order, user_orders
+from .models import Order
+from .rollups import sales
+from .serializers import (
+    ArchivedOrderSerializer, CheckoutSerializer, OrderSerializer, PeriodSalesSerializer,
+    ProductSalesSerializer, SalesQuerySerializer, SalesTotalsSerializer,
+)
+
+
+class OrderViewSet(viewsets.ReadOnlyModelViewSet):
+    serializer_class = OrderSerializer
+    permission_classes = [permissions.IsAuthenticated]
+
+    def get_queryset(self):
+        return user_orders(self.request.user.pk)
+
+    def retrieve(self, request, pk=None):
+        """A live order, or one moved to the archive by ``archive_orders``."""
+        try:
+            order = find_order(request.user.pk, int(pk))
+        except ValueError:
+            order = None
+        if order is None:
+            raise NotFound()
+        if isinstance(order, Order):
+            return Response(OrderSerializer(order).data)
+        return Response(ArchivedOrderSerializer(order).data)
+
+    @action(detail=False)
+    def archived(self, request):
+        """Orders older than the archive cutoff, newest first."""
+        page = self.paginate_queryset(user_orders(request.user.pk, archived=True))
+        serializer = ArchivedOrderSerializer(page, many=True)
+        return self.get_paginated_response(serializer.data)
+
+    @action(detail=False, methods=['post'])
+    def checkout(self, request):
+        """Reserve stock and open a pending order. Requires an ``Idempotency-Key`` header."""
+        idempotency_key = request.headers.get('Idempotency-Key', '').strip()
+        if not idempotency_key or len(idempotency_key) > 64:
+            raise ValidationError({'Idempotency-Key': _("header required, at most 64 characters")})
+
+        serializer = CheckoutSerializer(data=request.data)
+        serializer.is_valid(raise_exception=True)
+        order, created = services.checkout(
+            request.user, serializer.validated_data['items'], idempotency_key)
+        return Response(
+            OrderSerializer(order).data,
+            status=status.HTTP_201_CREATED if created else status.HTTP_200_OK)
+
+    @action(detail=True, methods=['post'])
+    def confirm(self, request, pk=None):
+        order = services.confirm(self.get_object())
+        return Response(OrderSerializer(order).data)
+
+    @action(detail=True, methods=['post'])
+    def cancel(self, request, pk=None):
+        order = services.cancel(self.get_object())
+        return Response(OrderSerializer(order).data)
+
+
+class SellerSalesView(APIView):
+    """
+    The seller's orders, units and revenue per ``period`` (day or hour)
+    from ``start`` to ``end``, read from the sales rollups.
+    """
+    permission_classes = [IsSellerUser]
+
+    def get(self, request):
+        query = SalesQuerySerializer(data=request.query_params)
+        query.is_valid(raise_exception=True)
+        period, start, end = (query.validated_data[key] for key in ('period', 'start', 'end'))
+        rows = sales(request.user.pk, period, start, end)
+        series = (rows.values(period=F(period))
+                  .annotate(orders=Sum('orders'), units=Sum('units'), revenue=Sum('revenue'))
+                  .order_by('period'))
+        summary = rows.aggregate(orders=Sum('orders'), units=Sum('units'), revenue=Sum('revenue'))
+        summary = {key: value or 0 for key, value in summary.items()}
+        return Response({
+            'period': period,
+            'start': start,
+            'end': end,
+            'totals': SalesTotalsSerializer(summary).data,
+            'series': PeriodSalesSerializer(series, many=True).data,
+        })
+
+
+class SellerProductSalesView(APIView):
+    """The seller's best selling products from ``start`` to ``end``, by revenue."""
+    permission_classes = [IsSellerUser]
+
+    def get(self, request):
+        query = SalesQuerySerializer(data=request.query_params)
+        query.is_valid(raise_exception=True)
+        start, end = query.validated_data['start'], query.validated_data['end']
+        products = (sales(request.user.pk, 'day', start, end)
+                    .values('product_id')
+                    .annotate(product_name=Max('product_name'), orders=Sum('lines'),
+                              units=Sum('units'), revenue=Sum('revenue'))
+                    .order_by('-revenue', 'product_id')[:query.validated_data['limit']])
+        return Response({
+            'start': start,
+            'end': end,
+            'products': ProductSalesSerializer(products, many=True).data,
+        })
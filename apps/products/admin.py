@@ -0,0 +1,18 @@
+from django.contrib import admin
+from .models import Category, Product
+
+
+@admin.register(Category)
+class CategoryAdmin(admin.ModelAdmin):
+    list_display = ('path', 'slug')
+    search_fields = ('name', 'path')
+    prepopulated_fields = {'slug': ('name',)}
+
+
+@admin.register(Product)
+class ProductAdmin(admin.ModelAdmin):
+    list_display = ('name', 'seller', 'category', 'price', 'stock', 'is_active', 'created_at')
+    list_filter = ('is_active', 'category')
+    search_fields = ('name', 'seller__email')
+    raw_id_fields = ('seller',)
+    readonly_fields = ('created_at', 'updated_at')
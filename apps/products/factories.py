@@ -0,0 +1,86 @@
+"""
+factory_boy factories for synthetic catalogs (benchmarks, load tests).
+
+Product names mix English and Devanagari the way real listings do.
+"""
+import random
+from decimal import Decimal
+
+import factory
+from factory.django import DjangoModelFactory
+from faker import Faker
+
+from apps.users.models import User, UserProfile
+
+from .models import Category, Product
+
+PROVINCES = (
+    'Koshi', 'Madhesh', 'Bagmati', 'Gandaki', 'Lumbini', 'Karnali', 'Sudurpashchim',
+)
+
+# (english, nepali) product nouns
+NOUNS = (
+    ('mobile', 'मोबाइल'), ('phone', 'फोन'), ('chappal', 'चप्पल'),
+    ('jacket', 'ज्याकेट'), ('book', 'किताब'), ('rice', 'चामल'), ('tea', 'चिया'),
+    ('shoes', 'जुत्ता'), ('bag', 'झोला'), ('watch', 'घडी'), ('laptop', 'ल्यापटप'),
+    ('television', 'टेलिभिजन'), ('shirt', 'कमिज'), ('saree', 'सारी'),
+    ('honey', 'मह'), ('coffee', 'कफी'), ('charger', 'चार्जर'),
+    ('speaker', 'स्पिकर'), ('headphones', 'हेडफोन'), ('pillow', 'सिरानी'),
+)
+
+ADJECTIVES = (
+    'new', 'original', 'premium', 'cotton', 'leather', 'wireless', 'organic',
+    'नयाँ', 'सस्तो', 'राम्रो', 'ठूलो', 'सानो',
+)
+
+fake = Faker()
+
+
+def product_name():
+    english, nepali = random.choice(NOUNS)
+    noun = nepali if random.random() < 0.3 else english
+    return f"{fake.company().split()[0]} {random.choice(ADJECTIVES)} {noun}"
+
+
+class SellerFactory(DjangoModelFactory):
+    class Meta:
+        model = User
+
+    email = factory.Sequence(lambda n: f'seller{n}@example.com')
+    phone_number = factory.Sequence(lambda n: f'98{n:08d}')
+    role = User.Role.SELLER
+    first_name = factory.Faker('first_name')
+    last_name = factory.Faker('last_name')
+    # fixture ids of apps.geography, in the same order
+    province_id = factory.Iterator(range(1, len(PROVINCES) + 1))
+    province_name = factory.LazyAttribute(lambda seller: PROVINCES[seller.province_id - 1])
+    profile = factory.RelatedFactory(
+        'apps.products.factories.SellerProfileFactory', factory_related_name='user')
+
+
+class SellerProfileFactory(DjangoModelFactory):
+    class Meta:
+        model = UserProfile
+
+    company_name = factory.Faker('company')
+
+
+class CategoryFactory(DjangoModelFactory):
+    class Meta:
+        model = Category
+
+    name = factory.Sequence(lambda n: f'{random.choice(NOUNS)[0].title()} {n}')
+    slug = factory.Sequence(lambda n: f'category-{n}')
+
+
+class ProductFactory(DjangoModelFactory):
+    class Meta:
+        model = Product
+
+    seller = factory.SubFactory(SellerFactory)
+    category = factory.SubFactory(CategoryFactory)
+    name = factory.LazyFunction(product_name)
+    slug = factory.Sequence(lambda n: f'product-{n}')
+    description = factory.Faker('sentence', nb_words=12)
+    price = factory.LazyFunction(lambda: Decimal(random.randint(100, 200000)))
+    stock = factory.LazyFunction(lambda: random.randint(0, 50))
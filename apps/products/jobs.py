@@ -0,0 +1,9 @@
+"""Outbox handlers for the catalog read model."""
+from apps.utils.outbox import handler
+
+from .read_model import refresh_category_listings
+
+
+@handler('refresh_category')
+def refresh_category(payload):
+    refresh_category_listings(payload['category'])
@@ -0,0 +1,126 @@
+import random
+import statistics
+import time
+
+import factory
+from django.core.management.base import BaseCommand
+from django.db import connection
+from rest_framework.filters import SearchFilter
+from rest_framework.request import Request
+from rest_framework.test import APIRequestFactory
+
+from apps.products.factories import (
+    ADJECTIVES,
+    NOUNS,
+    CategoryFactory,
+    ProductFactory,
+    SellerFactory,
+)
+from apps.products.models import Product, ProductListing
+from apps.products.read_model import listing_fields, recompute_facets
+from apps.products.search import rebuild_index, search
+from apps.users.models import User
+
+
+class Command(BaseCommand):
+    help = (
+        "Compare the product search index with DRF's SearchFilter (icontains) "
+        "on a synthetic catalog"
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument('--products', type=int, default=1_000_000,
+                            help="catalog size to generate")
+        parser.add_argument('--skip-generate', action='store_true',
+                            help="benchmark the catalog already in the database")
+        parser.add_argument('--queries', type=int, default=200)
+        parser.add_argument('--chunk-size', type=int, default=5000)
+        parser.add_argument('--seed', type=int, default=0)
+
+    def handle(self, *args, **options):
+        random.seed(options['seed'])
+        if not options['skip_generate']:
+            self.generate(options['products'], options['chunk_size'])
+
+        total = ProductListing.objects.count()
+        queries = self.make_queries(options['queries'])
+        self.stdout.write(f"{total} listings on {connection.vendor}, {len(queries)} queries")
+
+        searcher = self.search_filter()
+        self.report('SearchFilter', [self.measure(searcher, query) for query in queries])
+        self.report('search index', [self.measure(self.search_index, query) for query in queries])
+
+    def generate(self, count, chunk_size):
+        started = time.perf_counter()
+        SellerFactory.reset_sequence(force=True)
+        sellers = SellerFactory.create_batch(max(count // 10_000, 10))
+        sellers = list(User.objects.filter(pk__in=[s.pk for s in sellers]).select_related('profile'))
+        categories = CategoryFactory.create_batch(50)
+
+        # signals are bypassed: listings are built here and indexed in bulk
+        ProductFactory.reset_sequence(force=True)
+        created = 0
+        while created < count:
+            size = min(chunk_size, count - created)
+            products = ProductFactory.build_batch(
+                size,
+                seller=factory.LazyFunction(lambda: random.choice(sellers)),
+                category=factory.LazyFunction(lambda: random.choice(categories)),
+            )
+            Product.objects.bulk_create(products)
+            ProductListing.objects.bulk_create(
+                ProductListing(product=product, **listing_fields(product)) for product in products)
+            created += size
+            self.stdout.write(f"\r{created}/{count} products", ending='')
+            self.stdout.flush()
+        self.stdout.write('')
+
+        recompute_facets()
+        rebuild_index(ProductListing.objects.all(), chunk_size=chunk_size)
+        self.stdout.write(f"generated and indexed in {time.perf_counter() - started:.1f}s")
+
+    def make_queries(self, count):
+        queries = []
+        for _ in range(count):
+            english, nepali = random.choice(NOUNS)
+            kind = random.random()
+            if kind < 0.4:
+                queries.append(english)
+            elif kind < 0.6:
+                queries.append(nepali)
+            elif kind < 0.8:
+                queries.append(f"{random.choice(ADJECTIVES)} {english}")
+            else:
+                # typed prefix, as from the search box
+                queries.append(english[:random.randint(2, len(english))])
+        return queries
+
+    def search_filter(self):
+        view = type('View', (), {'search_fields': ['name']})()
+        backend = SearchFilter()
+        factory = APIRequestFactory()
+
+        def run(query):
+            request = Request(factory.get('/', {'search': query}))
+            queryset = backend.filter_queryset(request, ProductListing.objects.all(), view)
+            # what the list endpoint does: a count and the first page
+            return queryset.count(), list(queryset.order_by('-created_at', '-id')[:20])
+
+        return run
+
+    def search_index(self, query):
+        ranked = search(query)
+        return len(ranked), list(ProductListing.objects.filter(pk__in=ranked[:20]))
+
+    def measure(self, fn, query):
+        started = time.perf_counter()
+        hits, _ = fn(query)
+        return (time.perf_counter() - started) * 1000, hits
+
+    def report(self, label, samples):
+        timings = sorted(ms for ms, _ in samples)
+        p95 = timings[min(int(len(timings) * 0.95), len(timings) - 1)]
+        hits = statistics.mean(hits for _, hits in samples)
+        self.stdout.write(
+            f"{label:<14} p50 {statistics.median(timings):8.1f} ms   p95 {p95:8.1f} ms   "
+            f"mean matches {hits:10.1f}")
@@ -0,0 +1,26 @@
+from django.core.management.base import BaseCommand
+
+from apps.products.models import Product, ProductListing
+from apps.products.read_model import recompute_facets, refresh_listing
+from apps.products.search import rebuild_index
+
+
+class Command(BaseCommand):
+    help = "Rebuild the product listing read model, facet counts and search index from the write model"
+
+    def add_arguments(self, parser):
+        parser.add_argument('--chunk-size', type=int, default=1000)
+
+    def handle(self, *args, **options):
+        # listings whose product is gone or inactive
+        ProductListing.objects.exclude(product__is_active=True).delete()
+
+        count = 0
+        product_ids = Product.objects.order_by('pk').values_list('pk', flat=True)
+        for product_id in product_ids.iterator(chunk_size=options['chunk_size']):
+            refresh_listing(product_id)
+            count += 1
+
+        recompute_facets()
+        rebuild_index(ProductListing.objects.all(), chunk_size=options['chunk_size'])
+        self.stdout.write(self.style.SUCCESS(f"rebuilt {count} product listings"))
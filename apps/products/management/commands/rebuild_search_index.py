@@ -0,0 +1,15 @@
+from django.core.management.base import BaseCommand
+
+from apps.products.models import ProductListing
+from apps.products.search import rebuild_index
+
+
+class Command(BaseCommand):
+    help = "Rebuild the product search index and vocabulary from the listing table"
+
+    def add_arguments(self, parser):
+        parser.add_argument('--chunk-size', type=int, default=1000)
+
+    def handle(self, *args, **options):
+        count = rebuild_index(ProductListing.objects.all(), chunk_size=options['chunk_size'])
+        self.stdout.write(self.style.SUCCESS(f"indexed {count} product listings"))
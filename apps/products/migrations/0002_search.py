@@ -0,0 +1,57 @@
+# Generated by Django 4.2.7 on 2026-10-18 15:39
+
+from django.db import migrations, models
+import django.db.models.deletion
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('products', '0001_initial'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='ProductSearchDocument',
+            fields=[
+                ('listing', models.OneToOneField(on_delete=django.db.models.deletion.CASCADE, primary_key=True, related_name='search_document', serialize=False, to='products.productlisting')),
+                ('name_terms', models.TextField()),
+                ('body_terms', models.TextField(blank=True)),
+                ('phonetic_terms', models.TextField(blank=True)),
+                ('length', models.PositiveIntegerField()),
+            ],
+            options={
+                'verbose_name': 'product search document',
+                'verbose_name_plural': 'product search documents',
+            },
+        ),
+        migrations.CreateModel(
+            name='SearchTerm',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('term', models.CharField(max_length=50, unique=True)),
+                ('display', models.CharField(max_length=50)),
+                ('doc_freq', models.IntegerField(default=0)),
+            ],
+            options={
+                'verbose_name': 'search term',
+                'verbose_name_plural': 'search terms',
+            },
+        ),
+        migrations.CreateModel(
+            name='SearchPrefix',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('prefix', models.CharField(max_length=20)),
+                ('term', models.ForeignKey(on_delete=django.db.models.deletion.CASCADE, related_name='prefixes', to='products.searchterm')),
+            ],
+            options={
+                'verbose_name': 'search prefix',
+                'verbose_name_plural': 'search prefixes',
+            },
+        ),
+        migrations.AddConstraint(
+            model_name='searchprefix',
+            constraint=models.UniqueConstraint(fields=('prefix', 'term'), name='unique_search_prefix_term'),
+        ),
+    ]
@@ -0,0 +1,39 @@
+from django.db import migrations
+
+
+def create_fulltext_index(apps, schema_editor):
+    vendor = schema_editor.connection.vendor
+    if vendor == 'postgresql':
+        schema_editor.execute(
+            "ALTER TABLE products_productsearchdocument "
+            "ADD COLUMN search_vector tsvector NOT NULL DEFAULT ''::tsvector")
+        schema_editor.execute(
+            "CREATE INDEX products_search_vector_gin "
+            "ON products_productsearchdocument USING gin (search_vector)")
+    elif vendor == 'sqlite':
+        # the ascii tokenizer keeps non-ASCII characters (Devanagari vowel
+        # signs included) inside tokens; terms arrive pre-analyzed anyway
+        schema_editor.execute(
+            "CREATE VIRTUAL TABLE products_search_fts "
+            "USING fts5(name_terms, body_terms, phonetic_terms, tokenize='ascii')")
+
+
+def drop_fulltext_index(apps, schema_editor):
+    vendor = schema_editor.connection.vendor
+    if vendor == 'postgresql':
+        schema_editor.execute("DROP INDEX IF EXISTS products_search_vector_gin")
+        schema_editor.execute(
+            "ALTER TABLE products_productsearchdocument DROP COLUMN IF EXISTS search_vector")
+    elif vendor == 'sqlite':
+        schema_editor.execute("DROP TABLE IF EXISTS products_search_fts")
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('products', '0002_search'),
+    ]
+
+    operations = [
+        migrations.RunPython(create_fulltext_index, drop_fulltext_index),
+    ]
@@ -0,0 +1,223 @@
+import uuid
+from decimal import Decimal
+
+from django.conf import settings
+from django.core.validators import MinValueValidator
+from django.db import models
+from django.utils.text import slugify
+from django.utils.translation import gettext_lazy as _
+
+# lower bounds of the price facet buckets, in NPR
+PRICE_BUCKETS = (0, 500, 1000, 2500, 5000, 10000, 25000, 50000, 100000)
+
+CATEGORY_PATH_SEPARATOR = ' > '
+
+
+class Category(models.Model):
+    name = models.CharField(max_length=100)
+    slug = models.SlugField(max_length=120, unique=True)
+    parent = models.ForeignKey(
+        'self', on_delete=models.PROTECT, null=True, blank=True, related_name='children')
+
+    # "Electronics > Phones", kept in sync on save
+    path = models.CharField(max_length=500, editable=False)
+
+    created_at = models.DateTimeField(auto_now_add=True)
+    updated_at = models.DateTimeField(auto_now=True)
+
+    class Meta:
+        verbose_name = _('category')
+        verbose_name_plural = _('categories')
+        ordering = ['path']
+
+    def __str__(self):
+        return self.path
+
+    def build_path(self):
+        if self.parent_id:
+            return f"{self.parent.path}{CATEGORY_PATH_SEPARATOR}{self.name}"
+        return self.name
+
+    def save(self, *args, **kwargs):
+        if not self.slug:
+            self.slug = slugify(self.name)
+        self.path = self.build_path()
+        super().save(*args, **kwargs)
+
+
+class Product(models.Model):
+    """Write model, edited by sellers."""
+    seller = models.ForeignKey(
+        settings.AUTH_USER_MODEL, on_delete=models.CASCADE, related_name='products')
+    category = models.ForeignKey(
+        Category, on_delete=models.PROTECT, related_name='products')
+
+    name = models.CharField(max_length=200)
+    slug = models.SlugField(max_length=220, unique=True)
+    description = models.TextField(blank=True)
+
+    price = models.DecimalField(
+        max_digits=12, decimal_places=2, validators=[MinValueValidator(Decimal('0'))])
+    stock = models.PositiveIntegerField(default=0)
+    is_active = models.BooleanField(default=True)
+
+    created_at = models.DateTimeField(auto_now_add=True)
+    updated_at = models.DateTimeField(auto_now=True)
+
+    class Meta:
+        verbose_name = _('product')
+        verbose_name_plural = _('products')
+        ordering = ['-created_at']
+        indexes = [
+            models.Index(fields=['seller', '-created_at']),
+        ]
+
+    def __str__(self):
+        return self.name
+
+    def save(self, *args, **kwargs):
+        if not self.slug:
+            self.slug = f"{slugify(self.name) or 'product'}-{uuid.uuid4().hex[:8]}"
+        super().save(*args, **kwargs)
+
+
+class StockShard(models.Model):
+    """
+    Slice of a hot product's stock. Reservations decrement one shard at a
+    time, so concurrent checkouts of the same product lock different rows.
+    ``Product.stock`` holds whatever is not allocated to a shard.
+    """
+    product = models.ForeignKey(Product, on_delete=models.CASCADE, related_name='stock_shards')
+    shard = models.PositiveSmallIntegerField()
+    quantity = models.PositiveIntegerField(default=0)
+
+    class Meta:
+        verbose_name = _('stock shard')
+        verbose_name_plural = _('stock shards')
+        constraints = [
+            models.UniqueConstraint(fields=['product', 'shard'], name='unique_stock_shard'),
+        ]
+
+    def __str__(self):
+        return f"{self.product_id}#{self.shard} ({self.quantity})"
+
+
+class ProductListing(models.Model):
+    """
+    Denormalized read model behind the catalog endpoints, one row per active
+    product. Maintained by ``apps.products.read_model`` so listing pages
+    are answered from this table alone.
+    """
+    product = models.OneToOneField(
+        Product, on_delete=models.CASCADE, related_name='listing')
+
+    name = models.CharField(max_length=200)
+    slug = models.SlugField(max_length=220, unique=True)
+    price = models.DecimalField(max_digits=12, decimal_places=2)
+    price_bucket = models.PositiveSmallIntegerField()
+    in_stock = models.BooleanField()
+
+    seller_id = models.BigIntegerField()
+    seller_name = models.CharField(max_length=200)
+    province = models.CharField(max_length=50, blank=True)
+
+    category_id = models.BigIntegerField()
+    category_path = models.CharField(max_length=500)
+
+    rating_average = models.DecimalField(max_digits=3, decimal_places=2, default=0)
+    rating_count = models.PositiveIntegerField(default=0)
+
+    created_at = models.DateTimeField()
+
+    class Meta:
+        verbose_name = _('product listing')
+        verbose_name_plural = _('product listings')
+        ordering = ['-created_at', '-id']
+        indexes = [
+            models.Index(fields=['-created_at', '-id']),
+            models.Index(fields=['category_id', '-created_at', '-id']),
+            models.Index(fields=['province', '-created_at', '-id']),
+            models.Index(fields=['price_bucket', '-created_at', '-id']),
+            models.Index(fields=['seller_id', '-created_at', '-id']),
+        ]
+
+    def __str__(self):
+        return self.name
+
+
+class ProductFacet(models.Model):
+    """Number of listings per facet value, adjusted as listings change."""
+
+    class Facet(models.TextChoices):
+        CATEGORY = 'category', _('Category')
+        PROVINCE = 'province', _('Province')
+        PRICE_BUCKET = 'price_bucket', _('Price bucket')
+
+    facet = models.CharField(max_length=20, choices=Facet.choices)
+    value = models.CharField(max_length=100)
+    count = models.IntegerField(default=0)
+
+    class Meta:
+        verbose_name = _('product facet')
+        verbose_name_plural = _('product facets')
+        constraints = [
+            models.UniqueConstraint(fields=['facet', 'value'], name='unique_product_facet_value'),
+        ]
+
+    def __str__(self):
+        return f"{self.facet}={self.value} ({self.count})"
+
+
+class ProductSearchDocument(models.Model):
+    """
+    Analyzed text of a listing, one row per listing. The full-text index
+    over it lives outside the ORM: a ``tsvector`` column with a GIN index on
+    PostgreSQL, an FTS5 table on SQLite (see ``apps.products.search``).
+    """
+    listing = models.OneToOneField(
+        ProductListing, on_delete=models.CASCADE, primary_key=True,
+        related_name='search_document')
+
+    # space separated terms from apps.products.tokenizer.analyze
+    name_terms = models.TextField()
+    body_terms = models.TextField(blank=True)
+    phonetic_terms = models.TextField(blank=True)
+    length = models.PositiveIntegerField()
+
+    class Meta:
+        verbose_name = _('product search document')
+        verbose_name_plural = _('product search documents')
+
+    def __str__(self):
+        return self.name_terms
+
+
+class SearchTerm(models.Model):
+    """Vocabulary of the search index, with document frequencies for ranking."""
+    # phonetic keys are stored with a leading "~"
+    term = models.CharField(max_length=50, unique=True)
+    display = models.CharField(max_length=50)
+    doc_freq = models.IntegerField(default=0)
+
+    class Meta:
+        verbose_name = _('search term')
+        verbose_name_plural = _('search terms')
+
+    def __str__(self):
+        return self.term
+
+
+class SearchPrefix(models.Model):
+    """Edge n-grams of the vocabulary, backing autocomplete."""
+    prefix = models.CharField(max_length=20)
+    term = models.ForeignKey(SearchTerm, on_delete=models.CASCADE, related_name='prefixes')
+
+    class Meta:
+        verbose_name = _('search prefix')
+        verbose_name_plural = _('search prefixes')
+        constraints = [
+            models.UniqueConstraint(fields=['prefix', 'term'], name='unique_search_prefix_term'),
+        ]
+
+    def __str__(self):
+        return self.prefix
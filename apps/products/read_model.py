@@ -0,0 +1,202 @@
+"""
+Maintenance of the ``ProductListing`` read model and ``ProductFacet`` counts.
+
+Every change goes through ``refresh_listing``: it rebuilds one listing row
+from the write model and moves the facet counts from the old row's values to
+the new ones with ``F()`` updates, so counts stay exact without ever
+aggregating over the listing table. The listing's search document is
+reindexed in the same transaction (``apps.products.search``). Category
+renames are the exception: ``refresh_category_listings`` rewrites the
+category paths of a whole subtree in batches, from the outbox.
+"""
+from bisect import bisect_right
+
+from django.contrib.auth import get_user_model
+from django.db import transaction
+from django.db.models import Count, Exists, F, OuterRef
+
+from apps.geography.hierarchy import get_hierarchy
+
+from .models import PRICE_BUCKETS, Category, Product, ProductFacet, ProductListing, StockShard
+from .search import index_listing, index_listings, unindex_listing
+
+
+def price_bucket(price):
+    return max(bisect_right(PRICE_BUCKETS, price) - 1, 0)
+
+
+def price_bucket_label(bucket):
+    lower = PRICE_BUCKETS[bucket]
+    if bucket + 1 < len(PRICE_BUCKETS):
+        return f"{lower}-{PRICE_BUCKETS[bucket + 1]}"
+    return f"{lower}+"
+
+
+def seller_display_name(seller):
+    profile = getattr(seller, 'profile', None)
+    if profile is not None and profile.company_name:
+        return profile.company_name
+    return seller.full_name or seller.email
+
+
+def seller_fields(seller):
+    """The listing columns copied from the seller and their profile."""
+    return {
+        'seller_name': seller_display_name(seller),
+        'province': get_hierarchy().name('province', seller.province_id) or '',
+    }
+
+
+def listing_fields(product):
+    # running totals kept by apps.reviews, absent until the first review
+    rating = getattr(product, 'rating', None)
+    return {
+        'name': product.name,
+        'slug': product.slug,
+        'price': product.price,
+        'price_bucket': price_bucket(product.price),
+        'in_stock': product.stock > 0 or getattr(product, 'has_shard_stock', False),
+        'seller_id': product.seller_id,
+        **seller_fields(product.seller),
+        'category_id': product.category_id,
+        'category_path': product.category.path,
+        'rating_average': rating.average if rating else 0,
+        'rating_count': rating.count if rating else 0,
+        'created_at': product.created_at,
+    }
+
+
+def facet_values(listing):
+    """``{(facet, value)}`` a listing is counted under."""
+    if listing is None:
+        return set()
+    values = {
+        (ProductFacet.Facet.CATEGORY, str(listing.category_id)),
+        (ProductFacet.Facet.PRICE_BUCKET, str(listing.price_bucket)),
+    }
+    if listing.province:
+        values.add((ProductFacet.Facet.PROVINCE, listing.province))
+    return values
+
+
+def adjust_facets(values, delta):
+    for facet, value in values:
+        ProductFacet.objects.get_or_create(facet=facet, value=value)
+        ProductFacet.objects.filter(facet=facet, value=value).update(count=F('count') + delta)
+
+
+@transaction.atomic
+def refresh_listing(product_id):
+    """Bring the listing of ``product_id`` in line with the write model."""
+    listing = ProductListing.objects.select_for_update().filter(product_id=product_id).first()
+    product = (
+        Product.objects
+        .select_related('seller__profile', 'category', 'rating')
+        .annotate(has_shard_stock=Exists(
+            StockShard.objects.filter(product=OuterRef('pk'), quantity__gt=0)))
+        .filter(pk=product_id, is_active=True)
+        .first()
+    )
+
+    old_values = facet_values(listing)
+
+    if product is None:
+        if listing is not None:
+            unindex_listing(listing)
+            listing.delete()
+        new_values = set()
+    else:
+        fields = listing_fields(product)
+        if listing is None:
+            listing = ProductListing(product=product)
+        for attr, value in fields.items():
+            setattr(listing, attr, value)
+        listing.save()
+        index_listing(listing, product.description)
+        new_values = facet_values(listing)
+
+    adjust_facets(old_values - new_values, -1)
+    adjust_facets(new_values - old_values, 1)
+
+
+@transaction.atomic
+def remove_listing(product_id):
+    listing = ProductListing.objects.select_for_update().filter(product_id=product_id).first()
+    if listing is not None:
+        adjust_facets(facet_values(listing), -1)
+        unindex_listing(listing)
+        listing.delete()
+
+
+def refresh_seller_listings(seller_id):
+    """
+    Refresh the listings that no longer show the seller's name or
+    province. When nothing changed, that is one query for the seller and
+    one for their listings.
+    """
+    seller = get_user_model().objects.select_related('profile').filter(pk=seller_id).first()
+    if seller is None:
+        return
+    stale = ProductListing.objects.filter(seller_id=seller_id).exclude(**seller_fields(seller))
+    for product_id in stale.values_list('product_id', flat=True):
+        refresh_listing(product_id)
+
+
+def refresh_category_listings(category_id, batch_size=500):
+    """
+    Rebuild the paths of the categories below ``category_id`` and the
+    ``category_path`` of the listings in the whole subtree, reindexing
+    them, ``batch_size`` rows at a time with ``bulk_update``. Run from the
+    outbox (``apps.products.jobs``) after a category was saved.
+    """
+    category = Category.objects.filter(pk=category_id).first()
+    if category is None:
+        return
+    paths = {category.pk: category.path}
+    level = {category.pk: category}
+    while level:
+        children = list(Category.objects.filter(parent_id__in=level))
+        moved = []
+        for child in children:
+            child.parent = level[child.parent_id]
+            path = child.build_path()
+            if path != child.path:
+                child.path = path
+                moved.append(child)
+            paths[child.pk] = path
+        Category.objects.bulk_update(moved, ['path'], batch_size=batch_size)
+        level = {child.pk: child for child in children}
+
+    stale = [
+        pk for pk, category_id, path in ProductListing.objects
+        .filter(category_id__in=paths).values_list('pk', 'category_id', 'category_path')
+        if path != paths[category_id]
+    ]
+    for start in range(0, len(stale), batch_size):
+        with transaction.atomic():
+            listings = list(
+                ProductListing.objects.select_for_update().select_related('product')
+                .filter(pk__in=stale[start:start + batch_size])
+            )
+            for listing in listings:
+                listing.category_path = paths[listing.category_id]
+            ProductListing.objects.bulk_update(listings, ['category_path'])
+            # the path is part of the search document
+            index_listings(listings)
+
+
+@transaction.atomic
+def recompute_facets():
+    """Rebuild all facet counts from the listing table (maintenance only)."""
+    ProductFacet.objects.all().delete()
+    facets = []
+    for facet, field in ((ProductFacet.Facet.CATEGORY, 'category_id'),
+                         (ProductFacet.Facet.PROVINCE, 'province'),
+                         (ProductFacet.Facet.PRICE_BUCKET, 'price_bucket')):
+        rows = (
+            ProductListing.objects.exclude(**{field: ''}) if field == 'province'
+            else ProductListing.objects.all()
+        ).values(field).annotate(total=Count('id')).order_by()
+        facets.extend(ProductFacet(facet=facet, value=str(row[field]), count=row['total'])
+                      for row in rows)
+    ProductFacet.objects.bulk_create(facets)
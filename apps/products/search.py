@@ -0,0 +1,487 @@
+"""
+Full-text product search over ``ProductListing``.
+
+Listings are analyzed by ``apps.products.tokenizer`` into a
+``ProductSearchDocument`` row and matched by the database's own inverted
+index: a ``tsvector`` column with a GIN index on PostgreSQL, an FTS5 table
+on SQLite (both created by migration ``0003``). The database returns the
+best ``MAX_CANDIDATES`` matches by its own ranking and the first
+``RERANK_DEPTH`` of them are re-ranked here with BM25F using the term
+statistics kept in ``SearchTerm``, so the top results rank the same on
+every backend. ``SearchPrefix`` holds edge n-grams of the vocabulary for
+autocomplete.
+"""
+import math
+from collections import Counter
+
+from django.conf import settings
+from django.core.cache import cache
+from django.db import connection
+from django.db.models import Avg, Count, F, Q
+
+from .models import ProductSearchDocument, SearchPrefix, SearchTerm
+from .tokenizer import analyze, is_devanagari, phonetic_key, tokenize, transliterate
+
+DEFAULTS = {
+    'MAX_CANDIDATES': 1000,
+    # candidates re-ranked with BM25F, the rest keep the database's order
+    'RERANK_DEPTH': 200,
+    # BM25F field weights and parameters
+    'NAME_WEIGHT': 3.0,
+    'BODY_WEIGHT': 1.0,
+    'PHONETIC_WEIGHT': 0.5,
+    'K1': 1.2,
+    'B': 0.75,
+    'MAX_BODY_TERMS': 200,
+    'STATS_TIMEOUT': 300,
+}
+
+PHONETIC_MARK = '~'
+MIN_PREFIX = 2
+MAX_PREFIX = 20
+
+FTS_TABLE = 'products_search_fts'
+STATS_CACHE_KEY = 'products:search:stats'
+
+
+def get_setting(name):
+    return getattr(settings, 'PRODUCT_SEARCH', {}).get(name, DEFAULTS[name])
+
+
+def build_document(listing, description=''):
+    """Unsaved ``ProductSearchDocument`` for ``listing`` and its display map."""
+    name_terms, name_keys, display = analyze(listing.name)
+    body_text = ' '.join(filter(None, [listing.category_path, listing.seller_name, description]))
+    body_terms, body_keys, body_display = analyze(body_text)
+    body_terms = body_terms[:get_setting('MAX_BODY_TERMS')]
+    for term, word in body_display.items():
+        display.setdefault(term, word)
+
+    document = ProductSearchDocument(
+        listing=listing,
+        name_terms=' '.join(name_terms),
+        body_terms=' '.join(body_terms),
+        phonetic_terms=' '.join(name_keys + body_keys[:len(body_terms)]),
+        length=len(name_terms) + len(body_terms),
+    )
+    return document, display
+
+
+def document_terms(document):
+    """Distinct vocabulary entries a document is counted under."""
+    if document is None:
+        return set()
+    terms = set(document.name_terms.split()) | set(document.body_terms.split())
+    return terms | {PHONETIC_MARK + key for key in document.phonetic_terms.split()}
+
+
+def add_terms(terms, display, count=1):
+    """Create missing vocabulary entries and move their document frequency."""
+    if not terms:
+        return
+    existing = set(SearchTerm.objects.filter(term__in=terms).values_list('term', flat=True))
+    missing = terms - existing
+    if missing:
+        SearchTerm.objects.bulk_create(
+            [SearchTerm(term=term, display=display.get(term, term.lstrip(PHONETIC_MARK)))
+             for term in missing],
+            ignore_conflicts=True)
+        created = (
+            SearchTerm.objects.filter(term__in=missing)
+            .exclude(term__startswith=PHONETIC_MARK)
+            .values_list('pk', 'term')
+        )
+        SearchPrefix.objects.bulk_create(
+            [SearchPrefix(prefix=prefix, term_id=pk)
+             for pk, term in created for prefix in edge_ngrams(term)],
+            ignore_conflicts=True)
+    SearchTerm.objects.filter(term__in=terms).update(doc_freq=F('doc_freq') + count)
+
+
+def remove_terms(terms, count=1):
+    if terms:
+        SearchTerm.objects.filter(term__in=terms).update(doc_freq=F('doc_freq') - count)
+
+
+def by_count(counter):
+    """``{count: terms}`` of a ``Counter``, one frequency update per count."""
+    groups = {}
+    for term, count in counter.items():
+        groups.setdefault(count, set()).add(term)
+    return groups.items()
+
+
+def edge_ngrams(term):
+    return [term[:size] for size in range(MIN_PREFIX, min(len(term), MAX_PREFIX) + 1)]
+
+
+def index_listing(listing, description=''):
+    """(Re)index one listing. Runs inside ``refresh_listing``'s transaction."""
+    old = ProductSearchDocument.objects.filter(pk=listing.pk).first()
+    document, display = build_document(listing, description)
+    document.save()
+    get_backend().index([document])
+
+    old_terms, new_terms = document_terms(old), document_terms(document)
+    remove_terms(old_terms - new_terms)
+    add_terms(new_terms - old_terms, display)
+
+
+def index_listings(listings):
+    """
+    ``index_listing`` for a batch of listings loaded with their ``product``,
+    in a few statements for the whole batch. Runs inside the caller's
+    transaction, with the listings locked.
+    """
+    old = ProductSearchDocument.objects.in_bulk([listing.pk for listing in listings])
+    documents = []
+    display = {}
+    added = Counter()
+    removed = Counter()
+    for listing in listings:
+        document, words = build_document(listing, listing.product.description)
+        for term, word in words.items():
+            display.setdefault(term, word)
+        old_terms, new_terms = document_terms(old.get(listing.pk)), document_terms(document)
+        removed.update(old_terms - new_terms)
+        added.update(new_terms - old_terms)
+        documents.append(document)
+
+    ProductSearchDocument.objects.bulk_create(
+        documents, update_conflicts=True, unique_fields=['listing'],
+        update_fields=['name_terms', 'body_terms', 'phonetic_terms', 'length'])
+    get_backend().index(documents)
+    for count, terms in by_count(removed):
+        remove_terms(terms, count)
+    for count, terms in by_count(added):
+        add_terms(terms, display, count)
+
+
+def unindex_listing(listing):
+    document = ProductSearchDocument.objects.filter(pk=listing.pk).first()
+    if document is not None:
+        remove_terms(document_terms(document))
+        get_backend().remove([document.pk])
+        document.delete()
+
+
+def get_statistics():
+    """``(document count, average document length)``, cached."""
+    stats = cache.get(STATS_CACHE_KEY)
+    if stats is None:
+        row = ProductSearchDocument.objects.aggregate(count=Count('pk'), avg=Avg('length'))
+        stats = (row['count'], row['avg'] or 0.0)
+        cache.set(STATS_CACHE_KEY, stats, get_setting('STATS_TIMEOUT'))
+    return stats
+
+
+class QueryTerm:
+    """One word of the query and the index terms that satisfy it."""
+
+    def __init__(self, word, prefix=False):
+        self.terms = {word}
+        if is_devanagari(word):
+            self.terms.add(transliterate(word))
+        self.prefixes = self.terms if prefix else set()
+        self.phonetic = phonetic_key(word)
+
+    def match(self, words):
+        """The members of ``words`` this query word matches."""
+        found = self.terms & words
+        if self.prefixes:
+            prefixes = tuple(self.prefixes)
+            found |= {word for word in words if word.startswith(prefixes)}
+        return found
+
+
+def parse_query(query):
+    """
+    Query words, all of which must match. The last word also matches as a
+    prefix while it is being typed (no trailing space).
+    """
+    words = tokenize(query)
+    typing = bool(query) and not query[-1].isspace()
+    return [QueryTerm(word, prefix=typing and i == len(words) - 1)
+            for i, word in enumerate(words)]
+
+
+def batches(items, size=500):
+    # keeps multi-row statements under the databases' parameter limits
+    for start in range(0, len(items), size):
+        yield items[start:start + size]
+
+
+class PostgresBackend:
+    """``tsvector`` column with a GIN index on ``products_productsearchdocument``."""
+
+    weights = (('name_terms', 'A'), ('body_terms', 'B'), ('phonetic_terms', 'C'))
+
+    @staticmethod
+    def quote(term):
+        return "'" + term.replace('\\', '\\\\').replace("'", "''") + "'"
+
+    def to_tsvector(self, document):
+        positions = {}
+        position = 0
+        for field, weight in self.weights:
+            for term in getattr(document, field).split():
+                position = min(position + 1, 16383)
+                positions.setdefault(term, []).append(f'{position}{weight}')
+        # a lexeme keeps at most 256 positions
+        return ' '.join(f"{self.quote(term)}:{','.join(found[:256])}"
+                        for term, found in positions.items())
+
+    def to_tsquery(self, query_terms):
+        groups = []
+        for query_term in query_terms:
+            options = [f'{self.quote(term)}:AB' for term in query_term.terms]
+            options += [f'{self.quote(prefix)}:*AB' for prefix in query_term.prefixes]
+            if query_term.phonetic:
+                options.append(f'{self.quote(query_term.phonetic)}:C')
+            groups.append('(' + ' | '.join(options) + ')')
+        return ' & '.join(groups)
+
+    def index(self, documents):
+        for batch in batches(documents):
+            self.index_batch(batch)
+
+    def index_batch(self, documents):
+        rows = ', '.join(['(%s, %s)'] * len(documents))
+        params = [value for document in documents
+                  for value in (document.pk, self.to_tsvector(document))]
+        with connection.cursor() as cursor:
+            cursor.execute(
+                'UPDATE products_productsearchdocument AS document '
+                'SET search_vector = CAST(v.vector AS tsvector) '
+                f'FROM (VALUES {rows}) AS v (id, vector) WHERE document.listing_id = v.id',
+                params)
+
+    def remove(self, pks):
+        # the column goes with the row
+        pass
+
+    def clear(self):
+        pass
+
+    def match(self, query_terms, limit):
+        tsquery = self.to_tsquery(query_terms)
+        with connection.cursor() as cursor:
+            cursor.execute(
+                'SELECT listing_id FROM products_productsearchdocument '
+                'WHERE search_vector @@ %s::tsquery '
+                'ORDER BY ts_rank(search_vector, %s::tsquery, 1) DESC LIMIT %s',
+                [tsquery, tsquery, limit])
+            return [row[0] for row in cursor.fetchall()]
+
+
+class SqliteBackend:
+    """FTS5 table keyed by listing id, for development and tests."""
+
+    @staticmethod
+    def quote(term):
+        return '"' + term.replace('"', '""') + '"'
+
+    def to_match(self, query_terms):
+        groups = []
+        for query_term in query_terms:
+            options = [self.quote(term) for term in query_term.terms]
+            options += [f'{self.quote(prefix)} *' for prefix in query_term.prefixes]
+            group = '{name_terms body_terms} : (' + ' OR '.join(options) + ')'
+            if query_term.phonetic:
+                group += f' OR phonetic_terms : {self.quote(query_term.phonetic)}'
+            groups.append(f'({group})')
+        return ' AND '.join(groups)
+
+    def index(self, documents):
+        for batch in batches(documents):
+            self.index_batch(batch)
+
+    def index_batch(self, documents):
+        self.remove([document.pk for document in documents])
+        rows = ', '.join(['(%s, %s, %s, %s)'] * len(documents))
+        params = [value for d in documents
+                  for value in (d.pk, d.name_terms, d.body_terms, d.phonetic_terms)]
+        with connection.cursor() as cursor:
+            cursor.execute(
+                f'INSERT INTO {FTS_TABLE} (rowid, name_terms, body_terms, phonetic_terms) '
+                f'VALUES {rows}', params)
+
+    def remove(self, pks):
+        with connection.cursor() as cursor:
+            for batch in batches(pks):
+                cursor.execute(
+                    f"DELETE FROM {FTS_TABLE} WHERE rowid IN ({', '.join(['%s'] * len(batch))})",
+                    batch)
+
+    def clear(self):
+        with connection.cursor() as cursor:
+            cursor.execute(f'DELETE FROM {FTS_TABLE}')
+
+    def match(self, query_terms, limit):
+        weights = ', '.join(str(get_setting(name)) for name in
+                            ('NAME_WEIGHT', 'BODY_WEIGHT', 'PHONETIC_WEIGHT'))
+        with connection.cursor() as cursor:
+            cursor.execute(
+                f'SELECT rowid FROM {FTS_TABLE} WHERE {FTS_TABLE} MATCH %s '
+                f'ORDER BY bm25({FTS_TABLE}, {weights}) LIMIT %s',
+                [self.to_match(query_terms), limit])
+            return [row[0] for row in cursor.fetchall()]
+
+
+class ScanBackend:
+    """Unindexed fallback for other databases."""
+
+    def index(self, documents):
+        pass
+
+    def remove(self, pks):
+        pass
+
+    def clear(self):
+        pass
+
+    def match(self, query_terms, limit):
+        documents = ProductSearchDocument.objects.all()
+        for query_term in query_terms:
+            condition = Q()
+            for term in query_term.terms | query_term.prefixes:
+                condition |= Q(name_terms__contains=term) | Q(body_terms__contains=term)
+            if query_term.phonetic:
+                condition |= Q(phonetic_terms__contains=query_term.phonetic)
+            documents = documents.filter(condition)
+        return list(documents.values_list('pk', flat=True)[:limit])
+
+
+BACKENDS = {'postgresql': PostgresBackend, 'sqlite': SqliteBackend}
+
+
+def get_backend():
+    return BACKENDS.get(connection.vendor, ScanBackend)()
+
+
+def rank(query_terms, pks):
+    """``pks`` ordered by BM25F score against ``query_terms``."""
+    documents = ProductSearchDocument.objects.filter(pk__in=pks).values_list(
+        'pk', 'name_terms', 'body_terms', 'phonetic_terms', 'length')
+    count, average_length = get_statistics()
+    k1, b = get_setting('K1'), get_setting('B')
+    name_weight, body_weight, phonetic_weight = (
+        get_setting('NAME_WEIGHT'), get_setting('BODY_WEIGHT'), get_setting('PHONETIC_WEIGHT'))
+
+    # per document and query term: [(vocabulary term, weighted tf)]
+    parsed = []
+    matched_terms = set()
+    for pk, name_terms, body_terms, phonetic_terms, length in documents:
+        name, body = Counter(name_terms.split()), Counter(body_terms.split())
+        phonetic = phonetic_terms.split()
+        words = name.keys() | body.keys()
+        matches = []
+        for query_term in query_terms:
+            found = [(term, name_weight * name[term] + body_weight * body[term])
+                     for term in query_term.match(words)]
+            if query_term.phonetic in phonetic:
+                found.append((PHONETIC_MARK + query_term.phonetic,
+                              phonetic_weight * phonetic.count(query_term.phonetic)))
+            matched_terms.update(term for term, _ in found)
+            matches.append(found)
+        parsed.append((pk, length, matches))
+
+    doc_freqs = dict(SearchTerm.objects.filter(term__in=matched_terms).values_list('term', 'doc_freq'))
+    idf = {
+        term: math.log(1 + (count - doc_freqs.get(term, 0) + 0.5) / (doc_freqs.get(term, 0) + 0.5))
+        for term in matched_terms
+    }
+
+    scores = {}
+    for pk, length, matches in parsed:
+        norm = k1 * (1 - b + b * length / (average_length or 1))
+        # each query word counts once, through its best matching term
+        scores[pk] = sum(
+            max((idf[term] * tf * (k1 + 1) / (tf + norm) for term, tf in found), default=0.0)
+            for found in matches)
+
+    return sorted(scores, key=lambda pk: (-scores[pk], -pk))
+
+
+def search(query):
+    """Listing ids matching ``query``, best first."""
+    query_terms = parse_query(query)
+    if not query_terms:
+        return []
+    candidates = get_backend().match(query_terms, get_setting('MAX_CANDIDATES'))
+    depth = get_setting('RERANK_DEPTH')
+    return rank(query_terms, candidates[:depth]) + candidates[depth:]
+
+
+def autocomplete(text, limit=10):
+    """Completions of the last word of ``text``, most common first."""
+    words = tokenize(text)
+    if not words or len(words[-1]) < MIN_PREFIX:
+        return []
+    prefixes = {words[-1][:MAX_PREFIX]}
+    if is_devanagari(words[-1]):
+        prefixes.add(transliterate(words[-1])[:MAX_PREFIX])
+
+    terms = (
+        SearchTerm.objects
+        .filter(prefixes__prefix__in=prefixes, doc_freq__gt=0)
+        .order_by('-doc_freq', 'term')
+        .values_list('display', 'doc_freq')
+    )
+    if len(words[-1]) > MAX_PREFIX:
+        terms = terms.filter(term__startswith=words[-1])
+
+    suggestions = {}
+    for display, doc_freq in terms[:limit * 2]:
+        suggestions.setdefault(display, doc_freq)
+    return [{'term': display, 'count': count}
+            for display, count in list(suggestions.items())[:limit]]
+
+
+def rebuild_index(listings, chunk_size=1000):
+    """
+    Re-analyze ``listings`` (a ``ProductListing`` queryset) in bulk and
+    recompute the vocabulary from scratch. Maintenance and benchmarks only;
+    day to day indexing goes through ``index_listing``.
+    """
+    backend = get_backend()
+    backend.clear()
+    ProductSearchDocument.objects.all().delete()
+    SearchTerm.objects.all().delete()
+
+    doc_freqs = Counter()
+    display = {}
+    count = 0
+    chunk = []
+    listings = listings.select_related('product').only(
+        'pk', 'name', 'category_path', 'seller_name', 'product__description')
+
+    def flush():
+        ProductSearchDocument.objects.bulk_create(chunk)
+        backend.index(chunk)
+        chunk.clear()
+
+    for listing in listings.iterator(chunk_size=chunk_size):
+        document, words = build_document(listing, listing.product.description)
+        doc_freqs.update(document_terms(document))
+        for term, word in words.items():
+            display.setdefault(term, word)
+        chunk.append(document)
+        count += 1
+        if len(chunk) >= chunk_size:
+            flush()
+    if chunk:
+        flush()
+
+    SearchTerm.objects.bulk_create(
+        [SearchTerm(term=term, doc_freq=freq, display=display.get(term, term.lstrip(PHONETIC_MARK)))
+         for term, freq in doc_freqs.items()],
+        batch_size=chunk_size)
+    terms = SearchTerm.objects.exclude(term__startswith=PHONETIC_MARK).values_list('pk', 'term')
+    SearchPrefix.objects.bulk_create(
+        (SearchPrefix(prefix=prefix, term_id=pk)
+         for pk, term in terms.iterator(chunk_size=chunk_size) for prefix in edge_ngrams(term)),
+        batch_size=chunk_size)
+
+    cache.delete(STATS_CACHE_KEY)
+    return count
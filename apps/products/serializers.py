@@ -0,0 +1,43 @@
+from rest_framework import serializers
+
+from .models import Category, Product, ProductListing
+
+
+class CategorySerializer(serializers.ModelSerializer):
+    class Meta:
+        model = Category
+        fields = ['id', 'name', 'slug', 'parent', 'path']
+        read_only_fields = ['id', 'path']
+
+
+class ProductSerializer(serializers.ModelSerializer):
+    """Write model serializer for sellers."""
+    class Meta:
+        model = Product
+        fields = [
+            'id', 'category', 'name', 'slug', 'description',
+            'price', 'stock', 'is_active', 'created_at', 'updated_at'
+        ]
+        read_only_fields = ['id', 'slug', 'created_at', 'updated_at']
+
+    def update(self, instance, validated_data):
+        # checkouts decrement stock with conditional UPDATEs; only write the
+        # column when the seller actually sets it, never a stale copy
+        for attr, value in validated_data.items():
+            setattr(instance, attr, value)
+        instance.save(update_fields=[*validated_data, 'updated_at'])
+        return instance
+
+
+class ProductListingSerializer(serializers.ModelSerializer):
+    id = serializers.IntegerField(source='product_id', read_only=True)
+
+    class Meta:
+        model = ProductListing
+        fields = [
+            'id', 'name', 'slug', 'price', 'in_stock',
+            'seller_id', 'seller_name', 'province',
+            'category_id', 'category_path',
+            'rating_average', 'rating_count', 'created_at'
+        ]
+        read_only_fields = fields
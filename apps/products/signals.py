@@ -0,0 +1,51 @@
+from django.db import transaction
+from django.db.models.signals import post_save, pre_delete
+from django.dispatch import receiver
+
+from apps.users.models import User, UserProfile
+from apps.utils.outbox import enqueue
+
+from .models import Category, Product
+from .read_model import refresh_listing, refresh_seller_listings, remove_listing
+
+
+@receiver(post_save, sender=Product)
+def update_product_listing(sender, instance, **kwargs):
+    transaction.on_commit(lambda: refresh_listing(instance.pk))
+
+
+@receiver(pre_delete, sender=Product)
+def delete_product_listing(sender, instance, **kwargs):
+    remove_listing(instance.pk)
+
+
+@receiver(post_save, sender=Category)
+def update_category_listings(sender, instance, created, **kwargs):
+    # the subtree can hold most of the catalog, rebuilt by apps.products.jobs
+    if not created:
+        enqueue('refresh_category', {'category': instance.pk})
+
+
+# what listings copy from the seller (see read_model.seller_fields); saves
+# limited to other fields (password rehash, last_login, avatar renditions)
+# leave the listings alone
+SELLER_FIELDS = {'first_name', 'last_name', 'email', 'province'}
+SELLER_PROFILE_FIELDS = {'company_name'}
+
+
+@receiver(post_save, sender=User)
+def update_seller_listings(sender, instance, created, update_fields, **kwargs):
+    if created or not instance.is_seller:
+        return
+    if update_fields is None or SELLER_FIELDS & set(update_fields):
+        transaction.on_commit(lambda: refresh_seller_listings(instance.pk))
+
+
+@receiver(post_save, sender=UserProfile)
+def update_seller_profile_listings(sender, instance, created, update_fields, **kwargs):
+    # no instance.user here, that is a query; customers have no listings
+    # for refresh_seller_listings to find
+    if created:
+        return
+    if update_fields is None or SELLER_PROFILE_FIELDS & set(update_fields):
+        transaction.on_commit(lambda: refresh_seller_listings(instance.user_id))
@@ -0,0 +1,148 @@
+"""
+Tokenizer for product search.
+
+Product names mix Nepali (Devanagari) and English, and shoppers type either
+script or a romanized spelling of either. Every word is indexed as itself,
+as its romanization when it is Devanagari, and as a phonetic key shared by
+the usual spellings of the same sound, so "मोबाइल", "mobail" and "mobile"
+all meet on the key "mbl".
+"""
+import re
+import unicodedata
+
+WORD_RE = re.compile(r'(?:[^\W_]|[ऀ-ॿ])+')
+DEVANAGARI_RE = re.compile(r'[ऀ-ॿ]')
+
+MAX_TOKEN_LENGTH = 40
+MIN_PHONETIC_LENGTH = 2
+
+VIRAMA = '्'
+
+DIGITS = {chr(0x0966 + n): str(n) for n in range(10)}
+
+VOWELS = {
+    'अ': 'a', 'आ': 'a', 'इ': 'i', 'ई': 'i', 'उ': 'u', 'ऊ': 'u', 'ऋ': 'ri',
+    'ए': 'e', 'ऐ': 'ai', 'ओ': 'o', 'औ': 'au',
+}
+
+VOWEL_SIGNS = {
+    'ा': 'a', 'ि': 'i', 'ी': 'i', 'ु': 'u', 'ू': 'u', 'ृ': 'ri',
+    'े': 'e', 'ै': 'ai', 'ो': 'o', 'ौ': 'au',
+}
+
+CONSONANTS = {
+    'क': 'k', 'ख': 'kh', 'ग': 'g', 'घ': 'gh', 'ङ': 'ng',
+    'च': 'ch', 'छ': 'chh', 'ज': 'j', 'झ': 'jh', 'ञ': 'n',
+    'ट': 't', 'ठ': 'th', 'ड': 'd', 'ढ': 'dh', 'ण': 'n',
+    'त': 't', 'थ': 'th', 'द': 'd', 'ध': 'dh', 'न': 'n',
+    'प': 'p', 'फ': 'ph', 'ब': 'b', 'भ': 'bh', 'म': 'm',
+    'य': 'y', 'र': 'r', 'ल': 'l', 'व': 'w',
+    'श': 'sh', 'ष': 'sh', 'स': 's', 'ह': 'h',
+}
+
+SIGNS = {'ं': 'n', 'ँ': 'n', 'ः': 'h', 'ॐ': 'om'}
+
+# conjuncts romanized by sound rather than letter by letter
+CONJUNCTS = {'ज्ञ': 'gy', 'क्ष': 'ksh', 'त्र': 'tr'}
+
+# applied in order to romanized text before vowels are dropped
+PHONETIC_RULES = (
+    (re.compile(r'chh|ch'), 'c'),
+    (re.compile(r'sh'), 's'),
+    (re.compile(r'ph'), 'f'),
+    (re.compile(r'ck|q'), 'k'),
+    (re.compile(r'c'), 'k'),
+    (re.compile(r'x'), 'ks'),
+    (re.compile(r'([kgjtdb])h'), r'\1'),
+    (re.compile(r'[vw]'), 'b'),
+    (re.compile(r'z'), 'j'),
+)
+SILENT_RE = re.compile(r'[aeiouyh]')
+
+
+def normalize(text):
+    text = unicodedata.normalize('NFKC', text).lower()
+    return ''.join(DIGITS.get(char, char) for char in text)
+
+
+def tokenize(text):
+    """Lowercased words of ``text``, in order."""
+    return [word[:MAX_TOKEN_LENGTH] for word in WORD_RE.findall(normalize(text or ''))]
+
+
+def is_devanagari(word):
+    return DEVANAGARI_RE.search(word) is not None
+
+
+def transliterate(word):
+    """Romanize a Devanagari word the way it is commonly spelled in Nepal."""
+    out = []
+    # a consonant without a vowel sign carries an inherent "a"
+    inherent = False
+    i = 0
+    while i < len(word):
+        conjunct = word[i:i + 3]
+        char = word[i]
+        if conjunct in CONJUNCTS or char in CONSONANTS:
+            if inherent:
+                out.append('a')
+            if conjunct in CONJUNCTS:
+                out.append(CONJUNCTS[conjunct])
+                i += 2
+            else:
+                out.append(CONSONANTS[char])
+            inherent = True
+        elif char in VOWEL_SIGNS:
+            out.append(VOWEL_SIGNS[char])
+            inherent = False
+        elif char == VIRAMA:
+            inherent = False
+        elif char in VOWELS or char in SIGNS or not DEVANAGARI_RE.match(char):
+            if inherent:
+                out.append('a')
+            out.append(VOWELS.get(char) or SIGNS.get(char) or char)
+            inherent = False
+        i += 1
+    # the inherent vowel of a final consonant is not pronounced in Nepali
+    return ''.join(out)
+
+
+def phonetic_key(word):
+    """
+    Consonant skeleton of a romanized word: digraphs folded to one letter,
+    vowels and aspiration dropped, repeats collapsed, cut to
+    ``MAX_TOKEN_LENGTH`` (``x`` becomes ``ks``). ``''`` when the word is
+    too short or numeric to carry a useful key.
+    """
+    if is_devanagari(word):
+        word = transliterate(word)
+    if not word.isascii() or word.isdigit():
+        return ''
+    for pattern, replacement in PHONETIC_RULES:
+        word = pattern.sub(replacement, word)
+    key = SILENT_RE.sub('', word)
+    key = re.sub(r'(.)\1+', r'\1', key)[:MAX_TOKEN_LENGTH]
+    return key if len(key) >= MIN_PHONETIC_LENGTH else ''
+
+
+def analyze(text):
+    """
+    ``(terms, phonetic_keys, display)`` for ``text``. ``terms`` holds every
+    word plus the romanization of Devanagari words; ``display`` maps each
+    term to the word as written, for autocomplete suggestions.
+    """
+    terms = []
+    keys = []
+    display = {}
+    for word in tokenize(text):
+        terms.append(word)
+        display.setdefault(word, word)
+        if is_devanagari(word):
+            roman = transliterate(word)[:MAX_TOKEN_LENGTH]
+            if roman and roman != word:
+                terms.append(roman)
+                display.setdefault(roman, word)
+        key = phonetic_key(word)
+        if key:
+            keys.append(key)
+    return terms, keys, display
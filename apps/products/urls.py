@@ -0,0 +1,20 @@
+from django.urls import path, include
+from rest_framework.routers import DefaultRouter
+from . import views
+
+router = DefaultRouter()
+router.register(r'seller/products', views.SellerProductViewSet, basename='seller-product')
+
+urlpatterns = [
+    # catalog, read model
+    path('', views.ProductListingView.as_view(), name='product-list'),
+    path('search/', views.ProductSearchView.as_view(), name='product-search'),
+    path('autocomplete/', views.ProductAutocompleteView.as_view(), name='product-autocomplete'),
+    path('facets/', views.ProductFacetView.as_view(), name='product-facets'),
+    path('categories/', views.CategoryListView.as_view(), name='category-list'),
+
+    # seller management, write model
+    path('', include(router.urls)),
+
+    path('<slug:slug>/', views.ProductListingDetailView.as_view(), name='product-detail'),
+]
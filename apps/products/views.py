@@ -0,0 +1,89 @@
+from rest_framework import generics, permissions, viewsets
+from rest_framework.pagination import PageNumberPagination
+from rest_framework.response import Response
+from rest_framework.views import APIView
+
+from shared.permissions.permissions import IsSellerUser
+
+from .models import Category, Product, ProductFacet, ProductListing
+from .read_model import price_bucket_label
+from .search import autocomplete, search
+from .serializers import CategorySerializer, ProductListingSerializer, ProductSerializer
+
+
+class ProductListingView(generics.ListAPIView):
+    """Catalog browse, served from the denormalized listing table only."""
+    queryset = ProductListing.objects.all()
+    serializer_class = ProductListingSerializer
+    permission_classes = [permissions.AllowAny]
+    filterset_fields = ['category_id', 'province', 'price_bucket', 'seller_id', 'in_stock']
+    ordering_fields = ['price', 'created_at', 'rating_average']
+
+
+class ProductListingDetailView(generics.RetrieveAPIView):
+    queryset = ProductListing.objects.all()
+    serializer_class = ProductListingSerializer
+    permission_classes = [permissions.AllowAny]
+    lookup_field = 'slug'
+
+
+class ProductSearchView(generics.GenericAPIView):
+    """Full-text search, ``?q=``, ranked by relevance."""
+    serializer_class = ProductListingSerializer
+    permission_classes = [permissions.AllowAny]
+    # pages over the ranked ids, keyset pagination has no meaning here
+    pagination_class = PageNumberPagination
+
+    def get(self, request):
+        ranked = search(request.query_params.get('q', ''))
+        page = self.paginate_queryset(ranked)
+        listings = ProductListing.objects.in_bulk(page)
+        serializer = self.get_serializer(
+            [listings[pk] for pk in page if pk in listings], many=True)
+        return self.get_paginated_response(serializer.data)
+
+
+class ProductAutocompleteView(APIView):
+    permission_classes = [permissions.AllowAny]
+
+    def get(self, request):
+        return Response(autocomplete(request.query_params.get('q', '')))
+
+
+class ProductFacetView(APIView):
+    permission_classes = [permissions.AllowAny]
+
+    def get(self, request):
+        facets = {facet: [] for facet in ProductFacet.Facet.values}
+        rows = ProductFacet.objects.filter(count__gt=0).order_by('facet', '-count', 'value')
+        category_paths = dict(Category.objects.values_list('id', 'path'))
+
+        for row in rows:
+            if row.facet == ProductFacet.Facet.CATEGORY:
+                label = category_paths.get(int(row.value), row.value)
+            elif row.facet == ProductFacet.Facet.PRICE_BUCKET:
+                label = price_bucket_label(int(row.value))
+            else:
+                label = row.value
+            facets[row.facet].append({'value': row.value, 'label': label, 'count': row.count})
+
+        return Response(facets)
+
+
+class CategoryListView(generics.ListAPIView):
+    queryset = Category.objects.all()
+    serializer_class = CategorySerializer
+    permission_classes = [permissions.AllowAny]
+    pagination_class = None
+
+
+class SellerProductViewSet(viewsets.ModelViewSet):
+    """A seller's own products (write model)."""
+    serializer_class = ProductSerializer
+    permission_classes = [permissions.IsAuthenticated, IsSellerUser]
+
+    def get_queryset(self):
+        return Product.objects.filter(seller_id=self.request.user.pk)
+
+    def perform_create(self, serializer):
+        serializer.save(seller_id=self.request.user.pk)
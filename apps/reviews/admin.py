@@ -0,0 +1,45 @@
+from django.contrib import admin
+
+from . import services
+from .models import ProductRating, Review
+
+
+@admin.register(Review)
+class ReviewAdmin(admin.ModelAdmin):
+    list_display = ('product', 'user', 'rating', 'title', 'created_at')
+    list_filter = ('rating',)
+    search_fields = ('product__name', 'user__email', 'title')
+    raw_id_fields = ('product', 'user')
+    readonly_fields = ('created_at', 'updated_at')
+
+    # through the services so the rating aggregates follow
+    def save_model(self, request, obj, form, change):
+        if change:
+            services.update_review(obj, **{field: form.cleaned_data[field]
+                                           for field in form.changed_data})
+        else:
+            services.create_review(obj)
+
+    def get_readonly_fields(self, request, obj=None):
+        if obj is not None:
+            return (*self.readonly_fields, 'product')
+        return self.readonly_fields
+
+    def delete_model(self, request, obj):
+        services.delete_review(obj)
+
+    def delete_queryset(self, request, queryset):
+        for review in queryset:
+            services.delete_review(review)
+
+
+@admin.register(ProductRating)
+class ProductRatingAdmin(admin.ModelAdmin):
+    list_display = ('product', 'average', 'count', 'updated_at')
+    raw_id_fields = ('product',)
+
+    def has_add_permission(self, request):
+        return False
+
+    def has_change_permission(self, request, obj=None):
+        return False
@@ -0,0 +1,143 @@
+"""
+Running rating aggregates per product.
+
+``record`` is called with a review's old and new rating whenever one is
+written or deleted; it moves the count, total and star histogram of the
+product's ``ProductRating`` with ``F()`` updates in the caller's
+transaction and copies the new average and count onto the product's
+listing. Product pages and listings only ever read those rows.
+
+``recompute`` rebuilds the rows of some products from the reviews table
+and ``find_drift`` compares the two without changing anything; both are
+maintenance tools (``rebuild_review_aggregates``, ``check_review_aggregates``).
+"""
+from decimal import Decimal
+
+from django.db import transaction
+from django.db.models import Count, F
+from django.utils import timezone
+
+from apps.products.models import Product, ProductListing
+
+from .models import STARS, ProductRating, Review
+
+HISTOGRAM_FIELDS = [f'stars_{stars}' for stars in STARS]
+
+
+@transaction.atomic
+def record(product_id, old=None, new=None):
+    """Account for one review of ``product_id`` going from ``old`` to ``new`` stars."""
+    if old == new:
+        return
+    ProductRating.objects.get_or_create(product_id=product_id)
+
+    changes = {'updated_at': timezone.now()}
+    count = total = 0
+    if old:
+        changes[f'stars_{old}'] = F(f'stars_{old}') - 1
+        count -= 1
+        total -= old
+    if new:
+        changes[f'stars_{new}'] = F(f'stars_{new}') + 1
+        count += 1
+        total += new
+    if count:
+        changes['count'] = F('count') + count
+    changes['total'] = F('total') + total
+    ProductRating.objects.filter(pk=product_id).update(**changes)
+
+    rating = ProductRating.objects.get(pk=product_id)
+    ProductListing.objects.filter(product_id=product_id).update(
+        rating_average=rating.average, rating_count=rating.count)
+
+
+def tally(product_ids):
+    """``{product_id: ProductRating}`` counted from the reviews, unsaved."""
+    ratings = {}
+    rows = (
+        Review.objects
+        .filter(product_id__in=product_ids)
+        .values('product_id', 'rating')
+        .annotate(reviews=Count('id'))
+        .order_by()
+    )
+    for row in rows:
+        rating = ratings.setdefault(row['product_id'], ProductRating(product_id=row['product_id']))
+        setattr(rating, f"stars_{row['rating']}", row['reviews'])
+        rating.count += row['reviews']
+        rating.total += row['reviews'] * row['rating']
+    return ratings
+
+
+def counters(rating):
+    # a row emptied by record() reads the same as no row at all
+    if rating is None:
+        return 0, 0, dict.fromkeys(STARS, 0)
+    return rating.count, rating.total, rating.histogram
+
+
+def listing_rating(rating):
+    if rating is None:
+        return Decimal('0.00'), 0
+    return rating.average, rating.count
+
+
+@transaction.atomic
+def recompute(product_ids):
+    """Rebuild the aggregates and listing ratings of ``product_ids`` from the reviews."""
+    product_ids = list(product_ids)
+    # concurrent record() calls on these products wait for the rebuild
+    list(ProductRating.objects.select_for_update().filter(pk__in=product_ids).values_list('pk'))
+
+    ratings = tally(product_ids)
+    ProductRating.objects.filter(pk__in=product_ids).exclude(pk__in=list(ratings)).delete()
+    ProductRating.objects.bulk_create(
+        ratings.values(),
+        update_conflicts=True,
+        unique_fields=['product'],
+        update_fields=['count', 'total', *HISTOGRAM_FIELDS, 'updated_at'],
+    )
+
+    listings = []
+    for listing in ProductListing.objects.filter(product_id__in=product_ids).only(
+            'product_id', 'rating_average', 'rating_count'):
+        average, count = listing_rating(ratings.get(listing.product_id))
+        if (listing.rating_average, listing.rating_count) != (average, count):
+            listing.rating_average, listing.rating_count = average, count
+            listings.append(listing)
+    ProductListing.objects.bulk_update(listings, ['rating_average', 'rating_count'])
+    return len(ratings)
+
+
+def find_drift(product_ids):
+    """Ids of ``product_ids`` whose aggregates or listing rating disagree with the reviews."""
+    product_ids = list(product_ids)
+    expected = tally(product_ids)
+    stored = ProductRating.objects.in_bulk(product_ids)
+    listings = {
+        product_id: (average, count) for product_id, average, count in
+        ProductListing.objects.filter(product_id__in=product_ids)
+        .values_list('product_id', 'rating_average', 'rating_count')
+    }
+
+    drifted = []
+    for product_id in product_ids:
+        rating = expected.get(product_id)
+        listing = listings.get(product_id)
+        if counters(rating) != counters(stored.get(product_id)) or (
+                listing is not None and listing != listing_rating(rating)):
+            drifted.append(product_id)
+    return drifted
+
+
+def product_id_chunks(chunk_size):
+    """All product ids in ascending chunks, paged by key rather than offset."""
+    last = 0
+    while True:
+        chunk = list(
+            Product.objects.filter(pk__gt=last).order_by('pk')
+            .values_list('pk', flat=True)[:chunk_size])
+        if not chunk:
+            return
+        yield chunk
+        last = chunk[-1]
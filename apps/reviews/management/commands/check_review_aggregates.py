@@ -0,0 +1,35 @@
+from django.core.management.base import BaseCommand, CommandError
+
+from apps.reviews.aggregates import find_drift, product_id_chunks, recompute
+
+
+class Command(BaseCommand):
+    help = (
+        "Compare the product rating aggregates and listing ratings with the "
+        "reviews table; fails when they disagree unless --fix repairs them"
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument('--chunk-size', type=int, default=1000)
+        parser.add_argument('--fix', action='store_true',
+                            help="recompute the products that drifted")
+
+    def handle(self, *args, **options):
+        checked = fixed = 0
+        drifted = []
+        for chunk in product_id_chunks(options['chunk_size']):
+            checked += len(chunk)
+            found = find_drift(chunk)
+            if found and options['fix']:
+                recompute(found)
+                fixed += len(found)
+                found = find_drift(found)
+            drifted += found
+
+        if drifted:
+            sample = ', '.join(map(str, drifted[:20]))
+            raise CommandError(
+                f"{len(drifted)} of {checked} products have drifted rating aggregates: {sample}")
+        self.stdout.write(self.style.SUCCESS(
+            f"checked {checked} products, {fixed} fixed" if fixed
+            else f"checked {checked} products, no drift"))
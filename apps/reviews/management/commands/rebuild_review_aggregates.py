@@ -0,0 +1,19 @@
+from django.core.management.base import BaseCommand
+
+from apps.reviews.aggregates import product_id_chunks, recompute
+
+
+class Command(BaseCommand):
+    help = "Recompute the product rating aggregates and listing ratings from the reviews table"
+
+    def add_arguments(self, parser):
+        parser.add_argument('--chunk-size', type=int, default=1000,
+                            help="products per transaction")
+
+    def handle(self, *args, **options):
+        products = rated = 0
+        for chunk in product_id_chunks(options['chunk_size']):
+            rated += recompute(chunk)
+            products += len(chunk)
+        self.stdout.write(self.style.SUCCESS(
+            f"rebuilt rating aggregates of {products} products, {rated} with reviews"))
@@ -0,0 +1,75 @@
+from decimal import Decimal
+
+from django.conf import settings
+from django.core.validators import MaxValueValidator, MinValueValidator
+from django.db import models
+from django.utils.translation import gettext_lazy as _
+
+from apps.products.models import Product
+
+STARS = range(1, 6)
+
+
+class Review(models.Model):
+    product = models.ForeignKey(Product, on_delete=models.CASCADE, related_name='reviews')
+    # reviews outlive their author, so the product's rating does not change
+    user = models.ForeignKey(
+        settings.AUTH_USER_MODEL, on_delete=models.SET_NULL, null=True, related_name='reviews')
+    rating = models.PositiveSmallIntegerField(
+        validators=[MinValueValidator(1), MaxValueValidator(5)])
+    title = models.CharField(max_length=200, blank=True)
+    body = models.TextField(blank=True)
+
+    created_at = models.DateTimeField(auto_now_add=True)
+    updated_at = models.DateTimeField(auto_now=True)
+
+    class Meta:
+        verbose_name = _('review')
+        verbose_name_plural = _('reviews')
+        ordering = ['-created_at', '-id']
+        constraints = [
+            models.UniqueConstraint(fields=['product', 'user'], name='unique_review_per_user'),
+            models.CheckConstraint(
+                check=models.Q(rating__gte=1, rating__lte=5), name='review_rating_range'),
+        ]
+        indexes = [
+            models.Index(fields=['product', '-created_at', '-id']),
+        ]
+
+    def __str__(self):
+        return f"{self.rating}* for {self.product_id} by {self.user_id}"
+
+
+class ProductRating(models.Model):
+    """
+    Running rating totals of a product, kept by ``apps.reviews.aggregates``
+    as reviews change so nothing is aggregated when a product is shown.
+    """
+    product = models.OneToOneField(
+        Product, on_delete=models.CASCADE, primary_key=True, related_name='rating')
+    count = models.PositiveIntegerField(default=0)
+    total = models.PositiveIntegerField(default=0)
+    stars_1 = models.PositiveIntegerField(default=0)
+    stars_2 = models.PositiveIntegerField(default=0)
+    stars_3 = models.PositiveIntegerField(default=0)
+    stars_4 = models.PositiveIntegerField(default=0)
+    stars_5 = models.PositiveIntegerField(default=0)
+
+    updated_at = models.DateTimeField(auto_now=True)
+
+    class Meta:
+        verbose_name = _('product rating')
+        verbose_name_plural = _('product ratings')
+
+    def __str__(self):
+        return f"{self.product_id}: {self.average} ({self.count})"
+
+    @property
+    def average(self):
+        if not self.count:
+            return Decimal('0.00')
+        return (Decimal(self.total) / self.count).quantize(Decimal('0.01'))
+
+    @property
+    def histogram(self):
+        return {stars: getattr(self, f'stars_{stars}') for stars in STARS}
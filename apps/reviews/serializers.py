@@ -0,0 +1,35 @@
+from rest_framework import serializers
+
+from apps.products.models import Product
+
+from .models import ProductRating, Review
+
+
+class ReviewSerializer(serializers.ModelSerializer):
+    product = serializers.PrimaryKeyRelatedField(queryset=Product.objects.filter(is_active=True))
+    user_name = serializers.CharField(source='user.full_name', read_only=True, default='')
+
+    class Meta:
+        model = Review
+        fields = [
+            'id', 'product', 'user', 'user_name', 'rating', 'title', 'body',
+            'created_at', 'updated_at'
+        ]
+        read_only_fields = ['id', 'user', 'created_at', 'updated_at']
+
+    def get_fields(self):
+        fields = super().get_fields()
+        if self.instance is not None:
+            # a review stays with its product
+            fields['product'].read_only = True
+        return fields
+
+
+class ProductRatingSerializer(serializers.ModelSerializer):
+    average = serializers.DecimalField(max_digits=3, decimal_places=2, read_only=True)
+    histogram = serializers.DictField(child=serializers.IntegerField(), read_only=True)
+
+    class Meta:
+        model = ProductRating
+        fields = ['product', 'average', 'count', 'histogram']
+        read_only_fields = fields
@@ -0,0 +1,49 @@
+"""
+Writing reviews. Every change goes through here so the product's rating
+aggregates (``apps.reviews.aggregates``) move in the same transaction.
+"""
+from django.db import IntegrityError, transaction
+from django.utils.translation import gettext_lazy as _
+from rest_framework import status
+from rest_framework.exceptions import APIException
+
+from . import aggregates
+from .models import Review
+
+
+class AlreadyReviewed(APIException):
+    status_code = status.HTTP_409_CONFLICT
+    default_detail = _("you have already reviewed this product")
+    default_code = 'already_reviewed'
+
+
+def create_review(review):
+    """Save the new ``review``."""
+    try:
+        with transaction.atomic():
+            review.save(force_insert=True)
+            aggregates.record(review.product_id, new=review.rating)
+    except IntegrityError:
+        raise AlreadyReviewed()
+    return review
+
+
+@transaction.atomic
+def update_review(review, **fields):
+    # the row lock makes the rating we take back out the one actually stored
+    old = Review.objects.select_for_update().values_list('rating', flat=True).get(pk=review.pk)
+    for attr, value in fields.items():
+        setattr(review, attr, value)
+    review.save(update_fields=[*fields, 'updated_at'])
+    aggregates.record(review.product_id, old=old, new=review.rating)
+    return review
+
+
+@transaction.atomic
+def delete_review(review):
+    old = Review.objects.select_for_update().filter(pk=review.pk).values_list(
+        'rating', flat=True).first()
+    if old is None:
+        return
+    review.delete()
+    aggregates.record(review.product_id, old=old)
@@ -0,0 +1,11 @@
+from django.urls import path, include
+from rest_framework.routers import DefaultRouter
+from . import views
+
+router = DefaultRouter()
+router.register(r'', views.ReviewViewSet, basename='review')
+
+urlpatterns = [
+    path('ratings/<int:product_id>/', views.ProductRatingView.as_view(), name='product-rating'),
+    path('', include(router.urls)),
+]
@@ -0,0 +1,48 @@
+from rest_framework import generics, permissions, viewsets
+from rest_framework.generics import get_object_or_404
+
+from apps.products.models import Product
+from shared.permissions.permissions import IsAuthorOrReadOnly, IsCustomerUser
+
+from . import services
+from .models import ProductRating, Review
+from .serializers import ProductRatingSerializer, ReviewSerializer
+
+
+class ReviewViewSet(viewsets.ModelViewSet):
+    """Reviews, ``?product=`` for one product's. Written by customers only."""
+    queryset = Review.objects.select_related('user')
+    serializer_class = ReviewSerializer
+    permission_classes = [permissions.IsAuthenticatedOrReadOnly, IsAuthorOrReadOnly]
+    filterset_fields = ['product', 'rating']
+    ordering_fields = ['created_at', 'rating']
+
+    def get_permissions(self):
+        if self.action == 'create':
+            return [permissions.IsAuthenticated(), IsCustomerUser()]
+        return super().get_permissions()
+
+    def perform_create(self, serializer):
+        serializer.instance = services.create_review(
+            Review(user_id=self.request.user.pk, **serializer.validated_data))
+
+    def perform_update(self, serializer):
+        services.update_review(serializer.instance, **serializer.validated_data)
+
+    def perform_destroy(self, instance):
+        services.delete_review(instance)
+
+
+class ProductRatingView(generics.RetrieveAPIView):
+    """Average, count and star histogram of a product, no aggregation involved."""
+    serializer_class = ProductRatingSerializer
+    permission_classes = [permissions.AllowAny]
+
+    def get_object(self):
+        product_id = self.kwargs['product_id']
+        rating = ProductRating.objects.filter(pk=product_id).first()
+        if rating is None:
+            # not reviewed yet, unless there is no such product
+            get_object_or_404(Product, pk=product_id, is_active=True)
+            rating = ProductRating(product_id=product_id)
+        return rating
@@ -1,6 +1,7 @@
 from django.contrib import admin
 from django.contrib.auth.admin import UserAdmin as BaseUserAdmin
 from django.utils.translation import gettext_lazy as _
+from apps.geography.hierarchy import LEVELS, get_hierarchy
 from .models import User, UserProfile
 
 
@@ -31,7 +32,8 @@ class UserAdmin(BaseUserAdmin):
         (_('Personal Info'), {
             'fields': (
                 'first_name', 'last_name', 'phone_number',
-                'province', 'district', 'municipality', 'ward_no'
+                'province', 'district', 'municipality', 'ward_no',
+                'province_name', 'district_name', 'municipality_name',
             )
         }),
         (_('Permissions'), {
@@ -55,6 +57,15 @@ class UserAdmin(BaseUserAdmin):
 
     inlines = [UserProfileInline]
 
+    def save_model(self, request, obj, form, change):
+        # the names follow the areas picked, legacy names that match no area stay
+        hierarchy = get_hierarchy()
+        for level in LEVELS:
+            area_id = getattr(obj, f'{level}_id')
+            if area_id is not None:
+                setattr(obj, f'{level}_name', hierarchy.name(level, area_id))
+        super().save_model(request, obj, form, change)
+
     def full_name(self, obj):
         return obj.full_name
     full_name.short_description = 'Full Name'
@@ -6,5 +6,5 @@ class UsersConfig(AppConfig):
     name = 'apps.users'
     verbose_name = 'Users'
 
-   # def ready(self):
-    # import apps.users.signals  # Import signals
+    def ready(self):
+        import apps.users.signals  # noqa: F401
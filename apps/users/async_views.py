@@ -0,0 +1,212 @@
+"""
+ASGI-native versions of the authentication endpoints.
+
+Plain Django async views (DRF 3.14 views are sync only) using the async ORM,
+async cache calls and the hashing pool's async API, so a request served by
+an ASGI worker does not hop through ``sync_to_async`` on the hot path.
+Enabled with ``USERS_ASYNC_VIEWS`` in ``apps/users/urls.py``.
+"""
+import json
+from functools import wraps
+from types import SimpleNamespace
+
+from asgiref.sync import sync_to_async
+from django.contrib.auth.models import AnonymousUser
+from django.http import HttpResponse, JsonResponse
+from django.utils.translation import gettext_lazy as _
+from rest_framework import status
+from rest_framework.exceptions import APIException, Throttled
+from rest_framework.utils.encoders import JSONEncoder
+
+from apps.cart.services import merge_session_cart
+from shared.authentication.authentication import ClaimsJWTAuthentication
+from shared.authentication.tokens import USER_CLAIMS, ClaimsRefreshToken
+from shared.throttling.throttling import SlidingWindowScopedRateThrottle
+
+from .cache import aget_user_entry, etag_matches
+from .hashing import get_hashing_service
+from .models import User, UserProfile
+from .serializers import UserSerializer, UserUpdateSerializer
+from .views import UserProfileView
+
+
+def api_response(data, status=status.HTTP_200_OK, headers=None):
+    return JsonResponse(data, status=status, headers=headers,
+                        encoder=JSONEncoder, safe=False)
+
+
+def async_api_view(methods, authenticated=False, throttle_scope=None):
+    """
+    Method check, JSON error handling, JWT authentication and scoped
+    throttling for async views. The views are CSRF exempt like DRF's, they
+    authenticate with bearer tokens only.
+    """
+    def decorator(view):
+        @wraps(view)
+        async def wrapper(request, *args, **kwargs):
+            if request.method not in methods:
+                return api_response({'detail': _("method not allowed")},
+                                    status=status.HTTP_405_METHOD_NOT_ALLOWED)
+            try:
+                request.user = await authenticate(request) or AnonymousUser()
+                if authenticated and not request.user.is_authenticated:
+                    return api_response(
+                        {'detail': _("Authentication credentials were not provided.")},
+                        status=status.HTTP_401_UNAUTHORIZED)
+                if throttle_scope:
+                    await check_throttle(request, throttle_scope)
+                return await view(request, *args, **kwargs)
+            except APIException as exc:
+                return api_response({'detail': exc.detail}, status=exc.status_code)
+
+        wrapper.csrf_exempt = True
+        return wrapper
+    return decorator
+
+
+async def authenticate(request):
+    authentication = ClaimsJWTAuthentication()
+    header = authentication.get_header(request)
+    if header is None:
+        return None
+    raw_token = authentication.get_raw_token(header)
+    if raw_token is None:
+        return None
+
+    token = authentication.get_validated_token(raw_token)
+    if not all(claim in token for claim in USER_CLAIMS):
+        # tokens issued before the claims existed need the user row
+        return await sync_to_async(authentication.get_user)(token)
+    return authentication.get_user(token)
+
+
+async def check_throttle(request, scope):
+    throttle = SlidingWindowScopedRateThrottle()
+    # the counter is a network round trip, keep it off the event loop
+    allowed = await sync_to_async(throttle.allow_request, thread_sensitive=False)(
+        request, SimpleNamespace(throttle_scope=scope))
+    if not allowed:
+        raise Throttled(throttle.wait())
+
+
+def parse_body(request):
+    try:
+        return json.loads(request.body or b'{}')
+    except ValueError:
+        return None
+
+
+async def issue_tokens(user, serializer_context, message, status_code):
+    # creating the refresh token writes its OutstandingToken row
+    refresh = await sync_to_async(ClaimsRefreshToken.for_user)(user)
+    return api_response({
+        'user': UserSerializer(user, context=serializer_context).data,
+        'refresh': str(refresh),
+        'access': str(refresh.access_token),
+        'message': message,
+    }, status=status_code)
+
+
+@async_api_view(['POST'], throttle_scope='register')
+async def register(request):
+    data = parse_body(request)
+    if data is None:
+        return api_response({'detail': _("malformed JSON")}, status=status.HTTP_400_BAD_REQUEST)
+
+    serializer = UserSerializer(data=data, context={'request': request})
+    # field validation runs the email/phone uniqueness queries
+    if not await sync_to_async(serializer.is_valid)():
+        return api_response(serializer.errors, status=status.HTTP_400_BAD_REQUEST)
+
+    validated_data = dict(serializer.validated_data)
+    validated_data.pop('confirm_password', None)
+    password = validated_data.pop('password')
+
+    user = User(**validated_data)
+    user.password = await get_hashing_service().amake_password(password)
+    await user.asave()
+    await UserProfile.objects.acreate(user=user)
+
+    return await issue_tokens(user, {'request': request},
+                              _('User registered successfully'), status.HTTP_201_CREATED)
+
+
+@async_api_view(['POST'], throttle_scope='login')
+async def login(request):
+    data = parse_body(request) or {}
+    email = data.get('email')
+    password = data.get('password')
+    if not email or not password:
+        return api_response({'non_field_errors': [_("must include email and password")]},
+                            status=status.HTTP_400_BAD_REQUEST)
+
+    service = get_hashing_service()
+    try:
+        user = await User.objects.select_related('profile').aget(email=email)
+    except User.DoesNotExist:
+        # hash anyway so unknown emails take as long as wrong passwords
+        await service.amake_password(password)
+        user = None
+
+    is_correct = False
+    if user is not None:
+        # verified for inactive users too, or they would answer faster
+        is_correct, must_update = await service.averify_password(password, user.password)
+        is_correct = is_correct and user.is_active
+        if is_correct and must_update:
+            user.password = await service.amake_password(password)
+            await user.asave(update_fields=['password'])
+
+    if not is_correct:
+        return api_response(
+            {'non_field_errors': [_("unable to login with provided credentials")]},
+            status=status.HTTP_400_BAD_REQUEST)
+
+    await sync_to_async(merge_session_cart)(request, user)
+    return await issue_tokens(user, {'request': request},
+                              _("login sucessfully"), status.HTTP_200_OK)
+
+
+@async_api_view(['POST'], authenticated=True)
+async def logout(request):
+    data = parse_body(request) or {}
+    try:
+        # verifying and blacklisting the token are ORM calls in simplejwt
+        await sync_to_async(
+            lambda: ClaimsRefreshToken(data.get('refresh')).blacklist())()
+    except Exception:
+        return api_response({"message": _("invalid Token")},
+                            status=status.HTTP_400_BAD_REQUEST)
+
+    return api_response({'message': _("logout successfully")},
+                        status=status.HTTP_205_RESET_CONTENT)
+
+
+async def cached_user_view(request, view, serializer_class):
+    async def load():
+        return await User.objects.with_profile().aget(pk=request.user.pk)
+
+    entry = await aget_user_entry(
+        request.user.pk, view, load,
+        lambda user: serializer_class(user, context={'request': request}).data)
+
+    headers = {'ETag': entry['etag']}
+    if etag_matches(request, entry['etag']):
+        return HttpResponse(status=status.HTTP_304_NOT_MODIFIED, headers=headers)
+    return api_response(entry['data'], headers=headers)
+
+
+@async_api_view(['GET'], authenticated=True)
+async def me(request):
+    return await cached_user_view(request, 'me', UserSerializer)
+
+
+sync_profile_view = UserProfileView.as_view()
+
+
+@async_api_view(['GET', 'PUT', 'PATCH'], authenticated=True)
+async def profile(request):
+    if request.method != 'GET':
+        # updates stay on the DRF view
+        return await sync_to_async(sync_profile_view)(request)
+    return await cached_user_view(request, 'profile', UserUpdateSerializer)
@@ -0,0 +1,79 @@
+from django.conf import settings
+from django.core.cache import cache
+from django.utils.http import parse_etags, quote_etag
+from rest_framework import status
+from rest_framework.response import Response
+
+from apps.utils.metrics import record_cache
+from shared.authentication.authentication import get_user_instance
+
+# serialized payloads cached per user, one entry per endpoint
+CACHED_VIEWS = ('me', 'profile')
+
+
+def user_cache_key(user_id, view):
+    return f"users:{view}:{user_id}"
+
+
+def make_etag(user):
+    return quote_etag(f"{user.pk}-{user.updated_at.timestamp():.6f}")
+
+
+def make_entry(user, serialize):
+    return {'etag': make_etag(user), 'data': serialize(user)}
+
+
+def invalidate_user(user_id):
+    cache.delete_many([user_cache_key(user_id, view) for view in CACHED_VIEWS])
+
+
+def etag_matches(request, etag):
+    if_none_match = request.headers.get('If-None-Match')
+    if not if_none_match:
+        return False
+    etags = parse_etags(if_none_match)
+    return '*' in etags or etag in etags
+
+
+def build_response(request, entry):
+    headers = {'ETag': entry['etag']}
+    if etag_matches(request, entry['etag']):
+        return Response(status=status.HTTP_304_NOT_MODIFIED, headers=headers)
+    return Response(entry['data'], headers=headers)
+
+
+def cached_user_response(request, view, serialize):
+    """
+    Return the cached payload of ``view`` for the requesting user.
+
+    ``serialize`` is called with the user instance on a cache miss. The
+    entry is dropped by the signals in ``apps.users.signals`` whenever the
+    user or the profile is saved.
+    """
+    key = user_cache_key(request.user.pk, view)
+    entry = cache.get(key)
+    record_cache(hit=entry is not None)
+
+    if entry is None:
+        user = get_user_instance(request.user)
+        entry = make_entry(user, serialize)
+        cache.set(key, entry, settings.USER_CACHE_TIMEOUT)
+
+    return build_response(request, entry)
+
+
+async def aget_user_entry(user_id, view, load, serialize):
+    """
+    Async counterpart of ``cached_user_response`` returning the raw cache
+    entry; ``load`` is awaited for the user instance on a miss.
+    """
+    key = user_cache_key(user_id, view)
+    entry = await cache.aget(key)
+    record_cache(hit=entry is not None)
+
+    if entry is None:
+        user = await load()
+        entry = make_entry(user, serialize)
+        await cache.aset(key, entry, settings.USER_CACHE_TIMEOUT)
+
+    return entry
@@ -0,0 +1,21 @@
+from django.conf import settings
+from django.contrib.auth.tokens import default_token_generator
+from django.utils.encoding import force_bytes
+from django.utils.http import urlsafe_base64_encode
+from django.utils.translation import gettext as _
+
+from apps.utils.jobs import queue_email
+
+
+def send_password_reset_email(user):
+    """Queue the reset link for ``user``; the outbox worker sends it."""
+    link = settings.PASSWORD_RESET_URL.format(
+        uidb64=urlsafe_base64_encode(force_bytes(user.pk)),
+        token=default_token_generator.make_token(user),
+    )
+    return queue_email(
+        user.email,
+        _("Reset your password"),
+        _("Open this link to choose a new password:\n\n%(link)s\n\n"
+          "If you did not ask for a password reset, ignore this email.") % {'link': link},
+    )
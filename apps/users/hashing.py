@@ -0,0 +1,100 @@
+"""
+Password hashing off the request thread.
+
+hashlib's PBKDF2 and scrypt release the GIL, so a small thread pool hashes
+in parallel with the rest of the worker. A semaphore bounds how many hashes
+may be running or queued; once it is exhausted callers get ``HashingBusy``
+(HTTP 503) instead of stacking up behind a signup burst.
+"""
+import asyncio
+import threading
+from concurrent.futures import ThreadPoolExecutor
+
+from django.conf import settings
+from django.contrib.auth import hashers
+from django.utils.translation import gettext_lazy as _
+from rest_framework import status
+from rest_framework.exceptions import APIException
+
+
+class HashingBusy(APIException):
+    status_code = status.HTTP_503_SERVICE_UNAVAILABLE
+    default_detail = _("too many password checks in progress, try again shortly")
+    default_code = 'hashing_busy'
+
+
+class ScryptPasswordHasher(hashers.ScryptPasswordHasher):
+    """scrypt with its cost parameters read from settings."""
+    work_factor = getattr(settings, 'PASSWORD_SCRYPT_WORK_FACTOR', 2**14)
+    block_size = getattr(settings, 'PASSWORD_SCRYPT_BLOCK_SIZE', 8)
+    parallelism = getattr(settings, 'PASSWORD_SCRYPT_PARALLELISM', 1)
+
+
+def verify_password(raw_password, encoded):
+    """Return ``(is_correct, must_update)`` for ``encoded``."""
+    updates = []
+    is_correct = hashers.check_password(raw_password, encoded, setter=updates.append)
+    return is_correct, bool(updates)
+
+
+class PasswordHashingService:
+
+    def __init__(self, max_workers, max_pending, timeout):
+        self.executor = ThreadPoolExecutor(
+            max_workers=max_workers, thread_name_prefix='password-hashing')
+        self.slots = threading.BoundedSemaphore(max_workers + max_pending)
+        self.timeout = timeout
+
+    def submit(self, fn, *args, block=True):
+        if not self.slots.acquire(blocking=block, timeout=self.timeout if block else None):
+            raise HashingBusy()
+        try:
+            future = self.executor.submit(fn, *args)
+        except BaseException:
+            self.slots.release()
+            raise
+        future.add_done_callback(lambda _: self.slots.release())
+        return future
+
+    def make_password(self, raw_password):
+        return self.submit(hashers.make_password, raw_password).result()
+
+    def check_password(self, raw_password, encoded, setter=None):
+        """
+        Same contract as ``django.contrib.auth.hashers.check_password``:
+        ``setter`` is called with the raw password when the stored hash uses
+        an outdated hasher or outdated parameters. It runs on the calling
+        thread since it normally saves the user.
+        """
+        is_correct, must_update = self.submit(
+            verify_password, raw_password, encoded).result()
+        if is_correct and must_update and setter:
+            setter(raw_password)
+        return is_correct
+
+    # async variants never block the event loop waiting for a slot
+
+    async def amake_password(self, raw_password):
+        return await asyncio.wrap_future(
+            self.submit(hashers.make_password, raw_password, block=False))
+
+    async def averify_password(self, raw_password, encoded):
+        return await asyncio.wrap_future(
+            self.submit(verify_password, raw_password, encoded, block=False))
+
+
+_service = None
+_service_lock = threading.Lock()
+
+
+def get_hashing_service():
+    global _service
+    if _service is None:
+        with _service_lock:
+            if _service is None:
+                _service = PasswordHashingService(
+                    max_workers=settings.PASSWORD_HASHING_WORKERS,
+                    max_pending=settings.PASSWORD_HASHING_MAX_PENDING,
+                    timeout=settings.PASSWORD_HASHING_TIMEOUT,
+                )
+    return _service
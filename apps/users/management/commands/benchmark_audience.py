@@ -0,0 +1,86 @@
+import random
+import time
+import tracemalloc
+
+from django.core.management.base import BaseCommand
+from django.db import connection, transaction
+
+from apps.products.factories import PROVINCES
+from apps.users.audience import CHANNELS, Sender, send
+from apps.users.models import User, UserProfile
+
+DOMAIN = 'audience.test'
+
+
+class CountingSender(Sender):
+
+    def __init__(self):
+        self.count = 0
+
+    def send(self, batch):
+        self.count += len(batch)
+
+
+class Command(BaseCommand):
+    help = (
+        "Stream a campaign audience out of a synthetic user table and report "
+        "rows per second and peak Python memory"
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument('--users', type=int, default=1_000_000)
+        parser.add_argument('--channel', choices=list(CHANNELS), default='email')
+        parser.add_argument('--province', choices=PROVINCES)
+        parser.add_argument('--batch-size', type=int, default=1000)
+        parser.add_argument('--chunk-size', type=int, default=2000)
+        parser.add_argument('--seed', type=int, default=0)
+        parser.add_argument('--clean', action='store_true',
+                            help="delete the synthetic users afterwards")
+
+    def handle(self, *args, **options):
+        random.seed(options['seed'])
+        existing = User.objects.filter(email__endswith=f'@{DOMAIN}').count()
+        if existing < options['users']:
+            started = time.perf_counter()
+            self.make_users(existing, options['users'])
+            self.stdout.write(
+                f"created {options['users'] - existing} users in "
+                f"{time.perf_counter() - started:.1f}s")
+
+        sender = CountingSender()
+        geography = {'province': options['province']} if options['province'] else {}
+        tracemalloc.start()
+        started = time.perf_counter()
+        send(options['channel'], sender, options['batch_size'], options['chunk_size'],
+             **geography)
+        elapsed = time.perf_counter() - started
+        _, peak = tracemalloc.get_traced_memory()
+        tracemalloc.stop()
+
+        self.stdout.write(f"{connection.vendor}, {options['channel']}, {geography or 'everywhere'}")
+        self.stdout.write(
+            f"{sender.count} recipients in {elapsed:.2f}s = {sender.count / elapsed:.0f} rows/s, "
+            f"peak {peak / 1024:.0f} KiB")
+
+        if options['clean']:
+            User.objects.filter(email__endswith=f'@{DOMAIN}').delete()
+
+    def make_users(self, start, stop, chunk=5000):
+        for offset in range(start, stop, chunk):
+            users = []
+            for n in range(offset, min(offset + chunk, stop)):
+                email, phone = f'user{n}@{DOMAIN}', f'97{n:08d}'
+                # every 50th user repeats the previous address in another form
+                if n % 50 == 49:
+                    email, phone = f'User{n - 1}@{DOMAIN}', f'+977{n - 1 + 9700000000}'
+                users.append(User(
+                    email=email, phone_number=phone, password='!',
+                    province_id=random.randint(1, len(PROVINCES)),
+                ))
+            with transaction.atomic():
+                User.objects.bulk_create(users)
+                UserProfile.objects.bulk_create(UserProfile(
+                    user=user,
+                    receive_marketing_emails=random.random() < 0.7,
+                    receive_sms_notifications=random.random() < 0.5,
+                ) for user in users)
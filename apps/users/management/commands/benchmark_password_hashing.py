@@ -0,0 +1,50 @@
+import os
+import time
+from concurrent.futures import ThreadPoolExecutor
+
+from django.contrib.auth.hashers import get_hashers
+from django.core.management.base import BaseCommand
+
+from apps.users.hashing import PasswordHashingService
+
+
+class Command(BaseCommand):
+    help = "Report password verifications (logins) per second per core for each configured hasher"
+
+    def add_arguments(self, parser):
+        parser.add_argument('--seconds', type=float, default=3.0,
+                            help="duration of each measurement")
+        parser.add_argument('--workers', type=int, default=os.cpu_count())
+
+    def handle(self, *args, **options):
+        seconds = options['seconds']
+        workers = options['workers']
+        password = 'benchmark-password'
+
+        self.stdout.write(f"{'hasher':<24}{'1 thread/s':>12}{'pool/s':>12}{'pool/s/core':>14}")
+        for hasher in get_hashers():
+            encoded = hasher.encode(password, hasher.salt())
+
+            single = self.measure(lambda: hasher.verify(password, encoded), seconds)
+
+            service = PasswordHashingService(
+                max_workers=workers, max_pending=workers, timeout=None)
+            with ThreadPoolExecutor(max_workers=workers) as callers:
+                started = time.perf_counter()
+                counts = callers.map(
+                    lambda _: self.measure(
+                        lambda: service.check_password(password, encoded), seconds, rate=False),
+                    range(workers))
+                pooled = sum(counts) / (time.perf_counter() - started)
+            service.executor.shutdown()
+
+            self.stdout.write(
+                f"{hasher.algorithm:<24}{single:>12.1f}{pooled:>12.1f}{pooled / workers:>14.1f}")
+
+    def measure(self, fn, seconds, rate=True):
+        count = 0
+        started = time.perf_counter()
+        while time.perf_counter() - started < seconds:
+            fn()
+            count += 1
+        return count / (time.perf_counter() - started) if rate else count
@@ -0,0 +1,105 @@
+import random
+import time
+from datetime import date, timedelta
+
+from django.core.management.base import BaseCommand, CommandError
+from django.db import connection, transaction
+from rest_framework.renderers import JSONRenderer
+from rest_framework.test import APIRequestFactory
+
+from apps.products.factories import PROVINCES
+from apps.users.models import User, UserProfile
+from apps.users.serializers import UserSerializer
+from shared.renderers.renderers import ORJSONRenderer
+from shared.serializers.serializers import compile_serializer
+
+DOMAIN = 'serializers.test'
+
+NAMES = ('Aarav', 'Sita', 'Ram', 'Gita', 'Bikash', 'Anjali', 'सुनिता', 'José')
+
+
+class Command(BaseCommand):
+    help = (
+        "Serialize and render a synthetic user list with UserSerializer and "
+        "JSONRenderer, then with the fast serializer and ORJSONRenderer, and "
+        "report rows per second; fails unless both give the same bytes"
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument('--users', type=int, default=10_000)
+        parser.add_argument('--rounds', type=int, default=3, help="best of")
+        parser.add_argument('--host', default='localhost',
+                            help="host of the request that absolute URLs are built from")
+        parser.add_argument('--seed', type=int, default=0)
+        parser.add_argument('--clean', action='store_true',
+                            help="delete the synthetic users afterwards")
+
+    def handle(self, *args, **options):
+        random.seed(options['seed'])
+        existing = User.objects.filter(email__endswith=f'@{DOMAIN}').count()
+        if existing < options['users']:
+            self.make_users(existing, options['users'])
+
+        users = (User.objects.with_profile()
+                 .filter(email__endswith=f'@{DOMAIN}').order_by('pk')[:options['users']])
+        request = APIRequestFactory().get('/api/users/', HTTP_HOST=options['host'])
+        context = {'request': request}
+        fast = compile_serializer(UserSerializer)
+
+        self.stdout.write(f"{connection.vendor}, {options['users']} users, best of {options['rounds']}")
+        expected = self.run(
+            'UserSerializer + JSONRenderer',
+            lambda: UserSerializer(users, many=True, context=context).data,
+            JSONRenderer().render, options['rounds'])
+        actual = self.run(
+            'fast serializer + ORJSONRenderer',
+            lambda: fast.serialize(users.values(*fast.values), context),
+            ORJSONRenderer().render, options['rounds'])
+        if actual != expected:
+            raise CommandError("the fast serializer's output differs from UserSerializer's")
+        self.stdout.write(f"identical output, {len(actual)} bytes")
+
+        if options['clean']:
+            User.objects.filter(email__endswith=f'@{DOMAIN}').delete()
+
+    def run(self, label, serialize, render, rounds):
+        """Best rows/s of ``serialize`` (query included) and of it followed by ``render``."""
+        best = None
+        for _ in range(rounds):
+            started = time.perf_counter()
+            data = serialize()
+            serialized = time.perf_counter()
+            output = render(data)
+            timings = (serialized - started, time.perf_counter() - started)
+            best = timings if best is None else tuple(map(min, best, timings))
+        self.stdout.write(
+            f"{label}: serialize {len(data) / best[0]:,.0f} rows/s, "
+            f"serialize and render {len(data) / best[1]:,.0f} rows/s")
+        return output
+
+    def make_users(self, start, stop, chunk=5000):
+        for offset in range(start, stop, chunk):
+            users = []
+            for n in range(offset, min(offset + chunk, stop)):
+                province = random.choice((None, random.randint(1, len(PROVINCES))))
+                # phone prefix 98 is SellerFactory's and 97 benchmark_audience's
+                users.append(User(
+                    email=f'user{n}@{DOMAIN}', phone_number=f'96{n:08d}', password='!',
+                    first_name=random.choice(NAMES), last_name=random.choice(NAMES),
+                    role=random.choice(('customer', 'customer', 'seller')),
+                    province_id=province, province_name=PROVINCES[province - 1] if province else '',
+                    ward_no=random.choice((None, random.randint(1, 32))),
+                ))
+            with transaction.atomic():
+                User.objects.bulk_create(users)
+                # a tenth of the users have no profile at all
+                UserProfile.objects.bulk_create(UserProfile(
+                    user=user,
+                    avatar=f'avatars/{user.pk:x}.jpg' if random.random() < 0.5 else '',
+                    avatar_renditions=(
+                        {'webp': {'64': f'renditions/{user.pk:x}-64.webp'}}
+                        if random.random() < 0.5 else {}),
+                    company_name=random.choice(('', 'Himal Traders')),
+                    date_of_birth=random.choice((None, date(1990, 1, 1) + timedelta(days=n))),
+                    receive_marketing_emails=random.random() < 0.7,
+                ) for n, user in enumerate(users) if random.random() < 0.9)
@@ -0,0 +1,39 @@
+from django.core.management.base import BaseCommand
+from django.db import transaction
+from django.utils import timezone
+from rest_framework_simplejwt.token_blacklist.models import BlacklistedToken, OutstandingToken
+
+from shared.authentication.blacklist import get_blacklist_filter
+
+
+class Command(BaseCommand):
+    help = "Delete expired outstanding/blacklisted tokens in batches and rebuild the blacklist filter"
+
+    def add_arguments(self, parser):
+        parser.add_argument('--batch-size', type=int, default=5000)
+        parser.add_argument('--skip-filter-rebuild', action='store_true')
+
+    def handle(self, *args, **options):
+        expired = OutstandingToken.objects.filter(expires_at__lt=timezone.now())
+        deleted = 0
+
+        while True:
+            ids = list(expired.order_by('pk').values_list('pk', flat=True)[:options['batch_size']])
+            if not ids:
+                break
+            with transaction.atomic():
+                BlacklistedToken.objects.filter(token_id__in=ids).delete()
+                OutstandingToken.objects.filter(pk__in=ids).delete()
+            deleted += len(ids)
+            self.stdout.write(f"deleted {deleted} expired tokens", ending='\r')
+
+        self.stdout.write(f"deleted {deleted} expired tokens")
+
+        blacklist_filter = get_blacklist_filter()
+        if not options['skip_filter_rebuild']:
+            blacklist_filter.rebuild()
+
+        stats = blacklist_filter.stats()
+        self.stdout.write(
+            f"filter fill ratio {stats['fill_ratio']:.4%}, "
+            f"expected false-positive rate {stats['expected_false_positive_rate']:.6%}")
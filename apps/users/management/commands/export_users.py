@@ -0,0 +1,67 @@
+import csv
+import json
+import sys
+
+from django.core.management.base import BaseCommand
+from django.core.serializers.json import DjangoJSONEncoder
+
+from apps.users.models import User
+from apps.users.serializers import UserProfileSerializer
+
+USER_FIELDS = [
+    'id', 'email', 'first_name', 'last_name', 'phone_number', 'role',
+    'province_name', 'district_name', 'municipality_name', 'ward_no',
+    'is_email_verified', 'is_phone_verified', 'created_at',
+]
+
+# areas go out by name, the way import_users reads them back, so names
+# that match no area survive the round trip
+COLUMNS = {'province_name': 'province', 'district_name': 'district',
+           'municipality_name': 'municipality'}
+
+PROFILE_FIELDS = [
+    field for field in UserProfileSerializer.Meta.fields if field != 'avatar'
+]
+
+
+class Command(BaseCommand):
+    help = "Stream users and their profiles to CSV or JSONL"
+
+    def add_arguments(self, parser):
+        parser.add_argument('--format', choices=['csv', 'jsonl'], default='jsonl')
+        parser.add_argument('--output', help="file path, defaults to stdout")
+        parser.add_argument('--chunk-size', type=int, default=2000)
+
+    def handle(self, *args, **options):
+        columns = [COLUMNS.get(field, field) for field in USER_FIELDS] + PROFILE_FIELDS
+        rows = (
+            User.objects.order_by('pk')
+            .values(*USER_FIELDS, *(f'profile__{field}' for field in PROFILE_FIELDS))
+            .iterator(chunk_size=options['chunk_size'])
+        )
+
+        output = open(options['output'], 'w', newline='', encoding='utf-8') \
+            if options['output'] else sys.stdout
+        try:
+            count = self.write(output, options['format'], columns, rows)
+        finally:
+            if output is not sys.stdout:
+                output.close()
+
+        self.stderr.write(self.style.SUCCESS(f"exported {count} users"))
+
+    def write(self, output, file_format, columns, rows):
+        count = 0
+        if file_format == 'csv':
+            writer = csv.writer(output)
+            writer.writerow(columns)
+        for row in rows:
+            values = [row[field] for field in USER_FIELDS] + \
+                [row[f'profile__{field}'] for field in PROFILE_FIELDS]
+            if file_format == 'csv':
+                writer.writerow(values)
+            else:
+                output.write(json.dumps(dict(zip(columns, values)), cls=DjangoJSONEncoder))
+                output.write('\n')
+            count += 1
+        return count
@@ -0,0 +1,154 @@
+import csv
+import json
+import os
+from concurrent.futures import ProcessPoolExecutor
+from itertools import islice
+
+import django
+from django.contrib.auth.hashers import make_password
+from django.core.management.base import BaseCommand, CommandError
+from django.db import transaction
+
+from apps.users.models import User, UserProfile
+from apps.users.serializers import UserImportSerializer, UserProfileSerializer
+
+# profile columns accepted in import rows, avatars are not imported
+PROFILE_FIELDS = [
+    field for field in UserProfileSerializer.Meta.fields if field != 'avatar'
+]
+
+
+def read_rows(path, file_format):
+    """
+    Yield ``(line_number, row)`` without loading the whole file. A line that
+    is not a JSON object gives a ``ValueError`` in place of its row.
+    """
+    with open(path, newline='', encoding='utf-8') as f:
+        if file_format == 'csv':
+            for line_number, row in enumerate(csv.DictReader(f), start=2):
+                yield line_number, {
+                    key: value for key, value in row.items() if value not in ('', None)
+                }
+        else:
+            for line_number, line in enumerate(f, start=1):
+                if not line.strip():
+                    continue
+                try:
+                    row = json.loads(line)
+                except ValueError as exc:
+                    yield line_number, ValueError(f"invalid JSON: {exc}")
+                    continue
+                if not isinstance(row, dict):
+                    row = ValueError("expected a JSON object")
+                yield line_number, row
+
+
+def chunked(iterable, size):
+    iterator = iter(iterable)
+    while chunk := list(islice(iterator, size)):
+        yield chunk
+
+
+class Command(BaseCommand):
+    help = "Bulk import users and their profiles from a CSV or JSONL file"
+
+    def add_arguments(self, parser):
+        parser.add_argument('path')
+        parser.add_argument('--format', choices=['csv', 'jsonl'],
+                            help="defaults to the file extension")
+        parser.add_argument('--batch-size', type=int, default=1000)
+        parser.add_argument('--workers', type=int, default=os.cpu_count(),
+                            help="processes used to hash passwords")
+
+    def handle(self, *args, **options):
+        path = options['path']
+        file_format = options['format'] or os.path.splitext(path)[1].lstrip('.').lower()
+        if file_format not in ('csv', 'jsonl'):
+            raise CommandError("unknown file format, pass --format csv|jsonl")
+
+        self.workers = options['workers']
+        created = failed = 0
+        with ProcessPoolExecutor(max_workers=options['workers'],
+                                 initializer=django.setup) as pool:
+            for chunk in chunked(read_rows(path, file_format), options['batch_size']):
+                chunk_created, errors = self.import_chunk(chunk, pool)
+                created += chunk_created
+                failed += len(errors)
+                for line_number, error in errors:
+                    self.stderr.write(f"line {line_number}: {json.dumps(error)}")
+
+        self.stdout.write(self.style.SUCCESS(
+            f"imported {created} users, {failed} rows rejected"))
+
+    def import_chunk(self, chunk, pool):
+        valid, errors = [], []
+
+        for line_number, row in chunk:
+            if isinstance(row, ValueError):
+                errors.append((line_number, {'non_field_errors': [str(row)]}))
+                continue
+            row.setdefault('confirm_password', row.get('password'))
+            serializer = UserImportSerializer(data=row)
+            profile_serializer = UserProfileSerializer(
+                data={key: row[key] for key in PROFILE_FIELDS if key in row},
+                partial=True)
+
+            if not serializer.is_valid():
+                errors.append((line_number, serializer.errors))
+            elif not profile_serializer.is_valid():
+                errors.append((line_number, {'profile': profile_serializer.errors}))
+            else:
+                valid.append((line_number, serializer.validated_data,
+                              profile_serializer.validated_data))
+
+        valid = self.drop_duplicates(valid, errors)
+        if not valid:
+            return 0, errors
+
+        passwords = [data.pop('password') for _, data, _ in valid]
+        hashes = pool.map(make_password, passwords,
+                          chunksize=max(1, len(passwords) // (self.workers * 4)))
+
+        users = []
+        for (_, data, _), encoded in zip(valid, hashes):
+            data.pop('confirm_password', None)
+            users.append(User(password=encoded, **data))
+
+        with transaction.atomic():
+            User.objects.bulk_create(users)
+            UserProfile.objects.bulk_create([
+                UserProfile(user=user, **profile_data)
+                for user, (_, _, profile_data) in zip(users, valid)
+            ])
+
+        return len(users), errors
+
+    def drop_duplicates(self, valid, errors):
+        """
+        Reject rows whose email or phone number is already taken, in the
+        database or earlier in the same chunk, with one query per column.
+        """
+        taken = {
+            'email': set(User.objects.filter(
+                email__in=[data['email'] for _, data, _ in valid]
+            ).values_list('email', flat=True)),
+            'phone_number': set(User.objects.filter(
+                phone_number__in=[data['phone_number'] for _, data, _ in valid
+                                  if data.get('phone_number')]
+            ).values_list('phone_number', flat=True)),
+        }
+
+        unique = []
+        for line_number, data, profile_data in valid:
+            duplicate = next(
+                (field for field in taken if data.get(field) and data[field] in taken[field]),
+                None)
+            if duplicate:
+                errors.append((line_number, {duplicate: "already exists"}))
+                continue
+            for field in taken:
+                if data.get(field):
+                    taken[field].add(data[field])
+            unique.append((line_number, data, profile_data))
+
+        return unique
@@ -0,0 +1,137 @@
+import http.client
+import json
+import os
+import socket
+import statistics
+import subprocess
+import sys
+import time
+from concurrent.futures import ThreadPoolExecutor
+
+from django.conf import settings
+from django.core.management.base import BaseCommand, CommandError
+
+from apps.users.models import User, UserProfile
+from shared.authentication.tokens import ClaimsRefreshToken
+
+LOADTEST_EMAIL = 'loadtest@example.com'
+LOADTEST_PASSWORD = 'loadtest-password'
+
+SERVERS = {
+    # mode: (server arguments, USERS_ASYNC_VIEWS)
+    'wsgi': (['config.wsgi:application'], 'false'),
+    'asgi': (['config.asgi:application', '-k', 'uvicorn.workers.UvicornWorker'], 'true'),
+}
+
+
+class Command(BaseCommand):
+    help = (
+        "Start gunicorn with the sync WSGI app and with the async ASGI app "
+        "(uvicorn workers) at the same worker count and compare throughput "
+        "of an authentication endpoint"
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument('--endpoint', choices=['me', 'profile', 'login'], default='me')
+        parser.add_argument('--workers', type=int, default=2)
+        parser.add_argument('--concurrency', type=int, default=32)
+        parser.add_argument('--duration', type=float, default=10.0)
+        parser.add_argument('--port', type=int, default=8701)
+        parser.add_argument('--modes', nargs='+', choices=list(SERVERS),
+                            default=list(SERVERS))
+
+    def handle(self, *args, **options):
+        user = self.get_user()
+        access = str(ClaimsRefreshToken.for_user(user).access_token)
+
+        self.stdout.write(f"{'mode':<6}{'req/s':>10}{'p50 ms':>10}{'p95 ms':>10}{'errors':>8}")
+        for offset, mode in enumerate(options['modes']):
+            port = options['port'] + offset
+            server = self.start_server(mode, port, options['workers'])
+            try:
+                self.wait_until_ready(port)
+                rate, latencies, errors = self.run_load(
+                    port, options['endpoint'], access,
+                    options['concurrency'], options['duration'])
+            finally:
+                server.terminate()
+                server.wait()
+
+            p50, p95 = self.percentiles(latencies)
+            self.stdout.write(f"{mode:<6}{rate:>10.1f}{p50:>10.1f}{p95:>10.1f}{errors:>8}")
+
+    def get_user(self):
+        user = User.objects.filter(email=LOADTEST_EMAIL).first()
+        if user is None:
+            user = User(email=LOADTEST_EMAIL)
+            user.set_password(LOADTEST_PASSWORD)
+            user.save()
+            UserProfile.objects.create(user=user)
+        return user
+
+    def start_server(self, mode, port, workers):
+        app_args, async_views = SERVERS[mode]
+        env = dict(os.environ, USERS_ASYNC_VIEWS=async_views)
+        env.setdefault('DJANGO_SETTINGS_MODULE', settings.SETTINGS_MODULE)
+        command = [
+            sys.executable, '-m', 'gunicorn', *app_args,
+            '--workers', str(workers), '--bind', f'127.0.0.1:{port}',
+            '--log-level', 'warning',
+        ]
+        return subprocess.Popen(command, env=env, cwd=settings.BASE_DIR,
+                                stdout=subprocess.DEVNULL)
+
+    def wait_until_ready(self, port, timeout=30):
+        deadline = time.monotonic() + timeout
+        while time.monotonic() < deadline:
+            try:
+                socket.create_connection(('127.0.0.1', port), timeout=1).close()
+                return
+            except OSError:
+                time.sleep(0.2)
+        raise CommandError(f"server on port {port} did not start")
+
+    def build_request(self, endpoint, access):
+        if endpoint == 'login':
+            body = json.dumps({'email': LOADTEST_EMAIL, 'password': LOADTEST_PASSWORD})
+            return 'POST', '/api/v1/auth/login/', body, {'Content-Type': 'application/json'}
+        return 'GET', f'/api/v1/auth/{endpoint}/', None, {'Authorization': f'Bearer {access}'}
+
+    def run_load(self, port, endpoint, access, concurrency, duration):
+        method, url, body, headers = self.build_request(endpoint, access)
+        deadline = time.monotonic() + duration
+
+        def client(_):
+            connection = http.client.HTTPConnection('127.0.0.1', port, timeout=30)
+            latencies, errors = [], 0
+            while time.monotonic() < deadline:
+                started = time.perf_counter()
+                try:
+                    connection.request(method, url, body=body, headers=headers)
+                    response = connection.getresponse()
+                    response.read()
+                    if response.status >= 400:
+                        errors += 1
+                except (OSError, http.client.HTTPException):
+                    errors += 1
+                    connection.close()
+                    connection = http.client.HTTPConnection('127.0.0.1', port, timeout=30)
+                    continue
+                latencies.append(time.perf_counter() - started)
+            connection.close()
+            return latencies, errors
+
+        started = time.monotonic()
+        with ThreadPoolExecutor(max_workers=concurrency) as pool:
+            results = list(pool.map(client, range(concurrency)))
+        elapsed = time.monotonic() - started
+
+        latencies = [latency for client_latencies, _ in results for latency in client_latencies]
+        errors = sum(client_errors for _, client_errors in results)
+        return len(latencies) / elapsed, latencies, errors
+
+    def percentiles(self, latencies):
+        if len(latencies) < 2:
+            return 0.0, 0.0
+        cuts = statistics.quantiles(latencies, n=100)
+        return cuts[49] * 1000, cuts[94] * 1000
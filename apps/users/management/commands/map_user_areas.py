@@ -0,0 +1,38 @@
+from django.core.management.base import BaseCommand
+from django.db.models import Count
+
+from apps.geography.hierarchy import LEVELS, PARENT, get_hierarchy
+from apps.users.models import User
+
+
+class Command(BaseCommand):
+    help = (
+        "Point users whose province, district or municipality is only a name "
+        "at the area of that name, after load_geography added it, and list the "
+        "names that still match no area"
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument('--top', type=int, default=20, help="unmatched names listed per level")
+
+    def handle(self, *args, **options):
+        hierarchy = get_hierarchy()
+        for level in LEVELS:
+            name_field = f'{level}_name'
+            parent_field = f'{PARENT[level]}_id' if level in PARENT else name_field
+            unmatched = User.objects.filter(**{f'{level}__isnull': True}).exclude(**{name_field: ''})
+            mapped = 0
+            for name, parent_id in list(unmatched.values_list(name_field, parent_field).distinct()):
+                area = hierarchy.lookup(level, name, parent_id if level in PARENT else None)
+                if area is None:
+                    continue
+                rows = unmatched.filter(**{name_field: name, parent_field: parent_id})
+                mapped += rows.update(**{f'{level}_id': area.id, name_field: area.name})
+
+            remaining = list(unmatched.values_list(name_field).annotate(users=Count('pk'))
+                             .order_by('-users', name_field))
+            self.stdout.write(
+                f"{level}: {mapped} users mapped, {sum(users for _, users in remaining)} users "
+                f"with {len(remaining)} names left")
+            for name, users in remaining[:options['top']]:
+                self.stdout.write(f"  {users:8d}  {name}")
@@ -2,8 +2,29 @@ from django.contrib.auth.models import BaseUserManager
 from django.utils.translation import gettext_lazy as _
 
 
+# columns read by UserSerializer, including its nested profile
+USER_LIST_FIELDS = (
+    'id', 'email', 'first_name', 'last_name', 'phone_number', 'role',
+    'province', 'district', 'municipality', 'ward_no',
+    'province_name', 'district_name', 'municipality_name',
+    'is_email_verified', 'is_phone_verified', 'created_at', 'updated_at',
+    'profile__id', 'profile__avatar', 'profile__avatar_renditions',
+    'profile__date_of_birth', 'profile__company_name', 'profile__pan_vat_number',
+    'profile__seller_license', 'profile__facebook_url',
+    'profile__twitter_url', 'profile__receive_marketing_emails',
+    'profile__receive_sms_notifications',
+)
+
+
 class CustomUserManager(BaseUserManager):
 
+    def with_profile(self):
+        """
+        Users joined to their profile in the same query, limited to the
+        columns the user serializers read.
+        """
+        return self.get_queryset().select_related('profile').only(*USER_LIST_FIELDS)
+
     def create_user(self, email, password=None, **extra_fields):
         if not email:
             raise ValueError(_("The email must be set"))
@@ -0,0 +1,34 @@
+# Generated by Django 4.2.7 on 2026-10-18 16:04
+
+from django.db import migrations, models
+import django.db.models.functions.text
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('users', '0006_rename_receve_sms_notifications_userprofile_receive_sms_notifications'),
+    ]
+
+    operations = [
+        migrations.AddIndex(
+            model_name='user',
+            index=models.Index(fields=['province', 'district', 'municipality'], name='user_geography_idx'),
+        ),
+        migrations.AddIndex(
+            model_name='user',
+            index=models.Index(django.db.models.functions.text.Lower('email'), models.F('id'), condition=models.Q(('is_active', True)), name='user_active_email_idx'),
+        ),
+        migrations.AddIndex(
+            model_name='user',
+            index=models.Index(django.db.models.functions.text.Right('phone_number', 10), models.F('id'), condition=models.Q(('is_active', True)), name='user_active_phone_idx'),
+        ),
+        migrations.AddIndex(
+            model_name='userprofile',
+            index=models.Index(condition=models.Q(('receive_marketing_emails', True)), fields=['user'], name='profile_marketing_idx'),
+        ),
+        migrations.AddIndex(
+            model_name='userprofile',
+            index=models.Index(condition=models.Q(('receive_sms_notifications', True)), fields=['user'], name='profile_sms_idx'),
+        ),
+    ]
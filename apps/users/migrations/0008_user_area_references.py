@@ -0,0 +1,32 @@
+from django.db import migrations, models
+import django.db.models.deletion
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('geography', '0002_load_nepal_geography'),
+        ('users', '0007_audience_indexes'),
+    ]
+
+    operations = [
+        migrations.RemoveIndex(
+            model_name='user',
+            name='user_geography_idx',
+        ),
+        migrations.AddField(
+            model_name='user',
+            name='province_ref',
+            field=models.ForeignKey(blank=True, null=True, on_delete=django.db.models.deletion.PROTECT, related_name='users', to='geography.province'),
+        ),
+        migrations.AddField(
+            model_name='user',
+            name='district_ref',
+            field=models.ForeignKey(blank=True, null=True, on_delete=django.db.models.deletion.PROTECT, related_name='users', to='geography.district'),
+        ),
+        migrations.AddField(
+            model_name='user',
+            name='municipality_ref',
+            field=models.ForeignKey(blank=True, null=True, on_delete=django.db.models.deletion.PROTECT, related_name='users', to='geography.municipality'),
+        ),
+    ]
@@ -0,0 +1,53 @@
+"""
+Point users at the geography tables, matching the old free-text province,
+district and municipality with the same loose rules the API uses. One
+UPDATE per distinct spelling, and district for municipalities, whose names
+repeat across districts; a value that matches is replaced by the
+name of its area. Values that match nothing (or more than one area) are
+left as they are: 0010 keeps the text columns as ``<level>_name`` and
+``manage.py map_user_areas`` maps them once the fixture lists their areas.
+"""
+import logging
+
+from django.db import migrations
+
+from apps.geography.hierarchy import get_hierarchy
+
+LEVELS = ('province', 'district', 'municipality')
+PARENT = {'district': 'province', 'municipality': 'district'}
+
+# apps.* goes to the console in production, to stderr by default
+logger = logging.getLogger(__name__)
+
+
+def map_areas(apps, schema_editor):
+    User = apps.get_model('users', 'User')
+    hierarchy = get_hierarchy()
+    for level in LEVELS:
+        unmatched = 0
+        # municipality names repeat across districts, whose refs are set by now
+        parent_field = f'{PARENT[level]}_ref_id' if level in PARENT else level
+        values = User.objects.exclude(**{level: ''}).values_list(level, parent_field).distinct()
+        for value, parent_id in list(values):
+            rows = User.objects.filter(**{level: value, parent_field: parent_id})
+            area = hierarchy.lookup(level, value, parent_id if level in PARENT else None)
+            if area is None:
+                unmatched += rows.count()
+                continue
+            rows.update(**{f'{level}_ref_id': area.id, level: area.name})
+        if unmatched:
+            logger.warning(
+                "%d user %s values match no area, kept in %s_name for map_user_areas",
+                unmatched, level, level)
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('users', '0008_user_area_references'),
+    ]
+
+    operations = [
+        # the text columns are kept, nothing to restore
+        migrations.RunPython(map_areas, migrations.RunPython.noop),
+    ]
@@ -0,0 +1,45 @@
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('users', '0009_map_user_areas'),
+    ]
+
+    operations = [
+        migrations.RenameField(
+            model_name='user',
+            old_name='province',
+            new_name='province_name',
+        ),
+        migrations.RenameField(
+            model_name='user',
+            old_name='district',
+            new_name='district_name',
+        ),
+        migrations.RenameField(
+            model_name='user',
+            old_name='municipality',
+            new_name='municipality_name',
+        ),
+        migrations.RenameField(
+            model_name='user',
+            old_name='province_ref',
+            new_name='province',
+        ),
+        migrations.RenameField(
+            model_name='user',
+            old_name='district_ref',
+            new_name='district',
+        ),
+        migrations.RenameField(
+            model_name='user',
+            old_name='municipality_ref',
+            new_name='municipality',
+        ),
+        migrations.AddIndex(
+            model_name='user',
+            index=models.Index(fields=['province', 'district', 'municipality'], name='user_geography_idx'),
+        ),
+    ]
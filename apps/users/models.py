@@ -1,7 +1,10 @@
 from django.contrib.auth.models import AbstractUser
 from django.db import models
+from django.db.models import Q
+from django.db.models.functions import Lower, Right
 from django.utils.translation import gettext_lazy as _
 from django.core.validators import RegexValidator
+from .hashing import get_hashing_service
 from .managers import CustomUserManager
 
 
@@ -37,9 +40,19 @@ class User (AbstractUser):
     is_email_verified = models.BooleanField(default=False)
     is_phone_verified = models.BooleanField(default=False)
 
-    province = models.CharField(max_length=50, blank=True)
-    district = models.CharField(max_length=50, blank=True)
-    municipality = models.CharField(max_length=50, blank=True)
+    # checked against apps.geography.hierarchy by the serializers
+    province = models.ForeignKey(
+        'geography.Province', on_delete=models.PROTECT, null=True, blank=True, related_name='users')
+    district = models.ForeignKey(
+        'geography.District', on_delete=models.PROTECT, null=True, blank=True, related_name='users')
+    municipality = models.ForeignKey(
+        'geography.Municipality', on_delete=models.PROTECT, null=True, blank=True,
+        related_name='users')
+    # the name of the area, or the name as given when no area matches it
+    # (the fixture lists few municipalities yet), see map_user_areas
+    province_name = models.CharField(max_length=50, blank=True)
+    district_name = models.CharField(max_length=50, blank=True)
+    municipality_name = models.CharField(max_length=50, blank=True)
     ward_no = models.IntegerField(null=True, blank=True)
 
     created_at = models.DateTimeField(auto_now_add=True)
@@ -59,6 +72,13 @@ class User (AbstractUser):
             models.Index(fields=['role']),
             models.Index(fields=['phone_number']),
             models.Index(fields=['created_at']),
+            # campaign audiences, see apps/users/audience.py
+            models.Index(fields=['province', 'district', 'municipality'],
+                         name='user_geography_idx'),
+            models.Index(Lower('email'), 'id', name='user_active_email_idx',
+                         condition=Q(is_active=True)),
+            models.Index(Right('phone_number', 10), 'id', name='user_active_phone_idx',
+                         condition=Q(is_active=True)),
         ]
 
     def __str__(self):
@@ -86,6 +106,19 @@ class User (AbstractUser):
     def full_name(self):
         return f"{self.first_name} {self.last_name}".strip()
 
+    def set_password(self, raw_password):
+        self.password = get_hashing_service().make_password(raw_password)
+        self._password = raw_password
+
+    def check_password(self, raw_password):
+        # rehashes with the preferred hasher when the stored one is outdated
+        def setter(raw_password):
+            self.set_password(raw_password)
+            self._password = None
+            self.save(update_fields=["password"])
+
+        return get_hashing_service().check_password(raw_password, self.password, setter)
+
 
 class UserProfile(models.Model):
     user = models.OneToOneField(
@@ -93,6 +126,8 @@ class UserProfile(models.Model):
 
     avatar = models.ImageField(
         'avatars/', null=True, blank=True, help_text=_("profile picture"))
+    # {format: {size: file name}}, filled in by apps.utils.images
+    avatar_renditions = models.JSONField(default=dict, blank=True)
 
     # for seller only
     company_name = models.CharField(max_length=100, blank=True)
@@ -110,6 +145,12 @@ class UserProfile(models.Model):
         verbose_name = _('user profile')
         verbose_name_plural = _('user profiles')
         db_table = "user_profile"
+        indexes = [
+            models.Index(fields=['user'], name='profile_marketing_idx',
+                         condition=Q(receive_marketing_emails=True)),
+            models.Index(fields=['user'], name='profile_sms_idx',
+                         condition=Q(receive_sms_notifications=True)),
+        ]
 
     def __str__(self):
         return f"profile of {self.user.email}"
@@ -1,14 +1,22 @@
 from rest_framework import serializers
+from rest_framework.validators import UniqueValidator
 from django.contrib.auth import authenticate
 from django.utils.translation import gettext_lazy as _
+from apps.geography.serializers import AreaField, validate_address
+from apps.utils.images import ImageUploadField, RenditionsField
+
 from .models import User, UserProfile
 
 
 class UserProfileSerializer(serializers.ModelSerializer):
+    # uploaded through AvatarView, resized in the background
+    avatar = serializers.ImageField(read_only=True)
+    avatar_renditions = RenditionsField('avatar')
+
     class Meta:
         model = UserProfile
         fields = [
-            'avatar', 'date_of_birth', 'company_name',
+            'avatar', 'avatar_renditions', 'date_of_birth', 'company_name',
             'pan_vat_number', 'seller_license',
             'facebook_url', 'twitter_url',
             'receive_marketing_emails', 'receive_sms_notifications'
@@ -18,6 +26,9 @@ class UserProfileSerializer(serializers.ModelSerializer):
 
 class UserSerializer(serializers.ModelSerializer):
     profile = UserProfileSerializer(read_only=True)
+    province = AreaField('province')
+    district = AreaField('district')
+    municipality = AreaField('municipality')
     password = serializers.CharField(write_only=True, required=True, style={
                                      'input_type': 'passwprd'})
 
@@ -52,7 +63,7 @@ class UserSerializer(serializers.ModelSerializer):
                     'phone_number': _("phone number is required for seller ")
                 }
             )
-        return data
+        return validate_address(data, self.instance)
 
     def create(self, validated_data):
         validated_data.pop('confirm_password', None)
@@ -77,6 +88,23 @@ class UserSerializer(serializers.ModelSerializer):
         return instance
 
 
+class UserImportSerializer(UserSerializer):
+    """
+    UserSerializer used by the ``import_users`` command: same fields and
+    ``validate`` rules, but email/phone uniqueness is checked once per batch
+    by the command instead of one query per row.
+    """
+
+    def get_fields(self):
+        fields = super().get_fields()
+        for name in ('email', 'phone_number'):
+            fields[name].validators = [
+                validator for validator in fields[name].validators
+                if not isinstance(validator, UniqueValidator)
+            ]
+        return fields
+
+
 class LoginSerializer(serializers.ModelSerializer):
     email = serializers.EmailField()
     password = serializers.CharField(style={'input_style': "password"},
@@ -136,8 +164,15 @@ class PasswordResetConformSerializer(serializers.Serializer):
         return data
 
 
+class AvatarSerializer(serializers.Serializer):
+    avatar = ImageUploadField()
+
+
 class UserUpdateSerializer(serializers.ModelSerializer):
     profile = UserProfileSerializer()
+    province = AreaField('province')
+    district = AreaField('district')
+    municipality = AreaField('municipality')
 
     class Meta:
         model = User
@@ -145,6 +180,9 @@ class UserUpdateSerializer(serializers.ModelSerializer):
                   'province', 'district', 'municipality', 'ward_no', 'profile']
         read_only_fields = ['id', 'email']
 
+    def validate(self, data):
+        return validate_address(data, self.instance)
+
     def update(self, instance, **validated_data):
         profile_data = validated_data.pop('profile', None)
 
@@ -0,0 +1,21 @@
+from django.db import transaction
+from django.db.models.signals import post_delete, post_save
+from django.dispatch import receiver
+from django.utils import timezone
+
+from .cache import invalidate_user
+from .models import User, UserProfile
+
+
+@receiver(post_save, sender=User)
+@receiver(post_delete, sender=User)
+def invalidate_user_cache(sender, instance, **kwargs):
+    transaction.on_commit(lambda: invalidate_user(instance.pk))
+
+
+@receiver(post_save, sender=UserProfile)
+def invalidate_profile_cache(sender, instance, **kwargs):
+    # the profile has no timestamp of its own, bump the user's so the
+    # ETag built from updated_at changes with the profile
+    User.objects.filter(pk=instance.user_id).update(updated_at=timezone.now())
+    transaction.on_commit(lambda: invalidate_user(instance.user_id))
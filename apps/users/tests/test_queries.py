@@ -0,0 +1,47 @@
+from unittest import mock
+
+from django.urls import reverse
+from rest_framework.pagination import PageNumberPagination
+from rest_framework.test import APITestCase
+
+from apps.users.models import User, UserProfile
+
+
+class UserQueryCountTests(APITestCase):
+    """
+    The admin user list and detail endpoints read users together with
+    their profiles, so the number of queries does not grow with the page.
+    """
+
+    @classmethod
+    def setUpTestData(cls):
+        cls.admin = User.objects.create(
+            email='admin@example.com', password='!', role=User.Role.ADMIN, is_staff=True)
+        UserProfile.objects.create(user=cls.admin)
+        for n in range(30):
+            user = User.objects.create(
+                email=f'user{n}@example.com', phone_number=f'98{n:08d}', password='!')
+            # a few users have no profile at all
+            if n % 5:
+                UserProfile.objects.create(user=user, company_name=f'Company {n}')
+
+    def setUp(self):
+        self.client.force_authenticate(self.admin)
+
+    def test_user_list(self):
+        for page_size in (5, 25):
+            with self.subTest(page_size=page_size), \
+                    mock.patch.object(PageNumberPagination, 'page_size', page_size):
+                # the count and the page
+                with self.assertNumQueries(2):
+                    response = self.client.get(reverse('user-list'))
+                self.assertEqual(response.status_code, 200)
+                self.assertEqual(len(response.data['results']), page_size)
+
+    def test_user_detail(self):
+        for user in User.objects.filter(email__in=['user1@example.com', 'user5@example.com']):
+            with self.subTest(email=user.email):
+                with self.assertNumQueries(1):
+                    response = self.client.get(reverse('user-detail', kwargs={'id': user.id}))
+                self.assertEqual(response.status_code, 200)
+                self.assertEqual(response.data['email'], user.email)
@@ -1,20 +1,35 @@
+from django.conf import settings
 from django.urls import path, include
 from rest_framework.routers import DefaultRouter
-from .import views
+from .import async_views, views
 
 # router for api view
 router = DefaultRouter()
 router.register(r'', views.UserViewSet, basename='user')
 
-urlpatterns = [
-    # for authentication
-    path('register/', views.RegisterView.as_view(), name='register'),
-    path('login/', views.LoginView.as_view(), name="login"),
-    path("logout/", views.LogoutView.as_view(), name="logout"),
-
+# authentication endpoints, served by the async views under ASGI when
+# USERS_ASYNC_VIEWS is on
+if settings.USERS_ASYNC_VIEWS:
+    auth_urlpatterns = [
+        path('register/', async_views.register, name='register'),
+        path('login/', async_views.login, name="login"),
+        path("logout/", async_views.logout, name="logout"),
+        path('me/', async_views.me, name='me'),
+        path('profile/', async_views.profile, name='profile'),
+    ]
+else:
+    auth_urlpatterns = [
+        path('register/', views.RegisterView.as_view(), name='register'),
+        path('login/', views.LoginView.as_view(), name="login"),
+        path("logout/", views.LogoutView.as_view(), name="logout"),
+        path('me/', views.UserViewSet.as_view({'get': 'me'}), name='me'),
+        path('profile/', views.UserProfileView.as_view(), name='profile'),
+    ]
+
+urlpatterns = auth_urlpatterns + [
     # for profile
+    path('profile/avatar/', views.AvatarView.as_view(), name='profile-avatar'),
 
-    path('profile/', views.UserProfileView.as_view(), name='profile'),
     path('change-password/', views.ChangePasswordView.as_view(),
          name='change-password'),
 
@@ -1,7 +1,7 @@
 from rest_framework import generics, permissions, status
+from rest_framework.parsers import FormParser, MultiPartParser
 from rest_framework.response import Response
 from rest_framework.views import APIView
-from rest_framework_simplejwt.tokens import RefreshToken
 from rest_framework_simplejwt.views import TokenObtainPairView
 from django.contrib.auth import logout
 from django.utils.translation import gettext_lazy as _
@@ -12,14 +12,25 @@ from rest_framework import viewsets
 from rest_framework.decorators import action
 
 
-from .models import User
-from .serializers import *
+from .cache import cached_user_response
+from .emails import send_password_reset_email
+from .models import User, UserProfile
+from .serializers import (
+    AvatarSerializer, ChangePasswordSerializzer, LoginSerializer,
+    PasswordResetConformSerializer, PasswordResetserializer,
+    UserProfileSerializer, UserSerializer, UserUpdateSerializer,
+)
 
+from apps.cart.services import merge_session_cart
+from apps.utils.images import accept
+from shared.authentication.authentication import get_user_instance
+from shared.authentication.tokens import ClaimsRefreshToken
 from shared.permissions.permissions import IsOwnerOrReadOnly
+from shared.serializers.serializers import FastListModelMixin
 
 
-class UserViewSet(viewsets.ModelViewSet):
-    queryset = User.objects.all()
+class UserViewSet(FastListModelMixin, viewsets.ModelViewSet):
+    queryset = User.objects.with_profile()
     serializer_class = UserSerializer
 
     def get_permissions(self):
@@ -41,27 +52,28 @@ class UserViewSet(viewsets.ModelViewSet):
         if user.is_anonymous:
             return User.objects.none()
         elif user.is_admin:
-            return User.objects.all()
+            return User.objects.with_profile()
         else:
-            return User.objects.filter(id=user.id)
+            return User.objects.with_profile().filter(id=user.id)
 
     @action(detail='False', methods=['get'])
     def me(self, request):
-        serializer = self.get_serializer(request.user)
-        return Response(serializer.data)
+        return cached_user_response(
+            request, 'me', lambda user: self.get_serializer(user).data)
 
 
 class RegisterView(generics.CreateAPIView):
     queryset = User.objects.all()
     serializer_class = UserSerializer
     permission_classes = [permissions.AllowAny]
+    throttle_scope = 'register'
 
     def create(self, request, *args, **kwargs):
         serializer = self.get_serializer(data=request.data)
         serializer.is_valid(raise_exception=True)
         user = serializer.save()
 
-        refresh = RefreshToken.for_user(user)
+        refresh = ClaimsRefreshToken.for_user(user)
 
         return Response({'user': UserSerializer(user, context=self.get_serializer_context()).data,
                          'refresh': str(refresh),
@@ -72,14 +84,16 @@ class RegisterView(generics.CreateAPIView):
 
 class LoginView(TokenObtainPairView):
     serializer_class = LoginSerializer
+    throttle_scope = 'login'
 
     def post(self, request, *args, **kwargs):
         serializer = self.get_serializer(data=request.data)
         serializer.is_valid(raise_exception=True)
 
         user = serializer.validated_data['user']
+        merge_session_cart(request, user)
 
-        refresh = RefreshToken.for_user(user)
+        refresh = ClaimsRefreshToken.for_user(user)
 
         return Response({'user': UserSerializer(user, context=self.get_serializer_context()).data,
                          "refresh":  str(refresh),
@@ -94,7 +108,7 @@ class LogoutView(APIView):
     def post(self, request):
         try:
             refresh_token = request.data.get('refresh')
-            token = RefreshToken(refresh_token)
+            token = ClaimsRefreshToken(refresh_token)
             token.blacklist()
 
             logout(request)
@@ -112,7 +126,38 @@ class UserProfileView(generics.RetrieveUpdateAPIView):
     permission_classes = [permissions.IsAuthenticated, IsOwnerOrReadOnly]
 
     def get_object(self):
-        return self.request.user
+        return get_user_instance(self.request.user)
+
+    def retrieve(self, request, *args, **kwargs):
+        return cached_user_response(
+            request, 'profile', lambda user: self.get_serializer(user).data)
+
+
+class AvatarView(APIView):
+    """
+    Replace the profile picture. Answers 202 once the upload is stored; the
+    resized renditions appear in ``avatar_renditions`` when ``run_jobs`` has
+    made them.
+    """
+    parser_classes = [MultiPartParser, FormParser]
+    permission_classes = [permissions.IsAuthenticated]
+
+    def put(self, request):
+        serializer = AvatarSerializer(data=request.data)
+        serializer.is_valid(raise_exception=True)
+        profile = UserProfile.objects.get_or_create(user_id=request.user.pk)[0]
+        accept(profile, 'avatar', serializer.validated_data['avatar'])
+        return Response(UserProfileSerializer(profile, context={'request': request}).data,
+                        status=status.HTTP_202_ACCEPTED)
+
+    def delete(self, request):
+        # the files stay, other uploads of the same picture may share them
+        profile = UserProfile.objects.filter(user_id=request.user.pk).first()
+        if profile is not None:
+            profile.avatar = None
+            profile.avatar_renditions = {}
+            profile.save(update_fields=['avatar', 'avatar_renditions'])
+        return Response(status=status.HTTP_204_NO_CONTENT)
 
 
 class ChangePasswordView(generics.UpdateAPIView):
@@ -120,7 +165,7 @@ class ChangePasswordView(generics.UpdateAPIView):
     permission_classes = [permissions.IsAuthenticated]
 
     def get_object(self):
-        return self.request.user
+        return get_user_instance(self.request.user)
 
     def update(self, request, *args, **kwargs):
         user = self.get_object()
@@ -144,11 +189,19 @@ class ChangePasswordView(generics.UpdateAPIView):
 class PasswordResetView(generics.GenericAPIView):
     serializer_class = PasswordResetserializer
     permission_classes = [permissions.AllowAny]
+    throttle_scope = 'password-reset'
 
     def post(self, request):
         serializer = self.get_serializer(data=request.data)
         serializer.is_valid(raise_exception=True)
 
+        # the same answer for unknown addresses; the email is sent by the
+        # outbox worker, not from this request
+        user = User.objects.filter(
+            email=serializer.validated_data['email'], is_active=True).first()
+        if user is not None:
+            send_password_reset_email(user)
+
         return Response({
             "message": _("password reset email has been sent")
         }, status=status.HTTP_200_OK)
@@ -167,17 +220,17 @@ class PasswordResetConformView(generics.GenericAPIView):
         }, status=status.HTTP_200_OK)
 
 
-class UserListView(generics.ListAPIView):
-    queryset = User.objects.all()
+class UserListView(FastListModelMixin, generics.ListAPIView):
+    queryset = User.objects.with_profile()
     serializer_class = UserSerializer
     permission_classes = [permissions.IsAdminUser]
 
     def get_queryset(self):
-        return User.objects.all().order_by('-date_joined')
+        return User.objects.with_profile().order_by('-date_joined')
 
 
 class UserDetailView(generics.RetrieveUpdateDestroyAPIView):
-    queryset = User.objects.all()
+    queryset = User.objects.with_profile()
     serializer_class = UserSerializer
     permission_classes = [permissions.IsAdminUser]
     lookup_field = 'id'
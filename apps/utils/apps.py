@@ -0,0 +1,19 @@
+from django.apps import AppConfig
+
+
+class UtilsConfig(AppConfig):
+    default_auto_field = 'django.db.models.BigAutoField'
+    name = 'apps.utils'
+    verbose_name = 'Utils'
+
+    def ready(self):
+        from django.db.backends.signals import connection_created
+
+        from .metrics import record_query
+
+        def install_query_recorder(sender, connection, **kwargs):
+            if record_query not in connection.execute_wrappers:
+                connection.execute_wrappers.append(record_query)
+
+        connection_created.connect(install_query_recorder, weak=False,
+                                   dispatch_uid='apps.utils.install_query_recorder')
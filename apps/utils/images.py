@@ -0,0 +1,199 @@
+"""
+Uploaded images and their renditions.
+
+``accept`` stores an upload under the hash of its content and queues an
+``image_renditions`` job, so the request returns after one write and a
+header check. The job (``run_jobs``, several at once on the outbox thread
+pool; Pillow releases the GIL while it resizes and encodes) decodes the
+original once, at reduced resolution where the format allows, and writes
+every size of ``IMAGES['SIZES']`` in each format of ``IMAGES['FORMATS']``.
+Each rendition is named after the hash of its own bytes: a URL never
+changes content and can be cached forever, and a rendition already in
+storage is not written again.
+
+Files go to the field's storage, the local filesystem by default or S3
+and S3-compatible servers (MinIO, LocalStack) with ``MEDIA_STORAGE=s3``.
+
+A model takes part with an ``ImageField`` and a ``JSONField`` named
+``<field>_renditions``, which holds ``{format: {size: name}}`` once the
+job is done and is empty while it is pending.
+"""
+import hashlib
+from io import BytesIO
+
+from django.apps import apps
+from django.conf import settings
+from django.core.files.base import ContentFile
+from django.db import transaction
+from django.utils.functional import cached_property
+from PIL import Image, ImageOps
+from rest_framework import serializers
+
+from shared.serializers.serializers import absolute_url
+
+from .outbox import enqueue
+
+DEFAULTS = {
+    # longest side in pixels
+    'SIZES': (64, 128, 256, 512),
+    'FORMATS': ('webp', 'jpeg'),
+    'QUALITY': 80,
+    'MAX_PIXELS': 40_000_000,
+}
+
+# Pillow format: file extension
+EXTENSIONS = {'JPEG': 'jpg', 'MPO': 'jpg', 'PNG': 'png', 'WEBP': 'webp', 'GIF': 'gif'}
+
+
+def get_setting(name):
+    return getattr(settings, 'IMAGES', {}).get(name, DEFAULTS[name])
+
+
+def content_name(prefix, data, extension):
+    digest = hashlib.sha256(data).hexdigest()
+    return f'{prefix}/{digest[:2]}/{digest}.{extension}'
+
+
+def save_once(storage, name, data):
+    """Store ``data`` as ``name`` unless an earlier save already did."""
+    if storage.exists(name):
+        return name
+    return storage.save(name, ContentFile(data))
+
+
+def renditions_field(field):
+    return f'{field}_renditions'
+
+
+def accept(instance, field, upload):
+    """
+    Store ``upload`` as the original of ``instance.<field>`` and queue its
+    renditions. The caller has checked that it is an image.
+    """
+    data = upload.read()
+    with Image.open(BytesIO(data)) as image:
+        extension = EXTENSIONS[image.format]
+    storage = getattr(instance, field).storage
+    name = save_once(storage, content_name(f'{field}s', data, extension), data)
+    with transaction.atomic():
+        setattr(instance, field, name)
+        setattr(instance, renditions_field(field), {})
+        instance.save(update_fields=[field, renditions_field(field)])
+        enqueue('image_renditions', {
+            'model': instance._meta.label,
+            'pk': instance.pk,
+            'field': field,
+            'name': name,
+        })
+    return name
+
+
+def flatten(image):
+    # JPEG has no alpha channel: lay transparent images on white
+    if image.mode in ('RGBA', 'LA') or 'transparency' in image.info:
+        image = image.convert('RGBA')
+        background = Image.new('RGB', image.size, 'white')
+        background.paste(image, mask=image.getchannel('A'))
+        return background
+    return image.convert('RGB')
+
+
+def encode(image, fmt, quality):
+    buffer = BytesIO()
+    if fmt == 'jpeg':
+        flatten(image).save(buffer, 'JPEG', quality=quality, optimize=True, progressive=True)
+    else:
+        if image.mode not in ('RGB', 'RGBA'):
+            image = image.convert('RGBA' if 'transparency' in image.info else 'RGB')
+        image.save(buffer, 'WEBP', quality=quality, method=4)
+    return buffer.getvalue()
+
+
+def render(data, sizes=None, formats=None, quality=None):
+    """``{format: {size: bytes}}`` of the image in ``data``."""
+    sizes = sorted(sizes or get_setting('SIZES'), reverse=True)
+    formats = formats or get_setting('FORMATS')
+    quality = quality or get_setting('QUALITY')
+    rendered = {fmt: {} for fmt in formats}
+    with Image.open(BytesIO(data)) as image:
+        if image.width * image.height > get_setting('MAX_PIXELS'):
+            raise ValueError(f"{image.width}x{image.height} is too large")
+        # JPEGs decode straight at a fraction of their size
+        image.draft('RGB', (sizes[0], sizes[0]))
+        source = ImageOps.exif_transpose(image)
+        # each size is scaled down from the next larger one
+        for size in sizes:
+            source = source.copy()
+            source.thumbnail((size, size), Image.LANCZOS, reducing_gap=3.0)
+            for fmt in formats:
+                rendered[fmt][size] = encode(source, fmt, quality)
+    return rendered
+
+
+def make_renditions(storage, name, **options):
+    """Render the original ``name`` and store the results, ``{format: {size: name}}``."""
+    with storage.open(name, 'rb') as f:
+        data = f.read()
+    return {
+        fmt: {
+            str(size): save_once(
+                storage, content_name('renditions', output, EXTENSIONS[fmt.upper()]), output)
+            for size, output in sizes.items()
+        }
+        for fmt, sizes in render(data, **options).items()
+    }
+
+
+def process(payload):
+    """Renditions for an ``accept``-ed upload, unless it was replaced meanwhile."""
+    model = apps.get_model(payload['model'])
+    field = payload['field']
+    storage = model._meta.get_field(field).storage
+    renditions = make_renditions(storage, payload['name'])
+    with transaction.atomic():
+        instance = model.objects.select_for_update().filter(pk=payload['pk']).first()
+        if instance is None or getattr(instance, field).name != payload['name']:
+            return
+        setattr(instance, renditions_field(field), renditions)
+        instance.save(update_fields=[renditions_field(field)])
+
+
+class ImageUploadField(serializers.ImageField):
+    """An ``ImageField`` for the formats above that also refuses decompression bombs."""
+    default_error_messages = {
+        'unsupported': "upload a JPEG, PNG, WebP or GIF image",
+        'too_large': "images may have at most {max_pixels} pixels",
+    }
+
+    def to_internal_value(self, data):
+        upload = super().to_internal_value(data)
+        upload.seek(0)
+        with Image.open(upload) as image:
+            if image.format not in EXTENSIONS:
+                self.fail('unsupported')
+            if image.width * image.height > get_setting('MAX_PIXELS'):
+                self.fail('too_large', max_pixels=get_setting('MAX_PIXELS'))
+        upload.seek(0)
+        return upload
+
+
+class RenditionsField(serializers.ReadOnlyField):
+    """``{format: {size: url}}`` of the ``<field>_renditions`` column of ``field``."""
+
+    def __init__(self, field, **kwargs):
+        self.image_field = field
+        super().__init__(**kwargs)
+
+    @cached_property
+    def urls(self):
+        """``(storage, build)``: ``build`` makes a storage URL absolute like DRF's ImageField."""
+        storage = self.parent.Meta.model._meta.get_field(self.image_field).storage
+        request = self.context.get('request')
+        return storage, absolute_url(request) if request is not None else str
+
+    def to_representation(self, value):
+        storage, url = self.urls
+        return {
+            fmt: {size: url(storage.url(name)) for size, name in sizes.items()}
+            for fmt, sizes in (value or {}).items()
+        }
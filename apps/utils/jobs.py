@@ -0,0 +1,57 @@
+"""Outbox handlers for outgoing email and text messages and for image renditions."""
+from django.core.mail import EmailMultiAlternatives, get_connection
+
+from . import images, sms
+from .outbox import enqueue, handler
+
+
+def queue_email(to, subject, body, html=None, from_email=None):
+    """Send an email from the outbox once the current transaction commits."""
+    return enqueue('email', {
+        'to': [to] if isinstance(to, str) else list(to),
+        'subject': subject,
+        'body': body,
+        'html': html,
+        'from_email': from_email,
+    })
+
+
+def queue_sms(phone_number, text):
+    return enqueue('sms', {'to': phone_number, 'text': text})
+
+
+def email_message(payload, connection):
+    message = EmailMultiAlternatives(
+        payload['subject'], payload['body'],
+        from_email=payload.get('from_email'), to=payload['to'], connection=connection)
+    if payload.get('html'):
+        message.attach_alternative(payload['html'], 'text/html')
+    return message
+
+
+@handler('email', batch=True)
+def send_emails(payloads):
+    # one connection (one SMTP login) for the whole batch; a failed
+    # message is retried on its own and does not stop the others
+    errors = []
+    with get_connection() as connection:
+        for payload in payloads:
+            try:
+                email_message(payload, connection).send()
+                errors.append(None)
+            except Exception as exc:
+                errors.append(repr(exc))
+                # reconnect for the next message in case the server hung up
+                connection.close()
+    return errors
+
+
+@handler('sms', batch=True)
+def send_sms(payloads):
+    return sms.get_backend().send_messages(
+        [(payload['to'], payload['text']) for payload in payloads])
+
+
+@handler('image_renditions')
+def image_renditions(payload):
+    images.process(payload)
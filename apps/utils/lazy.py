@@ -0,0 +1,95 @@
+"""
+Subsystems a worker loads on first use rather than at startup.
+
+Workers are recycled often and new ones start on every scale-out, so
+whatever the URLconf imports is paid before the first request:
+
+- ``lazy_view`` stands in for a view whose module is heavy and rarely
+  hit, the API docs (drf_yasg alone costs some 100 ms);
+- ``LazyURLconf`` stands in for an included URLconf and builds its
+  patterns the first time a URL under its prefix is resolved, or
+  anything is reversed;
+- ``LazyAdminConfig`` replaces ``django.contrib.admin`` and imports the
+  ``admin`` modules of the apps when the admin is first resolved, or the
+  system checks run, instead of in ``django.setup()``.
+
+``manage.py startup_profile`` fails when one of them is loaded before the
+first request.
+"""
+import threading
+
+from django.contrib.admin import site
+from django.contrib.admin.apps import SimpleAdminConfig
+from django.contrib.admin.checks import check_admin_app, check_dependencies
+from django.core import checks
+from django.utils.module_loading import autodiscover_modules, import_string
+
+# reentrant: the admin patterns discover the admin modules under it
+_lock = threading.RLock()
+_discovered = False
+
+
+def lazy_view(path, *args):
+    """
+    The view at dotted ``path``, imported on its first request. With
+    ``args``, ``path`` is a factory and the view is ``factory(*args)``.
+    """
+    view = None
+
+    def load(request, *view_args, **view_kwargs):
+        nonlocal view
+        if view is None:
+            with _lock:
+                if view is None:
+                    target = import_string(path)
+                    view = target(*args) if args else target
+        return view(request, *view_args, **view_kwargs)
+    return load
+
+
+class LazyURLconf:
+    """
+    Patterns made by the callable at dotted ``path`` when first needed.
+    Use as ``path('prefix/', (LazyURLconf(...), app_name, namespace))``;
+    ``include()`` would build them straight away.
+    """
+
+    def __init__(self, path):
+        self.path = path
+        self.patterns = None
+
+    @property
+    def urlpatterns(self):
+        if self.patterns is None:
+            with _lock:
+                if self.patterns is None:
+                    self.patterns = import_string(self.path)()
+        return self.patterns
+
+
+def autodiscover():
+    """``django.contrib.admin.autodiscover``, once."""
+    global _discovered
+    if not _discovered:
+        with _lock:
+            if not _discovered:
+                autodiscover_modules('admin', register_to=site)
+                _discovered = True
+
+
+def admin_urlpatterns():
+    autodiscover()
+    return site.get_urls()
+
+
+def check_admin(app_configs, **kwargs):
+    autodiscover()
+    return check_admin_app(app_configs)
+
+
+class LazyAdminConfig(SimpleAdminConfig):
+    """``django.contrib.admin`` with the ``admin`` modules imported on first use."""
+
+    def ready(self):
+        checks.register(check_dependencies, checks.Tags.admin)
+        checks.register(check_admin, checks.Tags.admin)
@@ -0,0 +1,75 @@
+import statistics
+import tempfile
+import time
+from concurrent.futures import ThreadPoolExecutor
+from io import BytesIO
+
+from django.core.files.storage import FileSystemStorage, default_storage
+from django.core.management.base import BaseCommand
+from PIL import Image, ImageOps
+
+from apps.utils.images import content_name, get_setting, make_renditions, save_once
+
+
+def synthetic(width, height, quality=90):
+    """A JPEG photo stand-in: noise for detail over two gradients for colour."""
+    gradient = Image.linear_gradient('L').resize((width, height))
+    image = Image.merge('RGB', (
+        Image.effect_noise((width, height), 48), gradient, ImageOps.mirror(gradient)))
+    buffer = BytesIO()
+    image.save(buffer, 'JPEG', quality=quality)
+    return buffer.getvalue()
+
+
+class Command(BaseCommand):
+    help = (
+        "Render avatar renditions of synthetic photos on thread pools of "
+        "several sizes and report images and renditions per second"
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument('--images', type=int, default=100)
+        parser.add_argument('--width', type=int, default=3000)
+        parser.add_argument('--height', type=int, default=2000)
+        parser.add_argument('--concurrency', type=int, nargs='+', default=[1, 2, 4])
+        parser.add_argument('--storage', choices=['local', 'default'], default='local',
+                            help="a temporary directory, or DEFAULT_FILE_STORAGE (S3 with "
+                                 "MEDIA_STORAGE=s3); renditions already stored by an earlier "
+                                 "round are not written again")
+
+    def handle(self, *args, **options):
+        started = time.perf_counter()
+        originals = [synthetic(options['width'], options['height'])
+                     for _ in range(options['images'])]
+        self.stdout.write(
+            f"made {len(originals)} {options['width']}x{options['height']} JPEGs "
+            f"({sum(map(len, originals)) / len(originals) / 1024:.0f} KiB each) "
+            f"in {time.perf_counter() - started:.1f}s")
+        sizes, formats = get_setting('SIZES'), get_setting('FORMATS')
+        self.stdout.write(f"renditions: {list(sizes)} px in {', '.join(formats)}")
+
+        for concurrency in options['concurrency']:
+            with tempfile.TemporaryDirectory() as directory:
+                storage = (FileSystemStorage(location=directory)
+                           if options['storage'] == 'local' else default_storage)
+                self.run(storage, originals, concurrency, len(sizes) * len(formats))
+
+    def run(self, storage, originals, concurrency, per_image):
+        # what the upload request does: hash and store the original
+        accepted = []
+        names = []
+        for data in originals:
+            started = time.perf_counter()
+            names.append(save_once(storage, content_name('avatars', data, 'jpg'), data))
+            accepted.append(time.perf_counter() - started)
+
+        started = time.perf_counter()
+        with ThreadPoolExecutor(concurrency) as pool:
+            results = list(pool.map(lambda name: make_renditions(storage, name), names))
+        elapsed = time.perf_counter() - started
+        stored = sum(len(sizes) for renditions in results for sizes in renditions.values())
+        assert stored == per_image * len(names)
+        self.stdout.write(
+            f"{concurrency} threads: {len(names) / elapsed:.1f} images/s, "
+            f"{stored / elapsed:.0f} renditions/s; upload store "
+            f"p50 {statistics.median(accepted) * 1000:.1f} ms")
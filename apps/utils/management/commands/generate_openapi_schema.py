@@ -0,0 +1,41 @@
+import gzip
+import time
+from pathlib import Path
+
+from django.core.management.base import BaseCommand
+
+from apps.utils.schema import FORMATS, generate, schema_directory, schema_name, urlconf_hash
+
+
+class Command(BaseCommand):
+    help = (
+        "Write the OpenAPI schema of the running URLconf to OPENAPI_SCHEMA_DIR "
+        "for WhiteNoise to serve; run at deploy, after collectstatic"
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument('--output-dir', type=Path, help="instead of OPENAPI_SCHEMA_DIR")
+        parser.add_argument('--format', choices=list(FORMATS), action='append',
+                            help="json, yaml or both (the default)")
+        parser.add_argument('--keep', action='store_true',
+                            help="keep the files generated for other URLconfs")
+
+    def handle(self, *args, **options):
+        directory = options['output_dir'] or schema_directory()
+        directory.mkdir(parents=True, exist_ok=True)
+        for fmt in options['format'] or FORMATS:
+            started = time.perf_counter()
+            body = generate(fmt)
+            path = directory / schema_name(fmt)
+            # written aside and renamed, a worker never reads half a file
+            for target, data in ((path, body), (path.with_name(f'{path.name}.gz'), gzip.compress(body))):
+                partial = target.with_name(f'.{target.name}.tmp')
+                partial.write_bytes(data)
+                partial.replace(target)
+            self.stdout.write(
+                f"{path} ({len(body)} bytes) in {(time.perf_counter() - started) * 1000:.0f} ms")
+        if not options['keep']:
+            current = f'openapi-{urlconf_hash()}.'
+            for stale in directory.glob('openapi-*'):
+                if not stale.name.startswith(current):
+                    stale.unlink()
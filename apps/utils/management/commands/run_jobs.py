@@ -0,0 +1,43 @@
+import time
+from datetime import timedelta
+
+from django.core.management.base import BaseCommand
+from django.utils import timezone
+
+from apps.utils.models import OutboxJob
+from apps.utils.outbox import get_setting, run_pending
+
+
+class Command(BaseCommand):
+    help = "Run outbox jobs (emails, text messages, image renditions) until stopped"
+
+    def add_arguments(self, parser):
+        parser.add_argument('--once', action='store_true',
+                            help="run the jobs that are due and exit")
+        parser.add_argument('--batch-size', type=int, default=None,
+                            help="jobs claimed at a time, defaults to OUTBOX['BATCH_SIZE']")
+        parser.add_argument('--concurrency', type=int, default=None,
+                            help="handler threads, defaults to OUTBOX['CONCURRENCY']")
+        parser.add_argument('--poll-interval', type=float, default=1.0)
+        parser.add_argument('--keep-days', type=int, default=7,
+                            help="delete finished jobs older than this")
+
+    def handle(self, *args, **options):
+        concurrency = options['concurrency'] or get_setting('CONCURRENCY')
+        while True:
+            succeeded, failed = run_pending(options['batch_size'], concurrency)
+            if succeeded or failed or options['once']:
+                self.stdout.write(f"{succeeded} jobs done, {failed} failed")
+            self.prune(options['keep_days'])
+            if options['once']:
+                return
+            try:
+                time.sleep(options['poll_interval'])
+            except KeyboardInterrupt:
+                return
+
+    def prune(self, keep_days):
+        OutboxJob.objects.filter(
+            status__in=[OutboxJob.Status.DONE, OutboxJob.Status.FAILED],
+            finished_at__lt=timezone.now() - timedelta(days=keep_days),
+        ).delete()
@@ -0,0 +1,154 @@
+import json
+import os
+import re
+import statistics
+import subprocess
+import sys
+import time
+from collections import defaultdict, namedtuple
+
+from django.conf import settings
+from django.core.management.base import BaseCommand, CommandError
+
+# modules a worker must not import before it has served its first request
+LAZY_MODULES = ('drf_yasg', 'pkg_resources', 'debug_toolbar.toolbar')
+
+# run in a fresh interpreter: build the WSGI application, serve one request
+WORKER = '''
+import importlib, importlib.util, json, sys, time
+from io import BytesIO
+from wsgiref.util import setup_testing_defaults
+started = time.perf_counter()
+
+
+def import_module(name, package=None):
+    # through the import statement, which -X importtime reports
+    if name.startswith('.'):
+        name = importlib.util.resolve_name(name, package)
+    __import__(name)
+    return sys.modules[name]
+
+
+importlib.import_module = import_module
+
+from django.core.wsgi import get_wsgi_application
+application = get_wsgi_application()
+loaded = time.perf_counter()
+
+environ = {'PATH_INFO': sys.argv[1], 'REQUEST_METHOD': 'GET', 'wsgi.input': BytesIO()}
+setup_testing_defaults(environ)
+status = []
+response = application(environ, lambda line, headers, exc_info=None: status.append(line))
+b''.join(response)
+response.close()
+served = time.perf_counter()
+print('startup_profile ' + json.dumps({
+    'setup': loaded - started,
+    'first_request': served - loaded,
+    'status': status[0],
+    'modules': sorted(sys.modules),
+}))
+'''
+
+IMPORT_LINE = re.compile(r'import time:\s+(\d+) \|\s+(\d+) \| ( *)(\S+)')
+
+Module = namedtuple('Module', 'name own cumulative children')
+
+
+def import_tree(log):
+    """The ``Module`` roots of a ``-X importtime`` log, which lists children before parents."""
+    pending = defaultdict(list)
+    for line in log.splitlines():
+        match = IMPORT_LINE.match(line)
+        if match is None:
+            continue
+        own, cumulative, indent, name = match.groups()
+        depth = len(indent) // 2
+        children = pending.pop(depth + 1, [])
+        pending[depth].append(Module(name, int(own), int(cumulative), children))
+    return pending[0]
+
+
+def walk(modules):
+    for module in modules:
+        yield module
+        yield from walk(module.children)
+
+
+class Command(BaseCommand):
+    help = (
+        "Start the WSGI application in fresh interpreters and report the time "
+        "to the first request and what each module costs to import; fails when "
+        "over --budget or when a module meant to load lazily was imported"
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument('--path', default='/metrics/', help="of the first request")
+        parser.add_argument('--runs', type=int, default=5, help="timed starts, best counts")
+        parser.add_argument('--budget', type=float,
+                            help="milliseconds from interpreter start to the first response")
+        parser.add_argument('--lazy', action='append', metavar='MODULE',
+                            help=f"must not be imported at startup, default {', '.join(LAZY_MODULES)}")
+        parser.add_argument('--min-ms', type=float, default=5, help="smallest import shown")
+        parser.add_argument('--depth', type=int, default=3, help="of the import tree shown")
+
+    def handle(self, *args, **options):
+        self.path = options['path']
+        timings = [self.start() for _ in range(options['runs'])]
+        _, profiled, log = self.start(importtime=True)
+
+        totals = [wall for wall, _, _ in timings]
+        setup = min(result['setup'] for _, result, _ in timings)
+        first = min(result['first_request'] for _, result, _ in timings)
+        self.stdout.write(
+            f"{os.environ['DJANGO_SETTINGS_MODULE']}, GET {self.path}: {profiled['status']}")
+        self.stdout.write(
+            f"interpreter start to first response: best {min(totals) * 1000:.0f} ms, "
+            f"median {statistics.median(totals) * 1000:.0f} ms of {len(totals)}")
+        self.stdout.write(
+            f"  django.setup and WSGI handler {setup * 1000:.0f} ms, "
+            f"first request {first * 1000:.0f} ms")
+
+        roots = import_tree(log)
+        self.stdout.write(f"\nimports over {options['min_ms']:g} ms (cumulative / own):")
+        self.write_tree(roots, options['min_ms'] * 1000, options['depth'])
+
+        packages = defaultdict(int)
+        for module in walk(roots):
+            packages[module.name.split('.')[0]] += module.own
+        self.stdout.write("\nown import time by top-level package:")
+        for name, own in sorted(packages.items(), key=lambda item: -item[1])[:15]:
+            self.stdout.write(f"  {own / 1000:8.1f} ms  {name}")
+
+        problems = []
+        if options['budget'] is not None and min(totals) * 1000 > options['budget']:
+            problems.append(
+                f"first response after {min(totals) * 1000:.0f} ms, over the budget of "
+                f"{options['budget']:g} ms")
+        loaded = set(profiled['modules'])
+        for name in options['lazy'] or LAZY_MODULES:
+            if name in loaded:
+                problems.append(f"{name} is imported before the first request")
+        if problems:
+            raise CommandError('\n'.join(problems))
+
+    def start(self, importtime=False):
+        """``(wall seconds, worker result, importtime log)`` of one fresh start."""
+        command = [sys.executable, *(['-X', 'importtime'] if importtime else []),
+                   '-c', WORKER, self.path]
+        started = time.perf_counter()
+        process = subprocess.run(command, cwd=settings.BASE_DIR, capture_output=True, text=True)
+        wall = time.perf_counter() - started
+        lines = [line for line in process.stdout.splitlines() if line.startswith('startup_profile ')]
+        if process.returncode or not lines:
+            raise CommandError(f"the worker failed:\n{process.stderr[-3000:]}")
+        return wall, json.loads(lines[-1].split(' ', 1)[1]), process.stderr
+
+    def write_tree(self, modules, threshold, depth, indent=''):
+        for module in sorted(modules, key=lambda module: -module.cumulative):
+            if module.cumulative < threshold:
+                break
+            self.stdout.write(
+                f"{module.cumulative / 1000:8.1f} {module.own / 1000:7.1f}  {indent}{module.name}")
+            if depth > 1:
+                self.write_tree(module.children, threshold, depth - 1, indent + '  ')
@@ -0,0 +1,37 @@
+import sqlite3
+import time
+from contextlib import closing
+
+from django.core.management.base import BaseCommand, CommandError
+from django.db import DEFAULT_DB_ALIAS, connections
+
+from apps.utils.routers import replicas
+
+
+class Command(BaseCommand):
+    help = (
+        "Copy the SQLite primary database over its SQLite replicas, a stand-in "
+        "for replication when trying out the replica router locally"
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument('--loop', type=float, default=0,
+                            help="copy again every N seconds, N being the replication lag")
+
+    def handle(self, *args, **options):
+        primary = connections[DEFAULT_DB_ALIAS].settings_dict
+        targets = [connections[alias].settings_dict for alias in replicas()
+                   if connections[alias].vendor == 'sqlite']
+        if primary['ENGINE'] != 'django.db.backends.sqlite3' or not targets:
+            raise CommandError("needs a SQLite default database and SQLite replica_* databases")
+        while True:
+            started = time.perf_counter()
+            with closing(sqlite3.connect(primary['NAME'])) as source:
+                for target in targets:
+                    with closing(sqlite3.connect(target['NAME'])) as destination:
+                        source.backup(destination)
+            self.stdout.write(
+                f"copied to {len(targets)} replicas in {(time.perf_counter() - started) * 1000:.0f} ms")
+            if not options['loop']:
+                return
+            time.sleep(options['loop'])
@@ -0,0 +1,205 @@
+"""
+In-process request metrics.
+
+Each request gets a ``RequestMetrics`` in a context variable; the database
+execute wrapper and the cache layer add to it, ``PerformanceMiddleware``
+times the rendering of the response and folds it all into per-view
+histograms at the end of the request. Histograms use fixed log-spaced buckets (HDR style, ~19%
+relative precision) so recording is a bisect and an increment.
+"""
+import re
+import threading
+import time
+from bisect import bisect_left
+from collections import Counter
+from contextvars import ContextVar
+
+# seconds, 100us .. ~60s, each bound 2**0.25 times the previous one
+LATENCY_BUCKETS = tuple(0.0001 * 2 ** (i / 4) for i in range(77))
+# query counts
+COUNT_BUCKETS = (0, 1, 2, 3, 4, 5, 6, 8, 10, 13, 16, 20, 25, 32, 40, 50,
+                 64, 80, 100, 128, 160, 200, 256, 512, 1024)
+
+current_metrics = ContextVar('current_metrics', default=None)
+
+
+class Histogram:
+
+    def __init__(self, bounds):
+        self.bounds = bounds
+        # one extra bucket for values above the last bound
+        self.counts = [0] * (len(bounds) + 1)
+        self.sum = 0
+        self.count = 0
+
+    def record(self, value):
+        self.counts[bisect_left(self.bounds, value)] += 1
+        self.sum += value
+        self.count += 1
+
+    def quantile(self, q):
+        if not self.count:
+            return 0
+        rank = q * self.count
+        seen = 0
+        for index, count in enumerate(self.counts):
+            seen += count
+            if seen >= rank:
+                return self.bounds[min(index, len(self.bounds) - 1)]
+        return self.bounds[-1]
+
+    def cumulative(self):
+        seen = 0
+        for bound, count in zip(self.bounds, self.counts):
+            seen += count
+            yield bound, seen
+
+
+class ViewMetrics:
+
+    def __init__(self):
+        self.lock = threading.Lock()
+        self.latency = Histogram(LATENCY_BUCKETS)
+        self.db_time = Histogram(LATENCY_BUCKETS)
+        self.serializer_time = Histogram(LATENCY_BUCKETS)
+        self.queries = Histogram(COUNT_BUCKETS)
+        self.cache_hits = 0
+        self.cache_misses = 0
+        self.over_budget = 0
+
+    def record(self, request_metrics, latency, over_budget):
+        with self.lock:
+            self.latency.record(latency)
+            self.db_time.record(request_metrics.db_time)
+            self.serializer_time.record(request_metrics.serializer_time)
+            self.queries.record(request_metrics.query_count)
+            self.cache_hits += request_metrics.cache_hits
+            self.cache_misses += request_metrics.cache_misses
+            self.over_budget += over_budget
+
+
+class Registry:
+
+    def __init__(self):
+        self.lock = threading.Lock()
+        self.views = {}
+
+    def get(self, view_name):
+        metrics = self.views.get(view_name)
+        if metrics is None:
+            with self.lock:
+                metrics = self.views.setdefault(view_name, ViewMetrics())
+        return metrics
+
+    def items(self):
+        with self.lock:
+            return sorted(self.views.items())
+
+
+registry = Registry()
+
+
+class RequestMetrics:
+    __slots__ = ('query_count', 'db_time', 'statements', 'cache_hits',
+                 'cache_misses', 'serializer_time')
+
+    def __init__(self):
+        self.query_count = 0
+        self.db_time = 0.0
+        self.statements = []
+        self.cache_hits = 0
+        self.cache_misses = 0
+        self.serializer_time = 0.0
+
+
+def record_query(execute, sql, params, many, context):
+    """Database execute wrapper feeding the current request's metrics."""
+    metrics = current_metrics.get()
+    if metrics is None:
+        return execute(sql, params, many, context)
+
+    started = time.perf_counter()
+    try:
+        return execute(sql, params, many, context)
+    finally:
+        metrics.db_time += time.perf_counter() - started
+        metrics.query_count += 1
+        metrics.statements.append(sql)
+
+
+def record_cache(hit):
+    metrics = current_metrics.get()
+    if metrics is not None:
+        if hit:
+            metrics.cache_hits += 1
+        else:
+            metrics.cache_misses += 1
+
+
+_literals = re.compile(r"'(?:[^']|'')*'|\b\d+(?:\.\d+)?\b")
+_lists = re.compile(r'\((?:\s*(?:%s|\?)\s*,)+\s*(?:%s|\?)\s*\)')
+_spaces = re.compile(r'\s+')
+
+
+def fingerprint(sql):
+    """SQL with literals and IN lists collapsed, for grouping statements."""
+    sql = _literals.sub('?', sql)
+    sql = _lists.sub('(...)', sql)
+    return _spaces.sub(' ', sql).strip()
+
+
+def top_fingerprints(statements, limit=10):
+    return Counter(fingerprint(sql) for sql in statements).most_common(limit)
+
+
+def _labels(view_name):
+    escaped = view_name.replace('\\', '\\\\').replace('"', '\\"')
+    return f'view="{escaped}"'
+
+
+def _histogram_lines(name, labels, histogram):
+    for bound, count in histogram.cumulative():
+        yield f'{name}_bucket{{{labels},le="{bound:.6g}"}} {count}'
+    yield f'{name}_bucket{{{labels},le="+Inf"}} {histogram.count}'
+    yield f'{name}_sum{{{labels}}} {histogram.sum:.6f}'
+    yield f'{name}_count{{{labels}}} {histogram.count}'
+
+
+HISTOGRAMS = (
+    ('http_request_duration_seconds', 'latency', "Request wall time"),
+    ('http_request_db_seconds', 'db_time', "Time spent in database queries"),
+    ('http_request_db_queries', 'queries', "Database queries per request"),
+    ('http_request_serializer_seconds', 'serializer_time', "Time spent rendering the response body"),
+)
+
+COUNTERS = (
+    ('http_request_cache_hits_total', 'cache_hits', "Cache hits"),
+    ('http_request_cache_misses_total', 'cache_misses', "Cache misses"),
+    ('http_request_over_budget_total', 'over_budget', "Requests over the query or latency budget"),
+)
+
+
+def render_prometheus(extra_gauges=()):
+    """Prometheus text exposition format (version 0.0.4) of the registry."""
+    views = registry.items()
+    lines = []
+
+    for name, attribute, help_text in HISTOGRAMS:
+        lines.append(f'# HELP {name} {help_text}')
+        lines.append(f'# TYPE {name} histogram')
+        for view_name, metrics in views:
+            with metrics.lock:
+                lines.extend(_histogram_lines(name, _labels(view_name), getattr(metrics, attribute)))
+
+    for name, attribute, help_text in COUNTERS:
+        lines.append(f'# HELP {name} {help_text}')
+        lines.append(f'# TYPE {name} counter')
+        for view_name, metrics in views:
+            lines.append(f'{name}{{{_labels(view_name)}}} {getattr(metrics, attribute)}')
+
+    for name, value, help_text in extra_gauges:
+        lines.append(f'# HELP {name} {help_text}')
+        lines.append(f'# TYPE {name} gauge')
+        lines.append(f'{name} {value}')
+
+    return '\n'.join(lines) + '\n'
@@ -0,0 +1,133 @@
+import logging
+import time
+
+from asgiref.sync import iscoroutinefunction, markcoroutinefunction, sync_to_async
+from django.conf import settings
+from django.core.cache import cache
+
+from .metrics import RequestMetrics, current_metrics, registry, top_fingerprints
+from .routers import RequestState, current_state, get_setting, pin_key
+
+logger = logging.getLogger('apps.utils.performance')
+
+
+class PerformanceMiddleware:
+    """
+    Record latency, query count/time, cache hits and render time per
+    resolved view, and log requests that go over ``PERFORMANCE_BUDGETS``
+    together with their most frequent SQL fingerprints.
+
+    Queries are counted by the execute wrapper ``apps.utils`` installs on
+    every database connection, so this adds a context variable and a few
+    counters per request.
+    """
+    sync_capable = True
+    async_capable = True
+
+    def __init__(self, get_response):
+        self.get_response = get_response
+        budgets = settings.PERFORMANCE_BUDGETS
+        self.query_budget = budgets['QUERIES']
+        self.latency_budget = budgets['LATENCY_MS'] / 1000
+        if iscoroutinefunction(self.get_response):
+            markcoroutinefunction(self)
+
+    def __call__(self, request):
+        if iscoroutinefunction(self):
+            return self.__acall__(request)
+
+        metrics = RequestMetrics()
+        token = current_metrics.set(metrics)
+        started = time.perf_counter()
+        try:
+            return self.get_response(request)
+        finally:
+            self.finish(request, metrics, time.perf_counter() - started)
+            current_metrics.reset(token)
+
+    async def __acall__(self, request):
+        metrics = RequestMetrics()
+        token = current_metrics.set(metrics)
+        started = time.perf_counter()
+        try:
+            return await self.get_response(request)
+        finally:
+            self.finish(request, metrics, time.perf_counter() - started)
+            current_metrics.reset(token)
+
+    def process_template_response(self, request, response):
+        # DRF responses are rendered right after this hook, the serializer
+        # output turned into the body
+        metrics = current_metrics.get()
+        if metrics is not None:
+            started = time.perf_counter()
+
+            def rendered(response):
+                metrics.serializer_time += time.perf_counter() - started
+
+            response.add_post_render_callback(rendered)
+        return response
+
+    def finish(self, request, metrics, latency):
+        match = getattr(request, 'resolver_match', None)
+        view_name = (match.view_name or match.route) if match else '<unresolved>'
+
+        over_budget = metrics.query_count > self.query_budget or latency > self.latency_budget
+        registry.get(view_name).record(metrics, latency, over_budget)
+
+        if over_budget:
+            logger.warning(
+                "%s %s (%s) took %.1f ms with %d queries (%.1f ms in db): %s",
+                request.method, request.path, view_name, latency * 1000,
+                metrics.query_count, metrics.db_time * 1000,
+                '; '.join(f'{count}x {sql}' for sql, count in top_fingerprints(metrics.statements)),
+            )
+
+
+class ReplicaPinningMiddleware:
+    """
+    Scope ``ReplicaRouter`` decisions to the request, and after a request
+    that wrote, keep its client on the primary for ``PIN_SECONDS`` with a
+    cookie and, for an authenticated user, a cache key.
+    """
+    sync_capable = True
+    async_capable = True
+
+    def __init__(self, get_response):
+        self.get_response = get_response
+        if iscoroutinefunction(self.get_response):
+            markcoroutinefunction(self)
+
+    def __call__(self, request):
+        if iscoroutinefunction(self):
+            return self.__acall__(request)
+
+        state = RequestState(request)
+        token = current_state.set(state)
+        try:
+            response = self.get_response(request)
+        finally:
+            current_state.reset(token)
+        if state.wrote:
+            self.pin(state, response)
+        return response
+
+    async def __acall__(self, request):
+        state = RequestState(request)
+        token = current_state.set(state)
+        try:
+            response = await self.get_response(request)
+        finally:
+            current_state.reset(token)
+        if state.wrote:
+            await sync_to_async(self.pin)(state, response)
+        return response
+
+    def pin(self, state, response):
+        seconds = get_setting('PIN_SECONDS')
+        response.set_cookie(
+            get_setting('COOKIE'), '1', max_age=seconds, httponly=True, samesite='Lax',
+            secure=settings.SESSION_COOKIE_SECURE)
+        user = state.user()
+        if user is not None:
+            cache.set(pin_key(user.pk), 1, seconds)
@@ -0,0 +1,43 @@
+from django.db import models
+from django.db.models import Q
+from django.utils import timezone
+from django.utils.translation import gettext_lazy as _
+
+
+class OutboxJob(models.Model):
+    """
+    Work to do after a request, written in the request's transaction so it
+    exists exactly when the change that caused it was committed. Run by
+    ``manage.py run_jobs``, see ``apps.utils.outbox``.
+    """
+
+    class Status(models.TextChoices):
+        PENDING = 'pending', _('Pending')
+        DONE = 'done', _('Done')
+        FAILED = 'failed', _('Failed')
+
+    kind = models.CharField(max_length=100)
+    payload = models.JSONField(default=dict)
+    status = models.CharField(max_length=20, choices=Status.choices, default=Status.PENDING)
+
+    # due time of a pending job; pushed forward while a worker holds it and
+    # on every failed attempt, so a crashed worker's jobs come back by themselves
+    run_after = models.DateTimeField(default=timezone.now)
+    attempts = models.PositiveSmallIntegerField(default=0)
+    max_attempts = models.PositiveSmallIntegerField(default=5)
+    last_error = models.TextField(blank=True)
+
+    created_at = models.DateTimeField(auto_now_add=True)
+    finished_at = models.DateTimeField(null=True, blank=True)
+
+    class Meta:
+        verbose_name = _('outbox job')
+        verbose_name_plural = _('outbox jobs')
+        indexes = [
+            models.Index(fields=['run_after'], name='outbox_pending_idx',
+                         condition=Q(status='pending')),
+            models.Index(fields=['status', 'finished_at']),
+        ]
+
+    def __str__(self):
+        return f"{self.kind} #{self.pk} ({self.status})"
@@ -0,0 +1,186 @@
+"""
+Transactional outbox and the job runner behind ``manage.py run_jobs``.
+
+``enqueue`` writes an ``OutboxJob`` in the caller's transaction, so a job
+exists exactly when the change that caused it was committed and nothing
+slow (SMTP, SMS gateways) runs inside the request. Workers ``claim`` due
+jobs with ``SELECT ... FOR UPDATE SKIP LOCKED``, so any number can run side
+by side, and push their ``run_after`` one lease ahead while working on
+them; a worker that dies simply lets the lease run out. ``run`` hands the
+jobs to their handlers on a thread pool and records the outcome: done,
+retried after an exponential backoff with jitter, or failed for good after
+``max_attempts``. Delivery is at least once, handlers must tolerate a
+repeat.
+
+Handlers are registered with ``@handler(kind)`` in an app's ``jobs``
+module. A plain handler is called with one payload. A ``batch`` handler is
+called with the payloads of every claimed job of its kind (one SMTP
+connection for a batch of emails) and returns one error or ``None`` per
+payload.
+"""
+import random
+import traceback
+from collections import defaultdict, namedtuple
+from concurrent.futures import ThreadPoolExecutor
+from contextlib import nullcontext
+from datetime import timedelta
+
+from django.conf import settings
+from django.db import connection, transaction
+from django.db.models import F
+from django.utils import timezone
+from django.utils.module_loading import autodiscover_modules
+
+from .models import OutboxJob
+
+DEFAULTS = {
+    'BATCH_SIZE': 100,
+    'CONCURRENCY': 4,
+    # seconds a claimed job is held before another worker may take it
+    'LEASE': 300,
+    'BACKOFF_BASE': 10,
+    'BACKOFF_MAX': 3600,
+    'MAX_ATTEMPTS': 5,
+}
+
+Handler = namedtuple('Handler', ['func', 'batch'])
+
+handlers = {}
+
+
+def get_setting(name):
+    return getattr(settings, 'OUTBOX', {}).get(name, DEFAULTS[name])
+
+
+def handler(kind, batch=False):
+    def register(func):
+        handlers[kind] = Handler(func, batch)
+        return func
+    return register
+
+
+def load_handlers():
+    autodiscover_modules('jobs')
+
+
+def enqueue(kind, payload=None, delay=0, max_attempts=None):
+    """Queue a job, seen by workers once the current transaction commits."""
+    return OutboxJob.objects.create(
+        kind=kind,
+        payload=payload or {},
+        run_after=timezone.now() + timedelta(seconds=delay),
+        max_attempts=max_attempts or get_setting('MAX_ATTEMPTS'),
+    )
+
+
+def enqueue_many(kind, payloads, batch_size=1000):
+    """Queue one job per payload with multi-row inserts, for fan-out."""
+    now = timezone.now()
+    max_attempts = get_setting('MAX_ATTEMPTS')
+    return OutboxJob.objects.bulk_create(
+        (OutboxJob(kind=kind, payload=payload, run_after=now, max_attempts=max_attempts)
+         for payload in payloads),
+        batch_size=batch_size,
+    )
+
+
+def backoff(attempts):
+    """Seconds before retry number ``attempts``, doubling up to a cap, with jitter."""
+    delay = min(get_setting('BACKOFF_BASE') * 2 ** (attempts - 1), get_setting('BACKOFF_MAX'))
+    return delay * random.uniform(0.5, 1)
+
+
+def claim(limit=None, now=None):
+    """Take up to ``limit`` due jobs for this worker, counting the attempt."""
+    now = now or timezone.now()
+    with transaction.atomic():
+        jobs = list(
+            OutboxJob.objects
+            .select_for_update(skip_locked=True)
+            .filter(status=OutboxJob.Status.PENDING, run_after__lte=now)
+            .order_by('run_after')[:limit or get_setting('BATCH_SIZE')]
+        )
+        if jobs:
+            OutboxJob.objects.filter(pk__in=[job.pk for job in jobs]).update(
+                run_after=now + timedelta(seconds=get_setting('LEASE')),
+                attempts=F('attempts') + 1)
+    for job in jobs:
+        job.attempts += 1
+    return jobs
+
+
+def call(entry, jobs, own_connection):
+    """``[(job, error or None)]`` from running ``entry`` on ``jobs``."""
+    try:
+        if entry.batch:
+            errors = entry.func([job.payload for job in jobs])
+        else:
+            entry.func(jobs[0].payload)
+            errors = [None]
+        errors = [None if error is None else str(error) for error in errors]
+    except Exception:
+        errors = [traceback.format_exc()] * len(jobs)
+    finally:
+        if own_connection:
+            # pool threads open their own connections
+            connection.close()
+    return list(zip(jobs, errors))
+
+
+def finish(outcomes, now=None):
+    now = now or timezone.now()
+    done = [job.pk for job, error in outcomes if error is None]
+    OutboxJob.objects.filter(pk__in=done).update(
+        status=OutboxJob.Status.DONE, finished_at=now, last_error='')
+
+    for job, error in outcomes:
+        if error is None:
+            continue
+        if job.attempts >= job.max_attempts:
+            changes = {'status': OutboxJob.Status.FAILED, 'finished_at': now}
+        else:
+            changes = {'run_after': now + timedelta(seconds=backoff(job.attempts))}
+        OutboxJob.objects.filter(pk=job.pk).update(last_error=error[-4000:], **changes)
+    return len(done), len(outcomes) - len(done)
+
+
+def run(jobs, pool=None):
+    """
+    Run claimed ``jobs`` on ``pool`` (inline without one) and record the
+    outcome. Returns ``(succeeded, failed)``.
+    """
+    outcomes = []
+    units = []
+    groups = defaultdict(list)
+    for job in jobs:
+        groups[job.kind].append(job)
+    for kind, group in groups.items():
+        entry = handlers.get(kind)
+        if entry is None:
+            outcomes += [(job, f"no handler registered for {kind!r}") for job in group]
+        elif entry.batch:
+            units.append((entry, group))
+        else:
+            units += [(entry, [job]) for job in group]
+
+    if pool is None:
+        for entry, group in units:
+            outcomes += call(entry, group, own_connection=False)
+    else:
+        futures = [pool.submit(call, entry, group, True) for entry, group in units]
+        for future in futures:
+            outcomes += future.result()
+    return finish(outcomes)
+
+
+def run_pending(limit=None, concurrency=None):
+    """Run due jobs until there are none left. Returns ``(succeeded, failed)``."""
+    load_handlers()
+    concurrency = concurrency or get_setting('CONCURRENCY')
+    succeeded = failed = 0
+    with ThreadPoolExecutor(concurrency) if concurrency > 1 else nullcontext() as pool:
+        while jobs := claim(limit):
+            ok, errors = run(jobs, pool)
+            succeeded += ok
+            failed += errors
+    return succeeded, failed
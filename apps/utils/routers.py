@@ -0,0 +1,158 @@
+"""
+Read replicas with read-your-writes.
+
+``ReplicaRouter`` sends reads made while serving a request to one of the
+``replica_*`` databases (``REPLICA_DATABASE_URLS``) and everything else
+to ``default``. A request reads from the primary when:
+
+- it is not a GET, HEAD or OPTIONS request, or it has written something
+  already, or it is inside a transaction;
+- its client wrote less than ``PIN_SECONDS`` ago. ``ReplicaPinningMiddleware``
+  then sets a short-lived cookie, and for authenticated users a cache key,
+  because API clients often drop cookies;
+- every replica is more than ``MAX_LAG`` seconds behind or cannot be
+  reached. Each process checks a replica at most once every
+  ``CHECK_INTERVAL`` seconds.
+
+Outside requests (management commands, ``run_jobs``) everything goes to
+the primary.
+
+Replicas are never migrated. Locally, two SQLite files stand in for a
+primary and its replica: set ``REPLICA_DATABASE_URLS=sqlite:///...`` and
+copy the primary over with ``sync_replicas``.
+"""
+import os
+import random
+import threading
+import time
+from contextvars import ContextVar
+
+from django.conf import settings
+from django.core.cache import cache
+from django.db import DEFAULT_DB_ALIAS, DatabaseError, connections
+from django.utils.functional import SimpleLazyObject
+
+DEFAULTS = {
+    # seconds a client reads from the primary after writing
+    'PIN_SECONDS': 5,
+    # seconds a replica may be behind and still be read from
+    'MAX_LAG': 2,
+    'CHECK_INTERVAL': 5,
+    'COOKIE': 'primary_pin',
+}
+
+SAFE_METHODS = ('GET', 'HEAD', 'OPTIONS')
+
+
+def get_setting(name):
+    return getattr(settings, 'DATABASE_REPLICAS', {}).get(name, DEFAULTS[name])
+
+
+def replicas():
+    return [alias for alias in settings.DATABASES if alias.startswith('replica_')]
+
+
+def pin_key(user_id):
+    return f'primary-pin:{user_id}'
+
+
+class RequestState:
+    """How the current request reads, set up by ``ReplicaPinningMiddleware``."""
+
+    def __init__(self, request):
+        self.request = request
+        self.wrote = False
+        self.pinned = (request.method not in SAFE_METHODS
+                       or get_setting('COOKIE') in request.COOKIES)
+        # the pin of an authenticated user is looked up once the user is known
+        self.user_checked = False
+
+    def user(self):
+        # only a user that authentication has already loaded (DRF sets the
+        # real one on the request); evaluating the lazy session user here
+        # would read the database from inside the router
+        user = self.request.__dict__.get('user')
+        if user is None or isinstance(user, SimpleLazyObject):
+            return None
+        return user if user.is_authenticated else None
+
+    def is_pinned(self):
+        if not self.pinned and not self.user_checked:
+            user = self.user()
+            if user is not None:
+                self.user_checked = True
+                self.pinned = bool(cache.get(pin_key(user.pk)))
+        return self.pinned
+
+
+current_state = ContextVar('replica_state', default=None)
+
+
+def replica_lag(alias):
+    """Seconds ``alias`` is behind the primary, ``None`` if it cannot tell."""
+    connection = connections[alias]
+    if connection.vendor == 'postgresql':
+        with connection.cursor() as cursor:
+            cursor.execute(
+                "SELECT CASE WHEN pg_last_wal_receive_lsn() = pg_last_wal_replay_lsn() THEN 0 "
+                "ELSE EXTRACT(EPOCH FROM now() - pg_last_xact_replay_timestamp()) END")
+            return cursor.fetchone()[0]
+    if connection.vendor == 'sqlite':
+        # the copy made by sync_replicas misses whatever the primary wrote after it
+        primary = connections[DEFAULT_DB_ALIAS].settings_dict['NAME']
+        return max(0, os.path.getmtime(primary) - os.path.getmtime(connection.settings_dict['NAME']))
+    return None
+
+
+_health = {}
+_health_lock = threading.Lock()
+
+
+def is_healthy(alias):
+    now = time.monotonic()
+    checked = _health.get(alias)
+    if checked is not None and now - checked[0] < get_setting('CHECK_INTERVAL'):
+        return checked[1]
+    with _health_lock:
+        try:
+            lag = replica_lag(alias)
+            healthy = lag is None or lag <= get_setting('MAX_LAG')
+        except (DatabaseError, OSError):
+            healthy = False
+        _health[alias] = (now, healthy)
+    return healthy
+
+
+def read_database():
+    """The database the current read should go to."""
+    state = current_state.get()
+    if state is None or state.is_pinned() or connections[DEFAULT_DB_ALIAS].in_atomic_block:
+        return DEFAULT_DB_ALIAS
+    healthy = [alias for alias in replicas() if is_healthy(alias)]
+    return random.choice(healthy) if healthy else DEFAULT_DB_ALIAS
+
+
+class ReplicaRouter:
+
+    def db_for_read(self, model, **hints):
+        return read_database()
+
+    def db_for_write(self, model, **hints):
+        state = current_state.get()
+        if state is not None:
+            # read your own writes, for the rest of the request and, through
+            # the middleware, for the next PIN_SECONDS
+            state.wrote = state.pinned = True
+        return DEFAULT_DB_ALIAS
+
+    def allow_relation(self, obj1, obj2, **hints):
+        # replicas hold the primary's rows
+        databases = {DEFAULT_DB_ALIAS, *replicas()}
+        if obj1._state.db in databases and obj2._state.db in databases:
+            return True
+        return None
+
+    def allow_migrate(self, db, app_label, **hints):
+        if db in replicas():
+            return False
+        return None
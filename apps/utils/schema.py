@@ -0,0 +1,139 @@
+"""
+The OpenAPI schema, generated once instead of on every docs request.
+
+drf_yasg builds the schema by introspecting every view and serializer,
+which gets slower with each app. ``generate_openapi_schema`` runs at
+deploy, after ``collectstatic``, and writes the schema to
+``OPENAPI_SCHEMA_DIR`` (``STATIC_ROOT/openapi`` by default) as
+``openapi-<hash>.json`` and ``.yaml``, each with a gzipped copy.
+WhiteNoise serves those files with an ETag.
+
+``<hash>`` is ``urlconf_hash()``, taken over every URL pattern and the
+view behind it. ``schema`` redirects to the file generated for the
+running URLconf. Without one, for example in development or after a
+deploy that skipped the command, it generates the schema on the first
+request and keeps it in memory for the life of the process. Serializer
+changes that leave the URLs alone do not change the hash, so the command
+has to run on every deploy.
+
+The swagger and redoc pages are cheap HTML; they load the schema from
+``schema`` (``SPEC_URL``).
+"""
+import hashlib
+import threading
+from functools import lru_cache
+from pathlib import Path
+
+from django.conf import settings
+from django.http import HttpResponse, HttpResponseRedirect
+from django.urls import URLResolver, get_resolver
+from django.utils.cache import get_conditional_response
+from drf_yasg import openapi
+from drf_yasg.codecs import OpenAPICodecJson, OpenAPICodecYaml
+from drf_yasg.views import UI_RENDERERS, get_schema_view
+from rest_framework import permissions
+from rest_framework.test import APIRequestFactory
+from rest_framework.views import APIView
+
+INFO = openapi.Info(
+    title="E-commerce Nepal API",
+    default_version='v1',
+    description="API documentation for E-commerce Nepal",
+    terms_of_service="https://www.ecommercenepal.com/terms/",
+    contact=openapi.Contact(email="support@ecommercenepal.com"),
+    license=openapi.License(name="BSD License"),
+)
+
+schema_view = get_schema_view(
+    INFO,
+    public=True,
+    permission_classes=(permissions.AllowAny,),
+)
+
+FORMATS = {
+    'json': (OpenAPICodecJson, 'application/json'),
+    'yaml': (OpenAPICodecYaml, 'application/yaml'),
+}
+
+
+def schema_directory():
+    return Path(getattr(settings, 'OPENAPI_SCHEMA_DIR', Path(settings.STATIC_ROOT) / 'openapi'))
+
+
+def walk(patterns, prefix=''):
+    """``(route, view)`` for every pattern of the URLconf."""
+    for pattern in patterns:
+        route = prefix + str(pattern.pattern)
+        if isinstance(pattern, URLResolver):
+            yield from walk(pattern.url_patterns, route)
+        else:
+            yield route, pattern.lookup_str
+
+
+@lru_cache(maxsize=None)
+def urlconf_hash():
+    digest = hashlib.sha256()
+    for route, view in walk(get_resolver().url_patterns):
+        digest.update(f'{route} {view}\n'.encode())
+    return digest.hexdigest()[:16]
+
+
+def schema_name(fmt, urlconf=None):
+    return f'openapi-{urlconf or urlconf_hash()}.{fmt}'
+
+
+def generate(fmt):
+    """The schema as bytes in ``fmt``."""
+    codec_class, _ = FORMATS[fmt]
+    # an anonymous request for the views whose get_queryset reads the user;
+    # no URL leaves the host out, so clients use the one serving the docs
+    request = APIView().initialize_request(APIRequestFactory().get(f'/api/schema.{fmt}'))
+    generator = schema_view.generator_class(INFO, url='')
+    return codec_class(validators=[]).encode(generator.get_schema(request, public=True))
+
+
+@lru_cache(maxsize=None)
+def static_url(fmt):
+    """URL of the generated file for the running URLconf, ``None`` if there is none."""
+    name = schema_name(fmt)
+    # WhiteNoise only knows the files that were there when the process started
+    if not (schema_directory() / name).exists():
+        return None
+    relative = schema_directory().relative_to(settings.STATIC_ROOT).as_posix()
+    return f'{settings.STATIC_URL}{relative}/{name}'
+
+
+_schemas = {}
+_schemas_lock = threading.Lock()
+
+
+def cached_schema(fmt):
+    """``(body, etag)`` of ``fmt``, generated once per process and URLconf."""
+    key = (urlconf_hash(), fmt)
+    if key not in _schemas:
+        with _schemas_lock:
+            if key not in _schemas:
+                body = generate(fmt)
+                _schemas[key] = body, f'"{hashlib.sha256(body).hexdigest()[:32]}"'
+    return _schemas[key]
+
+
+def schema(request, fmt):
+    try:
+        url = static_url(fmt)
+    except ValueError:
+        # OPENAPI_SCHEMA_DIR outside STATIC_ROOT: WhiteNoise does not serve it
+        url = None
+    if url is not None:
+        return HttpResponseRedirect(url)
+    body, etag = cached_schema(fmt)
+    response = get_conditional_response(request, etag=etag)
+    if response is None:
+        response = HttpResponse(body, content_type=FORMATS[fmt][1])
+    response['ETag'] = etag
+    return response
+
+
+def docs_view(renderer):
+    """The swagger or redoc page alone; ``SPEC_URL`` points it at ``schema``."""
+    return schema_view.as_cached_view(renderer_classes=UI_RENDERERS[renderer])
@@ -0,0 +1,44 @@
+"""
+Text messages, sent from the outbox (``apps.utils.jobs``).
+
+``SMS_BACKEND`` names the class that delivers them, in the spirit of
+Django's email backends: ``ConsoleBackend`` prints them, ``LocmemBackend``
+keeps them in ``outbox`` for tests, and a gateway integration implements
+``send_messages``.
+"""
+import sys
+import threading
+
+from django.conf import settings
+from django.utils.module_loading import import_string
+
+outbox = []
+
+
+class BaseBackend:
+
+    def send_messages(self, messages):
+        """Send ``[(phone_number, text)]``, returning one error or ``None`` each."""
+        raise NotImplementedError
+
+
+class ConsoleBackend(BaseBackend):
+    lock = threading.Lock()
+
+    def send_messages(self, messages):
+        with self.lock:
+            for phone_number, text in messages:
+                sys.stdout.write(f"SMS to {phone_number}: {text}\n")
+            sys.stdout.flush()
+        return [None] * len(messages)
+
+
+class LocmemBackend(BaseBackend):
+
+    def send_messages(self, messages):
+        outbox.extend(messages)
+        return [None] * len(messages)
+
+
+def get_backend():
+    return import_string(getattr(settings, 'SMS_BACKEND', 'apps.utils.sms.ConsoleBackend'))()
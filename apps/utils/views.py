@@ -0,0 +1,27 @@
+import hmac
+
+from django.conf import settings
+from django.http import HttpResponse, HttpResponseForbidden
+
+from shared.authentication.blacklist import get_blacklist_filter
+
+from .metrics import render_prometheus
+
+
+def metrics(request):
+    """Prometheus scrape endpoint for this worker process."""
+    token = settings.METRICS_TOKEN
+    if not token and not settings.DEBUG:
+        return HttpResponseForbidden()
+    # bytes, compare_digest refuses non-ASCII str
+    authorization = request.headers.get('Authorization', '').encode()
+    if token and not hmac.compare_digest(authorization, f'Bearer {token}'.encode()):
+        return HttpResponseForbidden()
+
+    blacklist_stats = get_blacklist_filter().stats()
+    gauges = [
+        (f'token_blacklist_filter_{name}', value, f"Token blacklist filter {name.replace('_', ' ')}")
+        for name, value in blacklist_stats.items()
+    ]
+    return HttpResponse(render_prometheus(gauges),
+                        content_type='text/plain; version=0.0.4; charset=utf-8')
@@ -10,6 +10,7 @@ For the full list of settings and their values, see
 https://docs.djangoproject.com/en/4.2/ref/settings/
 """
 
+import importlib.util
 import os
 from pathlib import Path
 from datetime import timedelta
@@ -37,8 +38,8 @@ ALLOWED_HOSTS = env.list('ALLOWED_HOSTS', default=['localhost', '127.0.0.1'])
 
 # Application definition
 INSTALLED_APPS = [
-    # Django built-in apps
-    'django.contrib.admin',
+    # Django built-in apps; the admin modules load on first use
+    'apps.utils.lazy.LazyAdminConfig',
     'django.contrib.auth',
     'django.contrib.contenttypes',
     'django.contrib.sessions',
@@ -50,7 +51,6 @@ INSTALLED_APPS = [
     'rest_framework_simplejwt',
     'rest_framework_simplejwt.token_blacklist',
     'corsheaders',
-    'drf_yasg',
     'django_filters',
 
     # Local apps
@@ -59,11 +59,19 @@ INSTALLED_APPS = [
     'apps.cart',
     'apps.orders',
     'apps.reviews',
+    'apps.geography',
     'apps.utils',
 ]
 
+# drf_yasg is not an installed app: importing it costs every worker ~100 ms
+# at startup, while only the API docs need it. Its templates and static
+# files are found here without importing it.
+_drf_yasg_dir = Path(importlib.util.find_spec('drf_yasg').origin).parent
+
 MIDDLEWARE = [
     'django.middleware.security.SecurityMiddleware',
+    'apps.utils.middleware.PerformanceMiddleware',
+    'apps.utils.middleware.ReplicaPinningMiddleware',
     'corsheaders.middleware.CorsMiddleware',
     'whitenoise.middleware.WhiteNoiseMiddleware',
     'django.contrib.sessions.middleware.SessionMiddleware',
@@ -79,7 +87,7 @@ ROOT_URLCONF = 'config.urls'
 TEMPLATES = [
     {
         'BACKEND': 'django.template.backends.django.DjangoTemplates',
-        'DIRS': [os.path.join(BASE_DIR, 'templates')],
+        'DIRS': [os.path.join(BASE_DIR, 'templates'), _drf_yasg_dir / 'templates'],
         'APP_DIRS': True,
         'OPTIONS': {
             'context_processors': [
@@ -108,6 +116,101 @@ DATABASES = {
 if env('DATABASE_URL', default=None):
     DATABASES['default'] = env.db('DATABASE_URL')
 
+# read replicas as replica_1, replica_2, ... (comma separated URLs); the
+# settings modules that replace DATABASES add them back
+REPLICA_DATABASES = {
+    f'replica_{number}': {**env.db_url_config(url), 'TEST': {'MIRROR': 'default'}}
+    for number, url in enumerate(env.list('REPLICA_DATABASE_URLS', default=[]), 1)
+}
+DATABASES.update(REPLICA_DATABASES)
+
+DATABASE_ROUTERS = ['apps.utils.routers.ReplicaRouter']
+
+# read-your-writes and lag limits, see apps/utils/routers.py for the defaults
+DATABASE_REPLICAS = {
+    'PIN_SECONDS': env.int('REPLICA_PIN_SECONDS', default=5),
+    'MAX_LAG': env.float('REPLICA_MAX_LAG', default=2.0),
+}
+
+# Cache
+# Redis when REDIS_URL is set, otherwise a per-process memory cache so
+# development and tests run without a Redis server
+if env('REDIS_URL', default=None):
+    CACHES = {
+        'default': {
+            'BACKEND': 'django_redis.cache.RedisCache',
+            'LOCATION': env('REDIS_URL'),
+            'OPTIONS': {
+                'CLIENT_CLASS': 'django_redis.client.DefaultClient',
+            },
+        }
+    }
+else:
+    CACHES = {
+        'default': {
+            'BACKEND': 'django.core.cache.backends.locmem.LocMemCache',
+        }
+    }
+
+# seconds a serialized "me"/profile payload stays cached
+USER_CACHE_TIMEOUT = env.int('USER_CACHE_TIMEOUT', default=300)
+
+# requests above either budget are logged with their SQL fingerprints by
+# apps.utils.middleware.PerformanceMiddleware
+PERFORMANCE_BUDGETS = {
+    'QUERIES': env.int('PERFORMANCE_QUERY_BUDGET', default=20),
+    'LATENCY_MS': env.int('PERFORMANCE_LATENCY_BUDGET_MS', default=500),
+}
+
+# bearer token required to scrape /metrics/; when empty the endpoint is
+# open with DEBUG on and closed otherwise
+METRICS_TOKEN = env('METRICS_TOKEN', default='')
+
+# live carts, see apps/cart/storage.py; written to the database once idle.
+# Without Redis they go straight to the database: the memory store is per
+# process and only fit for tests
+CART_STORE = {
+    'BACKEND': env('CART_STORE_BACKEND',
+                   default='redis' if env('REDIS_URL', default=None) else 'database'),
+    'TTL': env.int('CART_STORE_TTL', default=7 * 24 * 3600),
+    'WRITE_BEHIND_IDLE': env.int('CART_WRITE_BEHIND_IDLE', default=300),
+}
+
+# background jobs, see apps/utils/outbox.py for the defaults; run with
+# manage.py run_jobs
+OUTBOX = {
+    'BATCH_SIZE': env.int('OUTBOX_BATCH_SIZE', default=100),
+    'CONCURRENCY': env.int('OUTBOX_CONCURRENCY', default=4),
+    'MAX_ATTEMPTS': env.int('OUTBOX_MAX_ATTEMPTS', default=5),
+}
+
+# delivers text messages queued with apps.utils.jobs.queue_sms
+SMS_BACKEND = env('SMS_BACKEND', default='apps.utils.sms.ConsoleBackend')
+
+# link in password reset emails, filled in with uidb64 and token
+PASSWORD_RESET_URL = env(
+    'PASSWORD_RESET_URL', default='http://localhost:3000/reset-password/{uidb64}/{token}/')
+
+# seconds stock stays reserved for a pending order
+ORDER_RESERVATION_TTL = env.int('ORDER_RESERVATION_TTL', default=900)
+
+# seller sales rollups, see apps/orders/rollups.py for the defaults
+ORDER_ROLLUPS = {
+    'BATCH_SIZE': env.int('ORDER_ROLLUPS_BATCH_SIZE', default=5000),
+    'SETTLE': env.int('ORDER_ROLLUPS_SETTLE', default=60),
+}
+
+# where archive_orders --to jsonl writes orders-YYYY-MM.jsonl.gz files
+ORDER_ARCHIVE_DIR = env('ORDER_ARCHIVE_DIR', default=str(BASE_DIR / 'archive' / 'orders'))
+
+# product search ranking, see apps/products/search.py for the defaults
+PRODUCT_SEARCH = {
+    'MAX_CANDIDATES': env.int('PRODUCT_SEARCH_MAX_CANDIDATES', default=1000),
+    'NAME_WEIGHT': 3.0,
+    'BODY_WEIGHT': 1.0,
+    'PHONETIC_WEIGHT': 0.5,
+}
+
 # Password validation
 # https://docs.djangoproject.com/en/4.2/ref/settings/#auth-password-validators
 
@@ -126,6 +229,22 @@ AUTH_PASSWORD_VALIDATORS = [
     },
 ]
 
+# scrypt for new hashes, PBKDF2 kept so existing hashes still verify and
+# are upgraded on the next successful login
+PASSWORD_HASHERS = [
+    'apps.users.hashing.ScryptPasswordHasher',
+    'django.contrib.auth.hashers.PBKDF2PasswordHasher',
+    'django.contrib.auth.hashers.PBKDF2SHA1PasswordHasher',
+]
+
+PASSWORD_SCRYPT_WORK_FACTOR = env.int('PASSWORD_SCRYPT_WORK_FACTOR', default=2**14)
+
+# hashing pool per worker process: threads, extra queued hashes, and the
+# seconds a request waits for a slot before getting a 503
+PASSWORD_HASHING_WORKERS = env.int('PASSWORD_HASHING_WORKERS', default=2)
+PASSWORD_HASHING_MAX_PENDING = env.int('PASSWORD_HASHING_MAX_PENDING', default=8)
+PASSWORD_HASHING_TIMEOUT = env.float('PASSWORD_HASHING_TIMEOUT', default=2.0)
+
 # Internationalization
 # https://docs.djangoproject.com/en/4.2/topics/i18n/
 
@@ -142,11 +261,29 @@ USE_TZ = True
 
 STATIC_URL = 'static/'
 STATIC_ROOT = os.path.join(BASE_DIR, 'staticfiles')
-STATICFILES_DIRS = [os.path.join(BASE_DIR, 'static')]
+STATICFILES_DIRS = [os.path.join(BASE_DIR, 'static'), _drf_yasg_dir / 'static']
 
 MEDIA_URL = '/media/'
 MEDIA_ROOT = os.path.join(BASE_DIR, 'media')
 
+# uploads on the local disk, or with MEDIA_STORAGE=s3 in a bucket on S3 or
+# on an S3-compatible server (MinIO, LocalStack) at AWS_S3_ENDPOINT_URL
+if env('MEDIA_STORAGE', default='local') == 's3':
+    DEFAULT_FILE_STORAGE = 'storages.backends.s3.S3Storage'
+    AWS_STORAGE_BUCKET_NAME = env('AWS_STORAGE_BUCKET_NAME')
+    AWS_S3_ENDPOINT_URL = env('AWS_S3_ENDPOINT_URL', default=None)
+    AWS_S3_CUSTOM_DOMAIN = env('AWS_S3_CUSTOM_DOMAIN', default=None)
+    AWS_QUERYSTRING_AUTH = False
+    # uploads and renditions are named by their content hash
+    AWS_S3_FILE_OVERWRITE = True
+    AWS_S3_OBJECT_PARAMETERS = {'CacheControl': 'public, max-age=31536000, immutable'}
+
+# avatar renditions, see apps/utils/images.py for the defaults
+IMAGES = {
+    'SIZES': env.list('IMAGE_SIZES', cast=int, default=[64, 128, 256, 512]),
+    'QUALITY': env.int('IMAGE_QUALITY', default=80),
+}
+
 # Default primary key field type
 # https://docs.djangoproject.com/en/4.2/ref/settings/#default-auto-field
 
@@ -158,29 +295,56 @@ AUTH_USER_MODEL = 'users.User'
 # REST Framework Configuration
 REST_FRAMEWORK = {
     'DEFAULT_AUTHENTICATION_CLASSES': (
-        'rest_framework_simplejwt.authentication.JWTAuthentication',
+        'shared.authentication.authentication.ClaimsJWTAuthentication',
         'rest_framework.authentication.SessionAuthentication',
     ),
     'DEFAULT_PERMISSION_CLASSES': (
         'rest_framework.permissions.IsAuthenticatedOrReadOnly',
     ),
+    'DEFAULT_RENDERER_CLASSES': (
+        'shared.renderers.renderers.ORJSONRenderer',
+        'rest_framework.renderers.BrowsableAPIRenderer',
+    ),
+    'DEFAULT_PARSER_CLASSES': (
+        'shared.parsers.parsers.ORJSONParser',
+        'rest_framework.parsers.FormParser',
+        'rest_framework.parsers.MultiPartParser',
+    ),
     'DEFAULT_FILTER_BACKENDS': (
         'django_filters.rest_framework.DjangoFilterBackend',
         'rest_framework.filters.SearchFilter',
         'rest_framework.filters.OrderingFilter',
     ),
-    'DEFAULT_PAGINATION_CLASS': 'rest_framework.pagination.PageNumberPagination',
+    'DEFAULT_PAGINATION_CLASS': (
+        'shared.pagination.pagination.KeysetPagination'
+        if env.bool('USE_KEYSET_PAGINATION', default=False)
+        else 'rest_framework.pagination.PageNumberPagination'
+    ),
     'PAGE_SIZE': 20,
     'DEFAULT_THROTTLE_CLASSES': [
-        'rest_framework.throttling.AnonRateThrottle',
-        'rest_framework.throttling.UserRateThrottle',
+        'shared.throttling.throttling.SlidingWindowAnonRateThrottle',
+        'shared.throttling.throttling.SlidingWindowUserRateThrottle',
+        'shared.throttling.throttling.SlidingWindowScopedRateThrottle',
     ],
     'DEFAULT_THROTTLE_RATES': {
         'anon': '100/day',
         'user': '1000/day',
+        # per endpoint, throttle_scope of the views in apps/users/views.py and
+        # async_views.py
+        'login': '10/min',
+        'register': '5/hour',
+        'password-reset': '5/hour',
     },
 }
 
+# report the planner's row estimate as "count" on keyset paginated lists
+KEYSET_PAGINATION_APPROXIMATE_COUNT = env.bool(
+    'KEYSET_PAGINATION_APPROXIMATE_COUNT', default=False)
+
+# serve register/login/logout/me/profile with the async views in
+# apps/users/async_views.py, for ASGI deployments
+USERS_ASYNC_VIEWS = env.bool('USERS_ASYNC_VIEWS', default=False)
+
 # JWT Configuration
 SIMPLE_JWT = {
     'ACCESS_TOKEN_LIFETIME': timedelta(minutes=60),
@@ -198,6 +362,21 @@ SIMPLE_JWT = {
     'USER_ID_CLAIM': 'user_id',
 
     'AUTH_TOKEN_CLASSES': ('rest_framework_simplejwt.tokens.AccessToken',),
+    # build request.user from token claims instead of loading the user row
+    'TOKEN_USER_CLASS': 'shared.authentication.authentication.ClaimsUser',
+    'TOKEN_REFRESH_SERIALIZER': 'shared.authentication.tokens.ClaimsTokenRefreshSerializer',
+}
+
+# bloom filter answering "not blacklisted" without querying the blacklist
+# tables, see shared/authentication/blacklist.py
+TOKEN_BLACKLIST_FILTER = {
+    'BACKEND': env('TOKEN_BLACKLIST_FILTER_BACKEND',
+                   default='redis' if env('REDIS_URL', default=None) else 'local'),
+    'CAPACITY': env.int('TOKEN_BLACKLIST_FILTER_CAPACITY', default=1_000_000),
+    'ERROR_RATE': env.float('TOKEN_BLACKLIST_FILTER_ERROR_RATE', default=0.001),
+    'SYNC_INTERVAL': env.int('TOKEN_BLACKLIST_FILTER_SYNC_INTERVAL', default=5),
+    # seconds a blacklist row may take to commit and still be synced
+    'RESCAN_WINDOW': env.int('TOKEN_BLACKLIST_FILTER_RESCAN_WINDOW', default=300),
 }
 
 # CORS Configuration
@@ -224,4 +403,12 @@ SWAGGER_SETTINGS = {
         }
     },
     'USE_SESSION_AUTH': False,
+    # generated by generate_openapi_schema, see apps/utils/schema.py
+    'SPEC_URL': 'schema-json',
 }
+
+REDOC_SETTINGS = {
+    'SPEC_URL': 'schema-json',
+}
+
+OPENAPI_SCHEMA_DIR = env('OPENAPI_SCHEMA_DIR', default=os.path.join(STATIC_ROOT, 'openapi'))
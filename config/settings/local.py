@@ -13,17 +13,18 @@ DATABASES = {
         'NAME': BASE_DIR / 'db.sqlite3',
     }
 }
+DATABASES.update(REPLICA_DATABASES)
 
 # Additional installed apps for development
 INSTALLED_APPS += [
     'django_extensions',
-    'debug_toolbar',
 ]
 
-# Additional middleware for development
-MIDDLEWARE += [
-    'debug_toolbar.middleware.DebugToolbarMiddleware',
-]
+# DEBUG_TOOLBAR=true to load the toolbar; it renders on every HTML
+# response and slows worker startup
+if env.bool('DEBUG_TOOLBAR', default=False):
+    INSTALLED_APPS += ['debug_toolbar']
+    MIDDLEWARE += ['debug_toolbar.middleware.DebugToolbarMiddleware']
 
 # Debug toolbar settings
 INTERNAL_IPS = [
@@ -20,6 +20,15 @@ DATABASES = {
         conn_health_checks=True,
     )
 }
+DATABASES.update(REPLICA_DATABASES)
+
+# required: without it base.py falls back to a per-process cache, and a
+# me/profile payload dropped by one worker (apps/users/cache.py) would be
+# served stale by the others for up to USER_CACHE_TIMEOUT
+REDIS_URL = env('REDIS_URL')
+
+# required: /metrics/ exposes per-view timings and SQL fingerprints
+METRICS_TOKEN = env('METRICS_TOKEN')
 
 # Static files with WhiteNoise
 STATICFILES_STORAGE = 'whitenoise.storage.CompressedManifestStaticFilesStorage'
@@ -67,5 +76,10 @@ LOGGING = {
             'level': 'INFO',
             'propagate': True,
         },
+        'apps': {
+            'handlers': ['file', 'console'],
+            'level': 'WARNING',
+            'propagate': False,
+        },
     },
 }
@@ -1,41 +1,34 @@
-from django.contrib import admin
 from django.urls import path, include
 from django.conf import settings
 from django.conf.urls.static import static
-from rest_framework import permissions
-from drf_yasg.views import get_schema_view
-from drf_yasg import openapi
+from apps.utils.lazy import LazyURLconf, lazy_view
+from apps.utils.views import metrics
 
-# Swagger/OpenAPI Schema
-schema_view = get_schema_view(
-    openapi.Info(
-        title="E-commerce Nepal API",
-        default_version='v1',
-        description="API documentation for E-commerce Nepal",
-        terms_of_service="https://www.ecommercenepal.com/terms/",
-        contact=openapi.Contact(email="support@ecommercenepal.com"),
-        license=openapi.License(name="BSD License"),
-    ),
-    public=True,
-    permission_classes=(permissions.AllowAny,),
-)
+# loaded on first use, see apps/utils/lazy.py
+admin_urls = LazyURLconf('apps.utils.lazy.admin_urlpatterns')
 
 urlpatterns = [
     # Admin
-    path('admin/', admin.site.urls),
+    path('admin/', (admin_urls, 'admin', 'admin')),
 
-    # API Documentation
-    path('api/docs/', schema_view.with_ui('swagger',
-         cache_timeout=0), name='schema-swagger-ui'),
-    path('api/redoc/', schema_view.with_ui('redoc',
-         cache_timeout=0), name='schema-redoc'),
+    # API Documentation, the schema is generated by generate_openapi_schema
+    path('api/docs/', lazy_view('apps.utils.schema.docs_view', 'swagger'),
+         name='schema-swagger-ui'),
+    path('api/redoc/', lazy_view('apps.utils.schema.docs_view', 'redoc'), name='schema-redoc'),
+    path('api/schema.json', lazy_view('apps.utils.schema.schema'), {'fmt': 'json'},
+         name='schema-json'),
+    path('api/schema.yaml', lazy_view('apps.utils.schema.schema'), {'fmt': 'yaml'},
+         name='schema-yaml'),
+
+    # Prometheus metrics of this worker process
+    path('metrics/', metrics, name='metrics'),
 
     # API URLs (will be added as we create apps)
     path('api/v1/auth/', include('apps.users.urls')),
-    # path('api/v1/products/', include('apps.products.urls')),
-    # path('api/v1/cart/', include('apps.cart.urls')),
-    # path('api/v1/orders/', include('apps.orders.urls')),
-    # path('api/v1/reviews/', include('apps.reviews.urls')),
+    path('api/v1/products/', include('apps.products.urls')),
+    path('api/v1/cart/', include('apps.cart.urls')),
+    path('api/v1/orders/', include('apps.orders.urls')),
+    path('api/v1/reviews/', include('apps.reviews.urls')),
 ]
 
 # Serve media files in development
@@ -45,8 +38,8 @@ if settings.DEBUG:
     urlpatterns += static(settings.STATIC_URL,
                           document_root=settings.STATIC_ROOT)
 
-    # Debug toolbar
-    import debug_toolbar
+# Debug toolbar, local settings only
+if 'debug_toolbar' in settings.INSTALLED_APPS:
     urlpatterns += [
-        path('__debug__/', include(debug_toolbar.urls)),
+        path('__debug__/', include('debug_toolbar.urls')),
     ]
@@ -0,0 +1,146 @@
+from django.contrib.auth import get_user_model
+from django.db import models
+from django.utils.functional import cached_property
+from django.utils.translation import gettext_lazy as _
+from rest_framework_simplejwt.authentication import JWTStatelessUserAuthentication
+from rest_framework_simplejwt.exceptions import AuthenticationFailed
+from rest_framework_simplejwt.models import TokenUser
+from rest_framework_simplejwt.settings import api_settings
+
+
+class ClaimsUser(TokenUser):
+    """
+    User built from the signed claims of an access token.
+
+    Claim attributes (id, role, is_staff, is_active, verification flags) are
+    answered without touching the database. Anything else - email, profile,
+    save(), permissions - loads the real user row once and delegates to it.
+    Tokens issued before the claims existed fall back to the row as well.
+    """
+
+    def __str__(self):
+        return f"ClaimsUser {self.id}"
+
+    @cached_property
+    def instance(self):
+        return get_user_model().objects.get(pk=self.id)
+
+    def _claim(self, name):
+        if name in self.token:
+            return self.token[name]
+        return getattr(self.instance, name)
+
+    @cached_property
+    def role(self):
+        return self._claim('role')
+
+    @cached_property
+    def is_staff(self):
+        return self._claim('is_staff')
+
+    @cached_property
+    def is_superuser(self):
+        return self._claim('is_superuser')
+
+    @cached_property
+    def is_active(self):
+        return self._claim('is_active')
+
+    @cached_property
+    def is_email_verified(self):
+        return self._claim('is_email_verified')
+
+    @cached_property
+    def is_phone_verified(self):
+        return self._claim('is_phone_verified')
+
+    @property
+    def is_customer(self):
+        return self.role == get_user_model().Role.CUSTOMER
+
+    @property
+    def is_seller(self):
+        return self.role == get_user_model().Role.SELLER
+
+    @property
+    def is_admin(self):
+        return self.role == get_user_model().Role.ADMIN
+
+    def __eq__(self, other):
+        if isinstance(other, (TokenUser, models.Model)):
+            return str(self.pk) == str(other.pk)
+        return NotImplemented
+
+    def __hash__(self):
+        return hash(str(self.id))
+
+    # everything below needs the database row
+
+    def save(self, *args, **kwargs):
+        return self.instance.save(*args, **kwargs)
+
+    def delete(self, *args, **kwargs):
+        return self.instance.delete(*args, **kwargs)
+
+    def set_password(self, raw_password):
+        return self.instance.set_password(raw_password)
+
+    def check_password(self, raw_password):
+        return self.instance.check_password(raw_password)
+
+    @property
+    def groups(self):
+        return self.instance.groups
+
+    @property
+    def user_permissions(self):
+        return self.instance.user_permissions
+
+    def get_group_permissions(self, obj=None):
+        return self.instance.get_group_permissions(obj)
+
+    def get_all_permissions(self, obj=None):
+        return self.instance.get_all_permissions(obj)
+
+    def has_perm(self, perm, obj=None):
+        return self.instance.has_perm(perm, obj)
+
+    def has_perms(self, perm_list, obj=None):
+        return self.instance.has_perms(perm_list, obj)
+
+    def has_module_perms(self, module):
+        return self.instance.has_module_perms(module)
+
+    def get_username(self):
+        return self.instance.get_username()
+
+    def __getattr__(self, attr):
+        if attr.startswith('_') or attr in ('token', 'instance'):
+            raise AttributeError(attr)
+        if attr in self.token:
+            return self.token[attr]
+        return getattr(self.instance, attr)
+
+
+class ClaimsJWTAuthentication(JWTStatelessUserAuthentication):
+    """
+    JWT authentication that does not fetch the user row per request.
+
+    ``request.user`` is a ``ClaimsUser`` built from the token claims issued by
+    ``ClaimsRefreshToken``.
+    """
+
+    def get_user(self, validated_token):
+        user = super().get_user(validated_token)
+
+        if api_settings.CHECK_USER_IS_ACTIVE and not user.is_active:
+            raise AuthenticationFailed(_("User is inactive"), code="user_inactive")
+
+        return user
+
+
+def get_user_instance(user):
+    """Return the ``User`` model instance behind ``request.user``."""
+    if isinstance(user, ClaimsUser):
+        return user.instance
+    return user
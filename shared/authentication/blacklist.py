@@ -0,0 +1,260 @@
+"""
+Bloom filter in front of simplejwt's token blacklist tables.
+
+A JTI the filter has never seen cannot be blacklisted, so the common case
+(a valid refresh token) is answered without a query. Filter hits are
+confirmed against ``BlacklistedToken`` and counted, which gives the
+observed false-positive rate.
+
+The bits live either in process memory (``local``) or in a Redis bitmap
+shared by all workers (``redis``). Both are fed by ``ClaimsRefreshToken
+.blacklist()`` and by a periodic sync of rows newer than the last seen
+``BlacklistedToken.id``. In ``local`` mode a token blacklisted by another
+process is therefore only caught after ``SYNC_INTERVAL`` seconds.
+
+Ids are handed out before the rows commit, so a row can turn up below the
+watermark after a sync went past it. Each sync reads again every row
+blacklisted in the last ``RESCAN_WINDOW`` seconds, starting past the
+highest id blacklisted before that.
+
+A Redis bitmap that was evicted answers every lookup as a possible hit,
+confirmed against the tables, until one process has loaded a new one.
+"""
+import hashlib
+import math
+import threading
+import time
+import uuid
+from datetime import timedelta
+
+from django.conf import settings
+from django.utils import timezone
+
+
+class LocalBits:
+    lost = False
+
+    def __init__(self, size):
+        self.size = size
+        self.bits = bytearray((size + 7) // 8)
+        self.watermark = 0
+
+    def get(self, positions):
+        return all(self.bits[p >> 3] & (1 << (p & 7)) for p in positions)
+
+    def set(self, positions):
+        for p in positions:
+            self.bits[p >> 3] |= 1 << (p & 7)
+
+    def get_watermark(self):
+        return self.watermark
+
+    def set_watermark(self, value):
+        self.watermark = value
+
+    def count(self):
+        return int.from_bytes(self.bits, 'little').bit_count()
+
+    def new_empty(self):
+        return LocalBits(self.size)
+
+    def replace(self, other):
+        self.bits = other.bits
+        self.watermark = other.watermark
+
+
+class RedisBits:
+
+    def __init__(self, size, key='token-blacklist-filter'):
+        from django_redis import get_redis_connection
+
+        self.size = size
+        self.redis = get_redis_connection('default')
+        self.key = key
+        self.watermark_key = f'{key}:watermark'
+        # the bitmap was missing at the last lookup
+        self.lost = False
+
+    def get(self, positions):
+        pipeline = self.redis.pipeline(transaction=False)
+        pipeline.exists(self.key)
+        for p in positions:
+            pipeline.getbit(self.key, p)
+        exists, *bits = pipeline.execute()
+        # evicted or never built: a possible hit until BlacklistFilter.sync
+        # has loaded a new bitmap, recreating the key here would answer
+        # "not blacklisted" for everything
+        self.lost = not exists
+        return not exists or all(bits)
+
+    def set(self, positions):
+        pipeline = self.redis.pipeline(transaction=False)
+        for p in positions:
+            pipeline.setbit(self.key, p, 1)
+        pipeline.execute()
+
+    def get_watermark(self):
+        return int(self.redis.get(self.watermark_key) or 0)
+
+    def set_watermark(self, value):
+        pipeline = self.redis.pipeline(transaction=False)
+        # bit ``size`` is never a hash position, it keeps the key alive
+        # even when nothing is blacklisted so EXISTS stays meaningful
+        pipeline.setbit(self.key, self.size, 1)
+        pipeline.set(self.watermark_key, value)
+        pipeline.execute()
+
+    def count(self):
+        return max(self.redis.bitcount(self.key) - 1, 0)
+
+    def new_empty(self, timeout=3600):
+        # a key of its own, the command may rebuild while a worker does
+        bits = RedisBits(self.size, key=f'{self.key}:rebuild:{uuid.uuid4().hex}')
+        bits.set_watermark(0)
+        # left to expire if this process dies before replace()
+        pipeline = self.redis.pipeline(transaction=False)
+        pipeline.expire(bits.key, timeout)
+        pipeline.expire(bits.watermark_key, timeout)
+        pipeline.execute()
+        return bits
+
+    def replace(self, other):
+        pipeline = self.redis.pipeline()
+        pipeline.rename(other.key, self.key)
+        pipeline.rename(other.watermark_key, self.watermark_key)
+        pipeline.persist(self.key)
+        pipeline.persist(self.watermark_key)
+        pipeline.delete(f'{self.key}:rebuilding')
+        pipeline.execute()
+        self.lost = False
+
+    def claim_rebuild(self, timeout=300):
+        """Whether this process loads the lost bitmap; one process at a time does."""
+        return bool(self.redis.set(f'{self.key}:rebuilding', 1, nx=True, ex=timeout))
+
+
+class BlacklistFilter:
+
+    def __init__(self, bits, hash_count, sync_interval, rescan_window):
+        self.bits = bits
+        self.hash_count = hash_count
+        self.sync_interval = sync_interval
+        self.rescan_window = rescan_window
+        self.last_sync = None
+        # highest id blacklisted before the rescan window, as of the last load
+        self.settled = None
+        self.lock = threading.Lock()
+        self.counters = {'checks': 0, 'negatives': 0, 'hits': 0, 'false_positives': 0}
+
+    @classmethod
+    def from_settings(cls):
+        config = settings.TOKEN_BLACKLIST_FILTER
+        capacity, error_rate = config['CAPACITY'], config['ERROR_RATE']
+        size = math.ceil(-capacity * math.log(error_rate) / math.log(2) ** 2)
+        hash_count = max(1, round(size / capacity * math.log(2)))
+        bits = RedisBits(size) if config['BACKEND'] == 'redis' else LocalBits(size)
+        return cls(bits, hash_count, config['SYNC_INTERVAL'], config['RESCAN_WINDOW'])
+
+    def positions(self, jti):
+        digest = hashlib.blake2b(jti.encode(), digest_size=16).digest()
+        h1 = int.from_bytes(digest[:8], 'little')
+        h2 = int.from_bytes(digest[8:], 'little') | 1
+        return [(h1 + i * h2) % self.bits.size for i in range(self.hash_count)]
+
+    def add(self, jti):
+        self.bits.set(self.positions(jti))
+
+    def might_contain(self, jti):
+        self.sync()
+        found = self.bits.get(self.positions(jti))
+        self.counters['checks'] += 1
+        if not found:
+            self.counters['negatives'] += 1
+        return found
+
+    def record_hit(self, blacklisted):
+        self.counters['hits' if blacklisted else 'false_positives'] += 1
+
+    def sync(self, force=False):
+        """Add blacklist rows created since the last sync, or reload lost bits."""
+        now = time.monotonic()
+        if not force and self.last_sync is not None and now - self.last_sync < self.sync_interval:
+            return
+        # only the very first sync makes other threads wait for it
+        if not self.lock.acquire(blocking=self.last_sync is None or force):
+            return
+        try:
+            if self.bits.lost:
+                if self.bits.claim_rebuild():
+                    self.reload()
+            else:
+                self.settled = self.load(self.bits, self.settled)
+            self.last_sync = now
+        finally:
+            self.lock.release()
+
+    def rebuild(self):
+        """Rebuild the bits from the tables, forgetting compacted JTIs."""
+        with self.lock:
+            self.reload()
+
+    def reload(self):
+        fresh = self.bits.new_empty()
+        self.settled = self.load(fresh)
+        self.bits.replace(fresh)
+
+    def load(self, bits, since=None):
+        """
+        Set the bits of the rows past the watermark of ``bits``, or past
+        ``since`` when that is lower. Returns the highest id read that was
+        blacklisted before the rescan window, ``since`` if there is none.
+        """
+        from rest_framework_simplejwt.token_blacklist.models import BlacklistedToken
+
+        watermark = bits.get_watermark()
+        since = watermark if since is None else min(since, watermark)
+        now = timezone.now()
+        cutoff = now - timedelta(seconds=self.rescan_window)
+        rows = (
+            BlacklistedToken.objects
+            .filter(id__gt=since, token__expires_at__gt=now)
+            .order_by('id')
+            .values_list('id', 'token__jti', 'blacklisted_at')
+            .iterator(chunk_size=5000)
+        )
+        settled = since
+        for row_id, jti, blacklisted_at in rows:
+            bits.set(self.positions(jti))
+            watermark = max(watermark, row_id)
+            # ids go up with time: a row still in flight, begun within the
+            # window, has an id above every row blacklisted before it
+            if blacklisted_at < cutoff:
+                settled = row_id
+        bits.set_watermark(watermark)
+        return settled
+
+    def stats(self):
+        checks = self.counters['checks']
+        not_blacklisted = self.counters['negatives'] + self.counters['false_positives']
+        fill_ratio = self.bits.count() / self.bits.size
+        return {
+            **self.counters,
+            'false_positive_rate': (
+                self.counters['false_positives'] / not_blacklisted if not_blacklisted else 0.0),
+            'db_lookup_ratio': (checks - self.counters['negatives']) / checks if checks else 0.0,
+            'fill_ratio': fill_ratio,
+            'expected_false_positive_rate': fill_ratio ** self.hash_count,
+        }
+
+
+_filter = None
+_filter_lock = threading.Lock()
+
+
+def get_blacklist_filter():
+    global _filter
+    if _filter is None:
+        with _filter_lock:
+            if _filter is None:
+                _filter = BlacklistFilter.from_settings()
+    return _filter
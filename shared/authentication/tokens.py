@@ -0,0 +1,93 @@
+from django.contrib.auth import get_user_model
+from rest_framework.exceptions import AuthenticationFailed
+from rest_framework_simplejwt.exceptions import TokenError
+from rest_framework_simplejwt.serializers import TokenRefreshSerializer
+from rest_framework_simplejwt.settings import api_settings
+from rest_framework_simplejwt.tokens import RefreshToken
+
+from .blacklist import get_blacklist_filter
+
+# user attributes copied into every token so that requests can be
+# authenticated and authorized without loading the user row
+USER_CLAIMS = (
+    'role',
+    'is_staff',
+    'is_superuser',
+    'is_active',
+    'is_email_verified',
+    'is_phone_verified',
+)
+
+
+class ClaimsRefreshToken(RefreshToken):
+    """
+    Refresh token carrying the ``USER_CLAIMS`` of its user.
+
+    The access token derived from it copies the claims as well, which is what
+    ``ClaimsJWTAuthentication`` reads on every request.
+    """
+
+    @classmethod
+    def for_user(cls, user):
+        token = super().for_user(user)
+        token.set_user_claims(user)
+        return token
+
+    def set_user_claims(self, user):
+        for claim in USER_CLAIMS:
+            self[claim] = getattr(user, claim)
+
+    def check_blacklist(self):
+        """
+        Only query the blacklist table when the bloom filter says the JTI
+        may be in it.
+        """
+        blacklist_filter = get_blacklist_filter()
+        if not blacklist_filter.might_contain(self.payload[api_settings.JTI_CLAIM]):
+            return
+
+        try:
+            super().check_blacklist()
+        except TokenError:
+            blacklist_filter.record_hit(blacklisted=True)
+            raise
+        blacklist_filter.record_hit(blacklisted=False)
+
+    def blacklist(self):
+        result = super().blacklist()
+        get_blacklist_filter().add(self.payload[api_settings.JTI_CLAIM])
+        return result
+
+
+class ClaimsTokenRefreshSerializer(TokenRefreshSerializer):
+    """
+    ``TokenRefreshSerializer`` that stamps the ``USER_CLAIMS`` again from
+    the user row it loads anyway. Rotation keeps the payload of the first
+    refresh token, so a changed role or flag would otherwise never reach
+    the tokens.
+    """
+    token_class = ClaimsRefreshToken
+
+    def validate(self, attrs):
+        refresh = self.token_class(attrs['refresh'])
+
+        user_id = refresh.payload.get(api_settings.USER_ID_CLAIM)
+        user = user_id and get_user_model().objects.filter(
+            **{api_settings.USER_ID_FIELD: user_id}).first()
+        if not user or not api_settings.USER_AUTHENTICATION_RULE(user):
+            raise AuthenticationFailed(
+                self.error_messages['no_active_account'], 'no_active_account')
+        refresh.set_user_claims(user)
+
+        data = {'access': str(refresh.access_token)}
+
+        if api_settings.ROTATE_REFRESH_TOKENS:
+            if api_settings.BLACKLIST_AFTER_ROTATION:
+                refresh.blacklist()
+            refresh.set_jti()
+            refresh.set_exp()
+            refresh.set_iat()
+            refresh.outstand()
+            data['refresh'] = str(refresh)
+
+        return data
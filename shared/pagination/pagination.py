@@ -0,0 +1,215 @@
+import json
+from decimal import Decimal
+
+from django.conf import settings
+from django.core import signing
+from django.db import connections
+from django.db.models import Q
+from rest_framework.exceptions import NotFound
+from rest_framework.pagination import BasePagination
+from rest_framework.response import Response
+from rest_framework.settings import api_settings
+from rest_framework.utils.urls import replace_query_param
+
+
+class KeysetPagination(BasePagination):
+    """
+    Keyset (seek) pagination over a composite, unique ordering.
+
+    Pages are fetched with ``WHERE (created_at, id) < (...)`` instead of
+    ``OFFSET``, so deep pages cost the same as the first one and no
+    ``COUNT(*)`` is issued. Cursors are signed, opaque tokens.
+
+    The ordering is the view's, from its ``OrderingFilter`` as with DRF's
+    ``CursorPagination``, with ``id`` appended when missing; ``ordering``
+    is used when the view asks for none. Ordering fields must not be
+    nullable.
+
+    With ``approximate_count`` the response carries the planner's row
+    estimate (PostgreSQL only) instead of an exact count.
+    """
+
+    page_size = api_settings.PAGE_SIZE
+    page_size_query_param = 'page_size'
+    max_page_size = 100
+    cursor_query_param = 'cursor'
+    invalid_cursor_message = 'Invalid cursor'
+
+    # must end with a unique column so that every row has a distinct key
+    ordering = ('-created_at', '-id')
+    tie_breaker = 'id'
+    approximate_count = getattr(
+        settings, 'KEYSET_PAGINATION_APPROXIMATE_COUNT', False)
+
+    signing_salt = 'shared.pagination.keyset'
+
+    def paginate_queryset(self, queryset, request, view=None):
+        self.request = request
+        self.base_url = request.build_absolute_uri()
+        page_size = self.get_page_size(request)
+        if not page_size:
+            return None
+
+        self.ordering = self.get_ordering(request, queryset, view)
+        position, reverse = self.decode_cursor(request)
+        ordering = self.get_seek_ordering(reverse)
+
+        self.count = self.get_approximate_count(
+            queryset) if self.approximate_count else None
+
+        queryset = queryset.order_by(*ordering)
+        if position is not None:
+            queryset = queryset.filter(self.get_seek_filter(ordering, position))
+
+        results = list(queryset[:page_size + 1])
+        has_more = len(results) > page_size
+        results = results[:page_size]
+        if reverse:
+            results.reverse()
+
+        has_next = has_more if not reverse else position is not None
+        has_previous = position is not None if not reverse else has_more
+
+        self.next_position = self.get_position(
+            results[-1]) if has_next and results else None
+        self.previous_position = self.get_position(
+            results[0]) if has_previous and results else None
+
+        return results
+
+    def get_paginated_response(self, data):
+        payload = {
+            'next': self.get_next_link(),
+            'previous': self.get_previous_link(),
+            'results': data,
+        }
+        if self.approximate_count:
+            payload['count'] = self.count
+        return Response(payload)
+
+    def get_paginated_response_schema(self, schema):
+        properties = {
+            'next': {'type': 'string', 'nullable': True, 'format': 'uri'},
+            'previous': {'type': 'string', 'nullable': True, 'format': 'uri'},
+            'results': schema,
+        }
+        if self.approximate_count:
+            properties['count'] = {'type': 'integer', 'nullable': True}
+        return {'type': 'object', 'properties': properties}
+
+    def get_page_size(self, request):
+        if self.page_size_query_param:
+            try:
+                page_size = int(request.query_params[self.page_size_query_param])
+            except (KeyError, ValueError):
+                pass
+            else:
+                if page_size > 0:
+                    return min(page_size, self.max_page_size)
+        return self.page_size
+
+    def get_ordering(self, request, queryset, view):
+        ordering_filters = [
+            backend for backend in getattr(view, 'filter_backends', [])
+            if hasattr(backend, 'get_ordering')
+        ]
+        ordering = None
+        if ordering_filters:
+            ordering = ordering_filters[0]().get_ordering(request, queryset, view)
+        if not ordering:
+            return self.ordering
+
+        if isinstance(ordering, str):
+            ordering = (ordering,)
+        ordering = tuple(ordering)
+        if not any(field.lstrip('-') == self.tie_breaker for field in ordering):
+            direction = '-' if ordering[-1].startswith('-') else ''
+            ordering += (direction + self.tie_breaker,)
+        return ordering
+
+    def get_seek_ordering(self, reverse):
+        if not reverse:
+            return self.ordering
+        return tuple(
+            field[1:] if field.startswith('-') else f'-{field}'
+            for field in self.ordering
+        )
+
+    def get_seek_filter(self, ordering, position):
+        """
+        Rows strictly after ``position`` in ``ordering``, expanded as
+        ``a < x OR (a = x AND b < y) ...`` so mixed directions work too.
+        """
+        seek = Q()
+        equal = Q()
+        for field, value in zip(ordering, position):
+            name = field.lstrip('-')
+            lookup = 'lt' if field.startswith('-') else 'gt'
+            seek |= equal & Q(**{f'{name}__{lookup}': value})
+            equal &= Q(**{name: value})
+        return seek
+
+    def get_position(self, instance):
+        # model instances, or the .values() rows of FastListModelMixin
+        if isinstance(instance, dict):
+            return [instance[field.lstrip('-')] for field in self.ordering]
+        return [getattr(instance, field.lstrip('-')) for field in self.ordering]
+
+    def get_approximate_count(self, queryset):
+        """
+        Planner row estimate for ``queryset``; ``None`` where the database
+        cannot provide one cheaply.
+        """
+        connection = connections[queryset.db]
+        if connection.vendor != 'postgresql':
+            return None
+
+        if not queryset.query.where:
+            with connection.cursor() as cursor:
+                cursor.execute(
+                    'SELECT reltuples::bigint FROM pg_class WHERE oid = %s::regclass',
+                    [queryset.model._meta.db_table],
+                )
+                row = cursor.fetchone()
+            return max(row[0], 0) if row else None
+
+        plan = json.loads(queryset.order_by().explain(format='json'))
+        return plan[0]['Plan']['Plan Rows']
+
+    def encode_cursor(self, position, reverse):
+        values = [
+            value.isoformat() if hasattr(value, 'isoformat')
+            else str(value) if isinstance(value, Decimal) else value
+            for value in position
+        ]
+        token = signing.dumps(
+            {'p': values, 'r': reverse, 'o': self.ordering},
+            salt=self.signing_salt, compress=True)
+        return replace_query_param(self.base_url, self.cursor_query_param, token)
+
+    def decode_cursor(self, request):
+        token = request.query_params.get(self.cursor_query_param)
+        if not token:
+            return None, False
+
+        try:
+            data = signing.loads(token, salt=self.signing_salt)
+            values = data['p']
+            reverse = bool(data['r'])
+            # a cursor only makes sense in the ordering it was made for
+            if data['o'] != list(self.ordering) or len(values) != len(self.ordering):
+                raise ValueError
+        except (signing.BadSignature, KeyError, TypeError, ValueError):
+            raise NotFound(self.invalid_cursor_message)
+
+        return values, reverse
+
+    def get_next_link(self):
+        if self.next_position is None:
+            return None
+        return self.encode_cursor(self.next_position, reverse=False)
+
+    def get_previous_link(self):
+        if self.previous_position is None:
+            return None
+        return self.encode_cursor(self.previous_position, reverse=True)
@@ -0,0 +1,35 @@
+import re
+from io import BytesIO
+
+import orjson
+from django.conf import settings
+from rest_framework.exceptions import ParseError
+from rest_framework.parsers import JSONParser
+
+from shared.renderers.renderers import ORJSONRenderer
+
+# orjson reads integers past 64 bits as floats, json keeps them exact;
+# bodies with a run of digits this long are parsed by JSONParser instead
+LONG_NUMBER = re.compile(rb'\d{19}')
+
+
+class ORJSONParser(JSONParser):
+    """
+    ``JSONParser`` on orjson. Like it, refuses NaN and infinity unless
+    ``STRICT_JSON`` is off. Bodies that are not UTF-8 or that may hold an
+    integer wider than 64 bits are parsed by ``JSONParser``.
+    """
+    renderer_class = ORJSONRenderer
+
+    def parse(self, stream, media_type=None, parser_context=None):
+        parser_context = parser_context or {}
+        encoding = parser_context.get('encoding', settings.DEFAULT_CHARSET)
+        if not self.strict or encoding.lower().replace('-', '') != 'utf8':
+            return super().parse(stream, media_type, parser_context)
+        try:
+            data = stream.read()
+            if LONG_NUMBER.search(data):
+                return super().parse(BytesIO(data), media_type, parser_context)
+            return orjson.loads(data)
+        except ValueError as exc:
+            raise ParseError('JSON parse error - %s' % str(exc))
@@ -22,3 +22,12 @@ class IsSellerUser(permissions.BasePermission):
 class IsCustomerUser(permissions.BasePermission):
     def has_permission(self, request, view):
         return request.user.is_authenticated and request.user.is_customer
+
+
+class IsAuthorOrReadOnly(permissions.BasePermission):
+    """Objects with a ``user`` foreign key, writable by that user only."""
+
+    def has_object_permission(self, request, view, obj):
+        if request.method in permissions.SAFE_METHODS:
+            return True
+        return str(obj.user_id) == str(request.user.pk)
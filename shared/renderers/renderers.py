@@ -0,0 +1,31 @@
+import orjson
+from rest_framework.renderers import JSONRenderer
+
+
+class ORJSONRenderer(JSONRenderer):
+    """
+    ``JSONRenderer`` on orjson, several times faster on large lists and
+    byte for byte the same for what the API returns: values orjson does
+    not know (decimals, lazy strings, datetimes) go through DRF's encoder.
+
+    Indented output (the browsable API, ``Accept: ...; indent=4``), the
+    non-default ``UNICODE_JSON``/``COMPACT_JSON`` settings and anything
+    orjson refuses, such as integers wider than 64 bits, are rendered by
+    ``JSONRenderer`` instead. Unlike it, NaN and infinity become ``null``.
+    """
+    options = orjson.OPT_NON_STR_KEYS | orjson.OPT_PASSTHROUGH_DATETIME
+
+    def render(self, data, accepted_media_type=None, renderer_context=None):
+        if data is None:
+            return b''
+        indent = self.get_indent(accepted_media_type, renderer_context or {})
+        if indent is not None or self.ensure_ascii or not self.compact:
+            return super().render(data, accepted_media_type, renderer_context)
+        try:
+            ret = orjson.dumps(data, default=self.encoder_class().default, option=self.options)
+        except orjson.JSONEncodeError:
+            return super().render(data, accepted_media_type, renderer_context)
+        # escaped like JSONRenderer does, to stay a strict javascript subset
+        if b'\xe2\x80\xa8' in ret or b'\xe2\x80\xa9' in ret:
+            ret = ret.replace(b'\xe2\x80\xa8', b'\\u2028').replace(b'\xe2\x80\xa9', b'\\u2029')
+        return ret
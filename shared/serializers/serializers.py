@@ -0,0 +1,181 @@
+"""
+Read-only fast path for hot list endpoints.
+
+``compile_serializer(UserSerializer)`` looks at the readable fields of a
+DRF serializer once and compiles a function that builds each
+representation straight from a ``.values()`` row. No model instances are
+made and the per-field ``get_attribute``/``to_representation`` calls DRF
+makes for every row are gone. The output is what ``many=True`` would give:
+
+- plain fields (strings, numbers, booleans, JSON, primary keys) are copied;
+- datetimes, dates and files are formatted the way DRF formats them;
+- any other field is handed to its own ``to_representation``, bound once
+  per call so it sees the request in its context;
+- a nested serializer becomes ``None`` when the related row is missing.
+
+Fields that need the whole instance (``source='*'``, method fields) and
+many-valued relations cannot be read from a row and are refused when the
+serializer is compiled.
+"""
+from functools import lru_cache
+
+from django.core.exceptions import ImproperlyConfigured
+from django.utils.encoding import iri_to_uri
+from rest_framework import ISO_8601, serializers
+from rest_framework.response import Response
+from rest_framework.settings import api_settings
+
+# copied unchanged: to_representation does nothing to what the database returns
+PLAIN_FIELDS = (
+    serializers.CharField, serializers.EmailField, serializers.URLField,
+    serializers.SlugField, serializers.IntegerField, serializers.BooleanField,
+    serializers.JSONField, serializers.ReadOnlyField,
+)
+
+UNSUPPORTED_FIELDS = (
+    serializers.SerializerMethodField, serializers.HiddenField,
+    serializers.ListSerializer, serializers.ManyRelatedField,
+)
+
+
+def plain(field):
+    if type(field) in PLAIN_FIELDS:
+        return True
+    return type(field) is serializers.PrimaryKeyRelatedField and field.pk_field is None
+
+
+def datetime_converter(field):
+    output_format = getattr(field, 'format', api_settings.DATETIME_FORMAT)
+    zone = field.timezone if hasattr(field, 'timezone') else field.default_timezone()
+    if output_format is None or output_format.lower() != ISO_8601 or zone is None:
+        return None
+
+    def convert(value):
+        value = value.astimezone(zone).isoformat()
+        return value[:-6] + 'Z' if value.endswith('+00:00') else value
+    return convert
+
+
+def date_converter(field):
+    output_format = getattr(field, 'format', api_settings.DATE_FORMAT)
+    if output_format is None or output_format.lower() != ISO_8601:
+        return None
+    return lambda value: value.isoformat()
+
+
+def absolute_url(request):
+    """``request.build_absolute_uri`` without its ``urlsplit`` for plain paths."""
+    scheme_host = request.build_absolute_uri('/')[:-1]
+
+    def build(location):
+        if (location.startswith('/') and not location.startswith('//')
+                and '/./' not in location and '/../' not in location
+                and '?' not in location and '#' not in location):
+            return iri_to_uri(scheme_host + location)
+        return request.build_absolute_uri(location)
+    return build
+
+
+def file_converter(field, model_field, request):
+    if not getattr(field, 'use_url', api_settings.UPLOADED_FILES_USE_URL):
+        return lambda value: value or None
+    storage = model_field.storage
+    if request is None:
+        return lambda value: storage.url(value) if value else None
+    build = absolute_url(request)
+    return lambda value: build(storage.url(value)) if value else None
+
+
+class FastSerializer:
+    """
+    The compiled form of a serializer class: ``values`` are the columns to
+    select, ``serialize`` turns the rows into representations.
+    """
+
+    def __init__(self, serializer_class):
+        self.serializer_class = serializer_class
+        # (path of field names, values() key, kind) per readable field; the
+        # kind of a file field is its model field, which holds the storage
+        self.plan = []
+        source = ['def make(convert):', '    def represent(row):', '        return ' +
+                  self.compile(serializer_class(), (), '', 2), '    return represent']
+        namespace = {}
+        exec(compile('\n'.join(source), f'<fast {serializer_class.__name__}>', 'exec'), namespace)
+        self.make = namespace['make']
+        self.values = tuple(dict.fromkeys(key for _, key, _ in self.plan))
+
+    def compile(self, serializer, path, prefix, depth):
+        """Source of the dict expression for ``serializer``, extending ``self.plan``."""
+        model = serializer.Meta.model
+        items = []
+        for field in serializer._readable_fields:
+            if isinstance(field, UNSUPPORTED_FIELDS) or field.source == '*':
+                raise ImproperlyConfigured(
+                    f"{self.serializer_class.__name__}.{field.field_name} "
+                    f"cannot be read from a values() row")
+            key = prefix + '__'.join(field.source_attrs)
+            field_path = (*path, field.field_name)
+            if isinstance(field, serializers.BaseSerializer):
+                pk = f'{key}__{field.Meta.model._meta.pk.attname}'
+                self.plan.append((field_path, pk, 'nested'))
+                nested = self.compile(field, field_path, f'{key}__', depth + 1)
+                value = f'None if row[{pk!r}] is None else {nested}'
+            elif plain(field):
+                self.plan.append((field_path, key, 'plain'))
+                value = f'row[{key!r}]'
+            else:
+                if isinstance(field, serializers.FileField):
+                    self.plan.append((field_path, key, model._meta.get_field(field.source)))
+                else:
+                    self.plan.append((field_path, key, 'field'))
+                index = len(self.plan) - 1
+                value = f'None if (value := row[{key!r}]) is None else convert[{index}](value)'
+            items.append(f'{field.field_name!r}: {value}')
+        indent = '    ' * (depth + 1)
+        return '{\n' + ''.join(f'{indent}    {item},\n' for item in items) + indent + '}'
+
+    def converters(self, context):
+        """One converter per plan entry, for the fields of a serializer bound to ``context``."""
+        serializer = self.serializer_class(context=context)
+        request = context.get('request')
+        converters = []
+        for path, _, kind in self.plan:
+            field = serializer
+            for name in path:
+                field = field.fields[name]
+            convert = None
+            if kind in ('plain', 'nested'):
+                pass
+            elif isinstance(field, serializers.DateTimeField):
+                convert = datetime_converter(field)
+            elif isinstance(field, serializers.DateField):
+                convert = date_converter(field)
+            elif isinstance(field, serializers.FileField):
+                convert = file_converter(field, kind, request)
+            converters.append(convert or field.to_representation)
+        return converters
+
+    def serialize(self, rows, context=None):
+        represent = self.make(self.converters(context or {}))
+        return [represent(row) for row in rows]
+
+
+@lru_cache(maxsize=None)
+def compile_serializer(serializer_class):
+    return FastSerializer(serializer_class)
+
+
+class FastListModelMixin:
+    """
+    ``list`` through the fast serializer of ``get_serializer_class()``.
+    Filters and pagination see a ``.values()`` queryset.
+    """
+
+    def list(self, request, *args, **kwargs):
+        fast = compile_serializer(self.get_serializer_class())
+        rows = self.filter_queryset(self.get_queryset()).values(*fast.values)
+        context = self.get_serializer_context()
+        page = self.paginate_queryset(rows)
+        if page is not None:
+            return self.get_paginated_response(fast.serialize(page, context))
+        return Response(fast.serialize(rows, context))
@@ -0,0 +1,160 @@
+"""
+Sliding-window rate throttles backed by atomic counters.
+
+DRF's ``SimpleRateThrottle`` stores the full request history per key and
+rewrites it on every request. These throttles keep two fixed-window
+counters per key (current and previous window) and weight the previous one
+by how much of it still overlaps the sliding window, which needs O(1)
+storage and one round trip. With django-redis the check-and-increment is a
+Lua script; other cache backends fall back to ``add``/``incr``.
+
+Clients that were denied are also remembered in process until their wait
+is over, so obvious offenders are rejected without a network hop.
+"""
+import time
+
+from django.core.cache import cache as default_cache
+from rest_framework.throttling import (
+    AnonRateThrottle,
+    ScopedRateThrottle,
+    SimpleRateThrottle,
+    UserRateThrottle,
+)
+
+SLIDING_WINDOW_SCRIPT = """
+local current = tonumber(redis.call('GET', KEYS[1]) or '0')
+local previous = tonumber(redis.call('GET', KEYS[2]) or '0')
+if previous * tonumber(ARGV[2]) + current >= tonumber(ARGV[1]) then
+    return {0, current, previous}
+end
+current = redis.call('INCR', KEYS[1])
+if current == 1 then
+    redis.call('EXPIRE', KEYS[1], ARGV[3])
+end
+return {1, current, previous}
+"""
+
+
+class RedisCounter:
+
+    def __init__(self):
+        from django_redis import get_redis_connection
+
+        self.script = get_redis_connection('default').register_script(SLIDING_WINDOW_SCRIPT)
+
+    def hit(self, current_key, previous_key, limit, weight, ttl):
+        allowed, current, previous = self.script(
+            keys=[current_key, previous_key], args=[limit, weight, ttl])
+        return bool(allowed), int(current), int(previous)
+
+
+class CacheCounter:
+    """Fallback for non-Redis caches; check and increment are not atomic."""
+
+    def __init__(self, cache):
+        self.cache = cache
+
+    def hit(self, current_key, previous_key, limit, weight, ttl):
+        counts = self.cache.get_many([current_key, previous_key])
+        current = counts.get(current_key, 0)
+        previous = counts.get(previous_key, 0)
+        if previous * weight + current >= limit:
+            return False, current, previous
+        if self.cache.add(current_key, 1, ttl):
+            return True, 1, previous
+        try:
+            return True, self.cache.incr(current_key), previous
+        except ValueError:
+            # expired between add and incr
+            self.cache.set(current_key, 1, ttl)
+            return True, 1, previous
+
+
+def get_counter(cache):
+    try:
+        from django_redis.cache import RedisCache
+    except ImportError:
+        RedisCache = None
+    if RedisCache is not None and isinstance(cache, RedisCache):
+        return RedisCounter()
+    return CacheCounter(cache)
+
+
+# key -> unix time until which the key is known to be over its limit
+_local_blocks = {}
+LOCAL_BLOCKS_MAX_SIZE = 10000
+
+
+class SlidingWindowRateThrottle(SimpleRateThrottle):
+    cache = default_cache
+    _counter = None
+
+    @classmethod
+    def get_counter(cls):
+        if SlidingWindowRateThrottle._counter is None:
+            SlidingWindowRateThrottle._counter = get_counter(cls.cache)
+        return SlidingWindowRateThrottle._counter
+
+    def allow_request(self, request, view):
+        if self.rate is None:
+            return True
+
+        self.key = self.get_cache_key(request, view)
+        if self.key is None:
+            return True
+
+        now = self.timer()
+        blocked_until = _local_blocks.get(self.key)
+        if blocked_until is not None:
+            if blocked_until > now:
+                self.wait_seconds = blocked_until - now
+                return False
+            _local_blocks.pop(self.key, None)
+
+        window = int(now // self.duration)
+        elapsed = now - window * self.duration
+        weight = 1 - elapsed / self.duration
+
+        allowed, current, previous = self.get_counter().hit(
+            f'{self.key}:{window}', f'{self.key}:{window - 1}',
+            self.num_requests, weight, self.duration * 2)
+        if allowed:
+            return True
+
+        self.wait_seconds = self.compute_wait(current, previous, elapsed)
+        self.block_locally(now + self.wait_seconds)
+        return False
+
+    def compute_wait(self, current, previous, elapsed):
+        """Seconds until the weighted count drops below the limit."""
+        remaining = self.duration - elapsed
+        if current >= self.num_requests or not previous:
+            return remaining
+        # previous * (1 - (elapsed + t) / duration) + current < limit
+        wait = self.duration * (previous + current - self.num_requests) / previous - elapsed
+        return min(max(wait, 0.0), remaining)
+
+    def block_locally(self, until):
+        if len(_local_blocks) >= LOCAL_BLOCKS_MAX_SIZE:
+            now = self.timer()
+            for key, blocked_until in list(_local_blocks.items()):
+                if blocked_until <= now:
+                    _local_blocks.pop(key, None)
+        _local_blocks[self.key] = until
+
+    def wait(self):
+        return getattr(self, 'wait_seconds', None)
+
+    timer = time.time
+
+
+class SlidingWindowAnonRateThrottle(AnonRateThrottle, SlidingWindowRateThrottle):
+    pass
+
+
+class SlidingWindowUserRateThrottle(UserRateThrottle, SlidingWindowRateThrottle):
+    pass
+
+
+class SlidingWindowScopedRateThrottle(ScopedRateThrottle, SlidingWindowRateThrottle):
+    """Rate picked from ``throttle_scope`` on the view, like ``ScopedRateThrottle``."""